@@ -5,8 +5,16 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import time
+from datetime import datetime
+import os
+import sys
 from pymodbus.client import ModbusSerialClient
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.decode import RegisterDecoder
+from streamer.gather_plot import GatherRenderer
+from streamer.segy import SegyWriter
+
 class RealtimeSeismicGUI:
     def __init__(self, root):
         self.root = root
@@ -58,11 +66,21 @@ class RealtimeSeismicGUI:
         self.is_running = False
         self.num_traces = 200  # Number of traces
         self.num_samples = 30  # Number of samples per trace
-        self.data = np.zeros((self.num_samples, self.num_traces))
         self.trace_numbers = np.arange(self.num_traces)
         self.line = np.arange(self.num_samples)
         self.selected_range = 100  # Default range
 
+        # Semua trace digambar sebagai satu LineCollection + PolyCollection (variable area) dengan blitting,
+        # tiap trace baru hanya mengubah satu kolom. render_mode "image" untuk ribuan trace.
+        self.render_mode = "wiggle"
+        self.renderer = GatherRenderer(self.ax, self.num_samples, self.num_traces, mode=self.render_mode,
+                                       fill=True, times=self.line)
+        self.ax.set_xlabel('Trace Number')
+        self.ax.set_ylabel('Time/second')
+        self.ax.set_xlim(-10, self.num_traces + 10)
+        self.plot_interval_ms = 1000  # Satu trace per detik
+        self.plot_job = None
+
         # Modbus client setup
         self.client = ModbusSerialClient(
             port='COM6', 
@@ -78,39 +96,55 @@ class RealtimeSeismicGUI:
         else:
             print("Connected to Modbus slave")
 
-        # Buffer untuk menyimpan data Modbus
+        # Buffer untuk menyimpan data Modbus, dengan waktu baca tiap register
         self.data_buffer = []
+        self.read_times = []
         self.data_lock = threading.Lock()
 
         # Counter untuk menghitung jumlah data yang diterima setiap detik
         self.data_counter = 0
 
+        # Setiap trace yang selesai langsung ditulis ke file SEG-Y (satu file per Start),
+        # dibuat saat trace pertama datang karena interval sampel diukur dari waktu baca
+        self.segy_writer = None
+        self.segy_path = None
+
     def start_realtime(self):
         """Start the realtime data acquisition and plotting."""
         if not self.is_running:
             self.is_running = True
+            with self.data_lock:
+                if self.segy_writer is None and self.segy_path is None:
+                    self.segy_path = f"seismic_{datetime.now():%Y%m%d_%H%M%S}.sgy"
             # Thread untuk membaca data Modbus setiap 1 ms
             self.modbus_thread = threading.Thread(target=self.read_modbus_data)
             self.modbus_thread.daemon = True
             self.modbus_thread.start()
-            # Thread untuk memperbarui plot setiap 1 detik
-            self.plot_thread = threading.Thread(target=self.update_plot)
-            self.plot_thread.daemon = True
-            self.plot_thread.start()
+            # Plot diperbarui di thread Tk setiap 1 detik (matplotlib/Tk tidak thread-safe)
+            if self.plot_job is None:
+                self.plot_job = self.root.after(self.plot_interval_ms, self.update_plot)
 
     def stop_realtime(self):
         """Stop the realtime data acquisition."""
         self.is_running = False
         self.client.close()
+        if self.plot_job is not None:
+            self.root.after_cancel(self.plot_job)
+            self.plot_job = None
+        with self.data_lock:
+            if self.segy_writer is not None:
+                self.segy_writer.close()
+                self.segy_writer = None
+            self.segy_path = None
 
     def reset_data(self):
         """Reset data and stop realtime acquisition."""
         self.stop_realtime()  # Stop the current process
         with self.data_lock:
             self.data_buffer = []  # Clear the buffer
-            self.data = np.zeros((self.num_samples, self.num_traces))  # Reset the data array
-        self.ax.clear()  # Clear the plot
-        self.canvas.draw()  # Redraw the canvas
+            self.read_times = []
+        self.renderer.reset()  # Clear the plot
+        self.renderer.draw()  # Redraw the gather
 
     def on_slave_change(self, event):
         """Handle slave change event."""
@@ -123,6 +157,11 @@ class RealtimeSeismicGUI:
         # self.reset_data()  # Reset data and stop current process
         self.start_realtime()  # Restart with the new range
 
+    def range_decoder(self):
+        """Decoder for the selected range, maps register 5..range to 0..5."""
+        scale = 5.0 / (self.selected_range - 5)
+        return RegisterDecoder(1, "u16", scale=scale, offset=-5 * scale)
+
     def read_modbus_data(self):
         """Read Modbus data every 1 ms and store it in the buffer."""
         while self.is_running:
@@ -141,11 +180,9 @@ class RealtimeSeismicGUI:
                     print("Modbus read error")
                 else:
                     with self.data_lock:
-                        # Konversi data Modbus ke data seismic
-                        # datamodbus = response.registers[0]
-                        datamodbus = (response.registers[0] - 5) / (self.selected_range - 5) * 5 # (data-min)/(max-min)*min
-                        # print("Datamodbus:", datamodbus)
-                        self.data_buffer.append(datamodbus)  # Simpan data ke buffer
+                        # Simpan register mentah, dikonversi sekaligus per trace di update_plot
+                        self.data_buffer.append(response.registers[0])  # Simpan data ke buffer
+                        self.read_times.append(time.perf_counter())
                         self.data_counter += 1  # Increment counter
                         print("Data Register:", response.registers[0])
                         
@@ -153,45 +190,60 @@ class RealtimeSeismicGUI:
             except Exception as e:
                 print("Modbus communication error:", e)
 
+    def write_segy_trace(self, trace, read_times):
+        """Append a trace to the SEG-Y file, sample interval = mean time between its register reads."""
+        if self.segy_path is None:
+            return
+        # SEG-Y menyimpan interval dalam us 16-bit: polling di bawah ~15 Hz dipotong ke 65535 us
+        interval_us = min(max(1, round(np.diff(read_times).mean() * 1e6)), 0xFFFF)
+        if self.segy_writer is None:
+            self.segy_writer = SegyWriter(
+                self.segy_path,
+                samples_per_trace=self.num_samples,
+                sample_interval_us=interval_us,  # Interval trace pertama, tiap trace menyimpan intervalnya sendiri
+                text_header=(f"Realtime Seismic Data Viewer\nOne trace per second, slave register 0\n"
+                             f"Each trace: first {self.num_samples} reads of the second, "
+                             f"interval = measured time between reads"),
+            )
+        self.segy_writer.write_trace(trace, field_record=int(self.slave_combobox.get()),
+                                     sample_interval=interval_us)
+
     def update_plot(self):
-        """Update the plot with data collected in the last second."""
-        while self.is_running:
-            with self.data_lock:
-                if self.data_buffer:
-                    # Ambil data dari buffer
-                    new_trace = np.array(self.data_buffer)
-                    # print("New trace:", new_trace)
-                    self.data_buffer = []  # Reset buffer setelah diambil
-
-                    # Pastikan panjang data sesuai dengan num_samples
-                    if len(new_trace) < self.num_samples:
-                        # Jika data lebih pendek, isi dengan nilai 0
-                        new_trace = np.pad(new_trace, (0, self.num_samples - len(new_trace)), mode='constant')
-                    else:
-                        # Jika data lebih panjang, potong menjadi num_samples
-                        new_trace = new_trace[:self.num_samples]
-
-                    # Roll the data to the left and add new trace to the end
-                    self.data = np.roll(self.data, -1, axis=1)
-                    self.data[:, -1] = new_trace  # Tambahkan data baru ke kolom terakhir
-
-            # Update plot
-            self.ax.clear()
-            for i in range(self.data.shape[1]):
-                self.ax.plot(self.trace_numbers[i] + self.data[:, i], self.line, color='black')  # Garis hitam
-                # self.ax.fill_betweenx(self.line, self.trace_numbers[i], self.trace_numbers[i] + self.data[:, i])
-                                    # where=self.data[:, i] > 0, color='black', alpha=0.5)  # Area diisi dengan hitam
-
-            self.ax.set_xlabel('Trace Number')
-            self.ax.set_ylabel('Time/second')
-            self.ax.set_xlim(-10, self.num_traces + 10)
-            self.canvas.draw()
-
-            # Tampilkan jumlah data yang diterima setiap detik
-            print(f"Data received in the last second: {self.data_counter}")
-            self.data_counter = 0  # Reset counter
-
-            time.sleep(1)  # Delay untuk memperbarui plot setiap 1 detik
+        """Update the plot with data collected in the last second (runs on the Tk thread)."""
+        self.plot_job = None
+        if not self.is_running:
+            return
+        new_trace = None
+        with self.data_lock:
+            if self.data_buffer:
+                # Ambil data dari buffer dan konversi ke data seismic: (data-min)/(max-min)*5
+                new_trace = self.range_decoder().decode(self.data_buffer)[:, 0]
+                # print("New trace:", new_trace)
+                read_times = np.array(self.read_times[:self.num_samples])
+                self.data_buffer = []  # Reset buffer setelah diambil
+                self.read_times = []
+
+                # Pastikan panjang data sesuai dengan num_samples
+                if len(new_trace) < self.num_samples:
+                    # Jika data lebih pendek, isi dengan nilai 0
+                    new_trace = np.pad(new_trace, (0, self.num_samples - len(new_trace)), mode='constant')
+                else:
+                    # Jika data lebih panjang, potong menjadi num_samples
+                    new_trace = new_trace[:self.num_samples]
+
+                if len(read_times) > 1:
+                    self.write_segy_trace(new_trace, read_times)
+
+        # Update plot: hanya trace baru yang diubah, lalu blit
+        if new_trace is not None:
+            self.renderer.push(new_trace)  # Trace baru di kanan, trace tertua bergeser keluar
+        self.renderer.draw()
+
+        # Tampilkan jumlah data yang diterima setiap detik
+        print(f"Data received in the last second: {self.data_counter}")
+        self.data_counter = 0  # Reset counter
+
+        self.plot_job = self.root.after(self.plot_interval_ms, self.update_plot)  # Perbarui lagi 1 detik lagi
 
 if __name__ == "__main__":
     root = tk.Tk()
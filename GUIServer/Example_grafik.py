@@ -5,6 +5,11 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.ring_buffer import ScrollingGather
 
 class RealtimeSeismicGUI:
     def __init__(self, root):
@@ -26,7 +31,7 @@ class RealtimeSeismicGUI:
         self.is_running = False
         self.num_traces = 50  # Ensure exactly 100 traces
         self.num_samples = 100
-        self.data = np.zeros((self.num_samples, self.num_traces))
+        self.data = ScrollingGather(self.num_samples, self.num_traces)
         self.trace_numbers = np.arange(self.num_traces)
         self.line = np.arange(self.num_samples)
 
@@ -48,15 +53,15 @@ class RealtimeSeismicGUI:
             # Simulate new seismic data (replace this with real data acquisition)
             new_trace = np.random.randn(self.num_samples) * 10  # Random seismic trace
             print(new_trace)
-            self.data = np.roll(self.data, -1, axis=1)  # Shift data to the left
-            self.data[:, -1] = new_trace  # Add new trace to the end
+            self.data.push(new_trace)  # Add new trace to the end, the oldest scrolls out
 
             # Update the plot
+            data = self.data.view()
             self.ax.clear()
-            for i in range(self.data.shape[1]):
-                self.ax.plot(self.trace_numbers[i] + self.data[:, i], self.line, color='black')
-                self.ax.fill_betweenx(self.line, self.trace_numbers[i], self.trace_numbers[i] + self.data[:, i],
-                                      where=self.data[:, i] > 0, color='black')
+            for i in range(data.shape[1]):
+                self.ax.plot(self.trace_numbers[i] + data[:, i], self.line, color='black')
+                self.ax.fill_betweenx(self.line, self.trace_numbers[i], self.trace_numbers[i] + data[:, i],
+                                      where=data[:, i] > 0, color='black')
 
             self.ax.set_xlabel('Trace Number')
             self.ax.set_ylabel('Time/Depth')
@@ -5,8 +5,13 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import time
+import os
+import sys
 from pymodbus.client import ModbusSerialClient
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.ring_buffer import ScrollingGather
+
 class RealtimeSeismicGUI:
     def __init__(self, root):
         self.root = root
@@ -25,7 +30,7 @@ class RealtimeSeismicGUI:
 
         # Variables for realtime data
         self.is_running = False
-        self.data = np.zeros((4, 100))  # 1 channel dengan 100 sampel
+        self.data = ScrollingGather(4, 100)  # 4 channel x 100 sampel terakhir, self.data.view() -> (4, 100)
         self.trace_numbers = np.arange(4)  # 1 channel
         self.line = np.arange(100)
 
@@ -82,15 +87,15 @@ class RealtimeSeismicGUI:
                 new_trace = np.array(modbus_data) / 1000.0  # Convert mV back to volts
 
                 # Update the data array
-                self.data = np.roll(self.data, -1, axis=1)  # Shift data to the left
-                self.data[:, -1] = new_trace  # Add new trace to the end
+                self.data.push(new_trace)  # Add new column to the end, the oldest scrolls out
 
                 # Update the plot
+                data = self.data.view()
                 self.ax.clear()
-                for i in range(self.data.shape[0]):
-                    self.ax.plot(self.trace_numbers[i] + self.data[i, :], self.line, color='black')
-                    self.ax.fill_betweenx(self.line, self.trace_numbers[i], self.trace_numbers[i] + self.data[i, :],
-                                          where=self.data[i, :] > 0, color='black')
+                for i in range(data.shape[0]):
+                    self.ax.plot(self.trace_numbers[i] + data[i, :], self.line, color='black')
+                    self.ax.fill_betweenx(self.line, self.trace_numbers[i], self.trace_numbers[i] + data[i, :],
+                                          where=data[i, :] > 0, color='black')
 
                 self.ax.set_xlabel('Channel Number')
                 self.ax.set_ylabel('Time/Depth')
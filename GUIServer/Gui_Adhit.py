@@ -10,6 +10,12 @@ from pyqtgraph.Qt import QtWidgets, QtCore
 import threading
 import time
 import numpy as np
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.decode import MILLIVOLT_DECODER
+from streamer.integrity import IntegrityMonitor
+from streamer.ring_buffer import RingBuffer
 
 # Enable anti-aliasing for smoother plots
 pg.setConfigOptions(antialias=True)
@@ -25,13 +31,26 @@ logging.basicConfig(
 )
 
 # Global variables
-lock = threading.Lock()
-data_buffer = {}
+data_buffer = {}  # RingBuffer per slave, one row per sample (see BUFFER_COLUMNS), written only by modbus_main
 MAX_ITERATIONS = 500  # Maximum number of data points to accumulate
+BUFFER_COLUMNS = ["iteration", "A0", "A1", "A2", "A3", "timestamp"]
+ITERATION = 0
+REG_COLUMNS = {"A0": 1, "A1": 2, "A2": 3, "A3": 4}
+TIMESTAMP = 5
 data_running = False  # Global variable to control data transmission
 
+# Block mode register map (see src/Arduino_IDE/FIX_Respon_Cepat_RS485_Multi)
+NUM_CHANNELS = 4
+BLOCK_COUNT_REGISTER = 4  # Number of valid samples in the block
+BLOCK_SEQ_REGISTER = 5  # 16-bit sequence number of the first sample in the block
+MAX_BLOCK_SAMPLES = (125 - 2) // NUM_CHANNELS  # FC03 reads at most 125 registers
+
+def new_slave_buffer():
+    return RingBuffer(MAX_ITERATIONS, len(BUFFER_COLUMNS), dtype=np.float64)
+
+
 class ModbusRTUMaster:
-    def __init__(self, port, slave_ids, baudrate=115200, timeout=3, max_retries=5, retry_delay=1):
+    def __init__(self, port, slave_ids, baudrate=115200, timeout=3, max_retries=5, retry_delay=1, block_samples=0):
         self.port = port
         self.slave_ids = slave_ids
         self.baudrate = baudrate
@@ -40,6 +59,9 @@ class ModbusRTUMaster:
         self.connected = False
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.block_samples = block_samples  # 0 = one sample per read, N = drain N buffered samples per read
+        # Same check as the master in src/Python: gaps are counted, repeated blocks dropped
+        self.integrity = IntegrityMonitor(bits=16)
 
     async def connect(self):
         retries = 0
@@ -83,7 +105,7 @@ class ModbusRTUMaster:
             if isinstance(response, ExceptionResponse):
                 raise ModbusException(f"Slave {slave_id} exception")
             if hasattr(response, "registers"):
-                return [value / 1000.0 for value in response.registers]
+                return MILLIVOLT_DECODER.decode(response.registers)[0]
             else:
                 raise ModbusException("Invalid response")
         except (ConnectionException, ModbusException) as e:
@@ -93,6 +115,30 @@ class ModbusRTUMaster:
             logging.error(f"Unexpected error: {e}")
         return None
 
+    async def read_block(self, slave_id):
+        """Drain all buffered samples of a slave with one FC03 read."""
+        try:
+            if not self.connected:
+                await self.connect()
+            response = await self.client.read_holding_registers(
+                address=BLOCK_COUNT_REGISTER, count=2 + self.block_samples * NUM_CHANNELS, slave=slave_id
+            )
+            if isinstance(response, ExceptionResponse):
+                raise ModbusException(f"Slave {slave_id} exception")
+            if hasattr(response, "registers"):
+                count = min(response.registers[0], self.block_samples)
+                seq = response.registers[BLOCK_SEQ_REGISTER - BLOCK_COUNT_REGISTER]
+                samples = MILLIVOLT_DECODER.decode(response.registers[2:2 + count * NUM_CHANNELS])
+                return samples[self.integrity.check_block(slave_id, seq, count)]
+            else:
+                raise ModbusException("Invalid response")
+        except (ConnectionException, ModbusException) as e:
+            logging.error(f"Block read error slave {slave_id}: {e}")
+            self.connected = False
+        except Exception as e:
+            logging.error(f"Unexpected error: {e}")
+        return None
+
 
 async def modbus_main(master, shutdown_event):
     global data_buffer, data_running
@@ -100,21 +146,25 @@ async def modbus_main(master, shutdown_event):
         iteration = 0
         while not shutdown_event.is_set():
             if data_running:
+                step = 1
                 for slave_id in master.slave_ids:
-                    voltages = await master.read_voltages(slave_id)
-                    if voltages:
+                    if master.block_samples:
+                        samples = await master.read_block(slave_id)
+                    else:
+                        voltages = await master.read_voltages(slave_id)
+                        samples = voltages[np.newaxis, :] if voltages is not None else None
+                    if samples is not None and len(samples):
                         timestamp = datetime.now().timestamp()
-                        with lock:
-                            if slave_id not in data_buffer:
-                                data_buffer[slave_id] = {}
-                            for i, reg in enumerate(["A0", "A1", "A2", "A3"]):
-                                if reg not in data_buffer[slave_id]:
-                                    data_buffer[slave_id][reg] = []
-                                data_buffer[slave_id][reg].append((iteration, voltages[i], timestamp))
-                                # Limit data to MAX_ITERATIONS
-                                if len(data_buffer[slave_id][reg]) > MAX_ITERATIONS:
-                                    data_buffer[slave_id][reg].pop(0)
-                iteration += 1
+                        step = max(step, len(samples))
+                        rows = np.empty((len(samples), len(BUFFER_COLUMNS)))
+                        rows[:, ITERATION] = np.arange(iteration, iteration + len(samples))
+                        rows[:, REG_COLUMNS["A0"]:REG_COLUMNS["A3"] + 1] = samples
+                        rows[:, TIMESTAMP] = timestamp
+                        if slave_id not in data_buffer:
+                            data_buffer[slave_id] = new_slave_buffer()
+                        # Single writer: the GUI reads with snapshot() and never blocks this thread
+                        data_buffer[slave_id].extend(rows)
+                iteration += step
             await asyncio.sleep(0.0001)  # Faster polling
     except Exception as e:
         logging.error(f"Modbus loop error: {e}")
@@ -197,56 +247,40 @@ class AccumulatedPlotViewer(QtWidgets.QMainWindow):
         self.timer.timeout.connect(self.update_plot)
         self.timer.start(50)  # Update plot every 200 ms
 
-    def downsample_data(self, x, y, max_points=500):
-        """Downsample data to reduce the number of points while preserving the shape."""
-        if len(x) > max_points:
-            indices = np.linspace(0, len(x) - 1, max_points).astype(int)
-            return x[indices], y[indices]
-        return x, y
-
     def process_data(self):
+        """(absolute index of the first row, copy of the selected slave's rows), see BUFFER_COLUMNS."""
         global data_buffer
-        processed = []
+        processed = None
 
-        with lock:
-            selected_slave = self.slave_ids[self.slave_dropdown.currentIndex()]
-            selected_reg = self.register_dropdown.currentText()
+        selected_slave = self.slave_ids[self.slave_dropdown.currentIndex()]
 
-            if selected_slave in data_buffer and selected_reg in data_buffer[selected_slave]:
-                processed = data_buffer[selected_slave][selected_reg]
+        if selected_slave in data_buffer and len(data_buffer[selected_slave]):
+            processed = data_buffer[selected_slave].snapshot()
 
         return processed
 
     def update_plot(self):
-        data = self.process_data()
-        if not data:
+        processed = self.process_data()
+        if processed is None:
             return
+        _, data = processed
 
         # Extract iteration numbers, voltage values, and timestamps
-        iterations, values, timestamps = zip(*data)
-        iterations = np.array(iterations)
-        values = np.array(values)
-        timestamps = np.array(timestamps)
+        selected_reg = self.register_dropdown.currentText()
+        iterations = data[:, ITERATION]
+        values = data[:, REG_COLUMNS[selected_reg]]
+        timestamps = data[:, TIMESTAMP]
 
-        # Downsample data for smoother visualization
-        iterations, values = self.downsample_data(iterations, values)
+        # At most MAX_ITERATIONS points, already fewer than the plot has pixels: plotted as they are
 
         # Calculate sample rate (samples per second) for the selected register
         current_time = time.time()
-        recent_samples = [t for t in timestamps if current_time - t <= 1]  # Samples in the last second
-        sample_rate = len(recent_samples)
+        sample_rate = int(np.count_nonzero(current_time - timestamps <= 1))  # Samples in the last second
         self.sample_rate_label.setText(f"Sample Rate: {sample_rate} Hz")
 
         # Calculate total data rate (all registers for the selected slave)
-        with lock:
-            selected_slave = self.slave_ids[self.slave_dropdown.currentIndex()]
-            if selected_slave in data_buffer:
-                all_timestamps = []
-                for reg_data in data_buffer[selected_slave].values():
-                    all_timestamps.extend([t for _, _, t in reg_data])
-                recent_total_samples = [t for t in all_timestamps if current_time - t <= 1]
-                total_data_rate = len(recent_total_samples)
-                self.total_data_rate_label.setText(f"Total Data Rate: {total_data_rate} Hz")
+        total_data_rate = sample_rate * len(REG_COLUMNS)
+        self.total_data_rate_label.setText(f"Total Data Rate: {total_data_rate} Hz")
 
         # Clear previous trace
         if self.current_trace is not None:
@@ -275,12 +309,13 @@ def main():
     slave_ids = [1, 2, 3, 4]
 
     global data_buffer
-    data_buffer = {sid: {reg: [] for reg in ["A0", "A1", "A2", "A3"]} for sid in slave_ids}
+    data_buffer = {sid: new_slave_buffer() for sid in slave_ids}
     master = ModbusRTUMaster(
         port="COM6",
         slave_ids=slave_ids,
         baudrate=115200,
         timeout=0.05,  # Reduced timeout for faster responses
+        block_samples=0,  # Set to MAX_BLOCK_SAMPLES for slaves running the block mode firmware
     )
 
     shutdown_event = threading.Event()
@@ -1,20 +1,38 @@
 import sys
+import os
 import serial
 import threading
-import re
+from datetime import datetime
+from itertools import compress
+import numpy as np
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QWidget, QComboBox, QLabel, QTextEdit
+    QApplication, QMainWindow, QVBoxLayout, QWidget, QComboBox, QLabel, QPlainTextEdit
 )
-from PyQt5.QtCore import QTimer, QMetaObject, Qt, Q_ARG
+from PyQt5.QtCore import QTimer, Qt
 from pyqtgraph import PlotWidget, mkPen
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.decimate import Decimator
+from streamer.integrity import IntegrityMonitor
+from streamer.recorder import Recorder
+from streamer.ring_buffer import WindowedHistory
+from streamer.text_parser import LabeledLineParser
+from streamer.ui_updates import UiUpdateBuffer
+
 # Konfigurasi Serial
 SERIAL_PORT = "COM6"  # Sesuaikan dengan port serial Anda
 BAUD_RATE = 115200
 MAX_Y_VALUE = 3.0  # Batas atas nilai vertikal
+UI_FPS = 20  # Grafik, label dan log diperbarui bersamaan, sekali per frame
+MAX_LOG_LINES = 500  # Baris data mentah yang disimpan di log
+HISTORY_POINTS = 10000  # Sampel per kanal di jendela grafik, memori tetap berapa lama pun berjalan
+DECIMATION_MODE = "minmax"  # Jendela diperkecil ke ~2 titik per piksel; "minmax" menjaga puncak, "lttb" bentuk
+SPILL_FILE = None  # Mis. "serial_graph_{:%Y%m%d_%H%M%S}.bin": semua sampel juga direkam ke disk
+CHANNELS = ["A0", "A1", "A2"]
+SOURCE = "serial"  # Nama sumber di file rekaman, untuk sampel dan blok GAPS
 
 class SerialReader(threading.Thread):
-    def __init__(self, port, baudrate, callback):
+    def __init__(self, port, baudrate, callback, recorder=None):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
@@ -22,34 +40,29 @@ class SerialReader(threading.Thread):
         self.serial_conn = None
         self.running = True
 
+        # Format: "Diterima => A0: 0.6665 | A1: 0.0680 | A2: 1.0581 | Seq: 124"
+        self.parser = LabeledLineParser(("A0", "A1", "A2", "Seq"))
+        # Seq dari master_full_duplex2.ino (unsigned long): lompatan = sampel hilang, 0 = duplikat.
+        # Dengan recorder, setiap lompatan juga ditulis sebagai blok GAPS di file rekaman
+        self.integrity = IntegrityMonitor(bits=32, recorder=recorder)
+
     def run(self):
         try:
             self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=0.1)
             print(f"Terhubung ke {self.port} dengan baudrate {self.baudrate}")
             while self.running:
-                try:
-                    line = self.serial_conn.readline().decode().strip()
-                    if line:
-                        values = self.parse_serial_data(line)
-                        if values:
-                            self.callback(values, line)  # Kirim data mentah juga
-                except (ValueError, UnicodeDecodeError):
-                    continue
+                # Baca semua byte yang tersedia sekaligus, parse semua baris lengkap dalam satu batch
+                chunk = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+                if chunk:
+                    rows, lines = self.parser.feed(chunk)
+                    if len(rows):
+                        keep = self.integrity.check(SOURCE, rows[:, 3])
+                        if not keep.all():
+                            rows, lines = rows[keep], list(compress(lines, keep))
+                        self.callback(rows, lines)  # Kirim data mentah juga
         except serial.SerialException as e:
             print(f"Kesalahan Serial: {e}")
 
-    def parse_serial_data(self, line):
-        # Parsing data dengan format: "Diterima => A0: 0.6665 | A1: 0.0680 | A2: 1.0581 | Seq: 124" |\sSeq:\s(\d+
-        match = re.search(
-            r"A0:\s([-+]?\d*\.\d+)\s\|\sA1:\s([-+]?\d*\.\d+)\s\|\sA2:\s([-+]?\d*\.\d+)\s\|\sSeq:\s(\d+)",
-            line,
-        )
-        if match:
-            values = [float(match.group(1)), float(match.group(2)), float(match.group(3))]
-            seq = int(match.group(4))
-            return values, seq
-        return None
-
     def stop(self):
         self.running = False
         if self.serial_conn:
@@ -96,61 +109,76 @@ class RealtimeGraph(QMainWindow):
         }
 
         self.selected_data = "A0"  # Default pilihan A0
-        self.data_x = []
-        self.data_values = {"A0": [], "A1": [], "A2": []}
-        self.sequence_numbers = []  # Untuk menyimpan nomor urut
-
-        # TextEdit untuk menampilkan log data mentah
-        self.raw_data_log = QTextEdit()
+        # Jendela data berukuran tetap; data lama hanya tersimpan di file rekaman (jika SPILL_FILE diisi)
+        self.recorder = None
+        if SPILL_FILE:
+            self.recorder = Recorder(SPILL_FILE.format(datetime.now()), sources=[SOURCE], channels=CHANNELS, scale=1e-4)
+        self.history = WindowedHistory(HISTORY_POINTS, len(CHANNELS), dtype=np.float64,
+                                       recorder=self.recorder, source=SOURCE)
+        # Satu Decimator per kanal: hanya bucket yang tersentuh sampel baru yang dihitung ulang
+        self.decimators = {key: Decimator(self.graphWidget.width(), HISTORY_POINTS, DECIMATION_MODE) for key in CHANNELS}
+
+        # Log data mentah, hanya MAX_LOG_LINES baris terakhir yang disimpan
+        self.raw_data_log = QPlainTextEdit()
         self.raw_data_log.setReadOnly(True)
+        self.raw_data_log.setMaximumBlockCount(MAX_LOG_LINES)
         self.raw_data_log.setPlaceholderText("Data mentah akan ditampilkan di sini...")
         layout.addWidget(self.raw_data_log)
 
-        self.serial_thread = SerialReader(SERIAL_PORT, BAUD_RATE, self.store_data)
+        # Thread serial hanya mengisi buffer ini, GUI mengambilnya sekali per frame
+        self.ui_updates = UiUpdateBuffer(max_lines=MAX_LOG_LINES)
+
+        self.serial_thread = SerialReader(SERIAL_PORT, BAUD_RATE, self.store_data, recorder=self.recorder)
         self.serial_thread.start()
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_plot)
-        self.timer.start(100)
-
-    def store_data(self, values, raw_line):
-        if values:
-            values, seq = values
-            index = len(self.data_x)
-            self.data_x.append(index)
-            self.sequence_numbers.append(seq)
-            self.data_values["A0"].append(values[0])
-            self.data_values["A1"].append(values[1])
-            self.data_values["A2"].append(values[2])
-
-            # Update label dengan data terbaru di thread utama
-            QMetaObject.invokeMethod(
-                self.data_label,
-                "setText",
-                Q_ARG(str, f"Data Terbaru: A0: {values[0]:.4f} | A1: {values[1]:.4f} | A2: {values[2]:.4f} | Seq: {seq}")
-            )
-
-            # Tambahkan data mentah ke log di thread utama
-            QMetaObject.invokeMethod(
-                self.raw_data_log,
-                "append",
-                Q_ARG(str, raw_line)
-            )
+        self.timer.start(1000 // UI_FPS)
+
+    def store_data(self, rows, raw_lines):
+        """Simpan satu batch baris (n, 4): kolom A0, A1, A2, Seq."""
+        if len(rows):
+            self.history.extend(rows[:, :3])
+
+            # Label dan log diperbarui oleh timer GUI, tidak ada event Qt per baris
+            self.ui_updates.push(rows, raw_lines)
 
     def update_selected_data(self):
         self.selected_data = self.data_selector.currentText()
 
     def update_plot(self):
         # Hanya perbarui grafik untuk data yang dipilih
-        for key in self.curves:
+        first, values = self.history.snapshot()
+        x = np.arange(first, first + len(values))
+        for i, key in enumerate(CHANNELS):
             if key == self.selected_data:
-                self.curves[key].setData(self.data_x, self.data_values[key])
+                decimator = self.decimators[key]
+                decimator.resize(self.graphWidget.width())
+                self.curves[key].setData(*decimator.update(x, values[:, i], first))
             else:
                 self.curves[key].setData([], [])  # Sembunyikan data lainnya
+        self.update_status()
+
+    def update_status(self):
+        """Satu pembaruan label dan log per frame, berapa pun baris yang masuk."""
+        values, _, raw_lines = self.ui_updates.take()
+        if values is None:
+            return
+        bad = self.serial_thread.parser.bad_lines
+        loss = self.serial_thread.integrity.tracker(SOURCE).stats()
+        self.data_label.setText(
+            f"Data Terbaru: A0: {values[0]:.4f} | A1: {values[1]:.4f} | A2: {values[2]:.4f} | Seq: {int(values[3])} | Baris rusak: {bad} "
+            f"| Hilang: {loss['lost']} ({loss['loss_rate'] * 100:.2f}%, burst maks {loss['max_burst']})"
+        )
+        if raw_lines:
+            self.raw_data_log.appendPlainText("\n".join(raw_lines))
 
     def closeEvent(self, event):
         self.serial_thread.stop()
         self.timer.stop()
+        if self.recorder:
+            self.serial_thread.join(timeout=1.0)
+            self.recorder.close()
         event.accept()
 
 if __name__ == "__main__":
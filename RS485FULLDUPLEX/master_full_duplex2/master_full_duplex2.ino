@@ -6,6 +6,7 @@ unsigned long lastSumTime = 0;
 float receivedData[3];
 float sumData[3] = {0, 0, 0};
 int countSamples = 0;
+unsigned long requestSeq = 0;  // Nomor urut request, juga naik saat data gagal diterima (PC menghitung sebagai hilang)
 
 void setup() {
   Serial.begin(115200);
@@ -48,6 +49,7 @@ void sendRequest() {
 void receiveData() {
   byte buffer[12];
   int bytesRead = 0;
+  unsigned long seq = requestSeq++;
   unsigned long startTime = micros();
   
   while (bytesRead < 12 && (micros() - startTime) < 5000) { // Timeout 5ms
@@ -68,7 +70,7 @@ void receiveData() {
     Serial.print(" | A2: ");
     Serial.print(receivedData[2], 4);
     Serial.print(" | Seq: ");
-    Serial.println(countSamples + 1);
+    Serial.println(seq);
 
     sumData[0] += receivedData[0];
     sumData[1] += receivedData[1];
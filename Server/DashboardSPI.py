@@ -2,25 +2,51 @@ import sys
 import serial
 import threading
 import re
+import os
+from datetime import datetime
+import numpy as np
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QComboBox
 from PyQt5.QtCore import QTimer
 from pyqtgraph import PlotWidget, mkPen
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.frames import ADS1256_FRAME_CHANNELS, FrameParser
+from streamer.decimate import Decimator
+from streamer.integrity import IntegrityMonitor
+from streamer.recorder import Recorder
+from streamer.ring_buffer import WindowedHistory
+
 # Konfigurasi Serial
 SERIAL_PORT = "COM4"  # Sesuaikan dengan port serial Anda
 BAUD_RATE = 115200
 MAX_Y_VALUE = 3.0  # Batas atas nilai vertikal
 
+# Mode biner (Serial_Graph_ADS1256.ino dengan BINARY_FRAMES 1): sync + seq + A0..A2 int24 + CRC per sampel
+BINARY_FRAMES = False
+VOLTS_PER_CODE = 3.3 / 0x7FFFFF
+
+HISTORY_POINTS = 10000  # Sampel per kanal di jendela grafik, memori tetap berapa lama pun berjalan
+DECIMATION_MODE = "minmax"  # Jendela diperkecil ke ~2 titik per piksel; "minmax" menjaga puncak, "lttb" bentuk
+SPILL_FILE = None  # Mis. "dashboard_spi_{:%Y%m%d_%H%M%S}.bin": semua sampel juga direkam ke disk
+CHANNELS = ["A0", "A1", "A2"]
+SOURCE = "spi"  # Nama sumber di file rekaman, untuk sampel dan blok GAPS
+
 class SerialReader(threading.Thread):
-    def __init__(self, port, baudrate, callback):
+    def __init__(self, port, baudrate, callback, block_callback=None, recorder=None):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
         self.callback = callback
+        self.block_callback = block_callback  # Mode biner: dipanggil dengan array (n, 3) sekaligus
         self.serial_conn = None
         self.running = True
+        # Mode biner: frame hilang/duplikat dari nomor seq, lompatan juga ditulis ke recorder (blok GAPS)
+        self.integrity = IntegrityMonitor(bits=16, recorder=recorder)
 
     def run(self):
+        if BINARY_FRAMES:
+            self.run_binary()
+            return
         try:
             self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=0.1)
             print(f"Terhubung ke {self.port} dengan baudrate {self.baudrate}")
@@ -35,6 +61,27 @@ class SerialReader(threading.Thread):
         except serial.SerialException as e:
             print(f"Kesalahan Serial: {e}")
 
+    def run_binary(self):
+        parser = FrameParser(ADS1256_FRAME_CHANNELS, "i24")
+        try:
+            self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=0.05)
+            print(f"Terhubung ke {self.port} dengan baudrate {self.baudrate} (frame biner)")
+            while self.running:
+                # Ambil semua byte yang sudah ada, decode semua frame lengkap sekaligus
+                chunk = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+                seq, codes = parser.feed(chunk)
+                if len(codes):
+                    keep = self.integrity.check(SOURCE, seq)
+                    codes = codes[keep]
+                    values = np.minimum(codes * VOLTS_PER_CODE, MAX_Y_VALUE)
+                    if self.block_callback:
+                        self.block_callback(values)
+                    else:
+                        for row in values:
+                            self.callback(row)
+        except serial.SerialException as e:
+            print(f"Kesalahan Serial: {e}")
+
     def parse_serial_data(self, line):
         try:
             values = list(map(float, line.split(';')))
@@ -84,10 +131,18 @@ class RealtimeGraph(QMainWindow):
         }
 
         self.selected_data = "A1"  # Default pilihan A1
-        self.data_x = []
-        self.data_values = {"A0": [], "A1": [], "A2": []}
-
-        self.serial_thread = SerialReader(SERIAL_PORT, BAUD_RATE, self.store_data)
+        # Jendela data berukuran tetap; data lama hanya tersimpan di file rekaman (jika SPILL_FILE diisi)
+        self.recorder = None
+        if SPILL_FILE:
+            self.recorder = Recorder(SPILL_FILE.format(datetime.now()), sources=[SOURCE], channels=CHANNELS,
+                                     scale=VOLTS_PER_CODE)
+        self.history = WindowedHistory(HISTORY_POINTS, len(CHANNELS), dtype=np.float64,
+                                       recorder=self.recorder, source=SOURCE)
+        # Satu Decimator per kanal: hanya bucket yang tersentuh sampel baru yang dihitung ulang
+        self.decimators = {key: Decimator(self.graphWidget.width(), HISTORY_POINTS, DECIMATION_MODE) for key in CHANNELS}
+
+        self.serial_thread = SerialReader(SERIAL_PORT, BAUD_RATE, self.store_data, self.store_block,
+                                          recorder=self.recorder)
         self.serial_thread.start()
 
         self.timer = QTimer()
@@ -96,26 +151,36 @@ class RealtimeGraph(QMainWindow):
 
     def store_data(self, values):
         if len(values) == 3:
-            index = len(self.data_x)
-            self.data_x.append(index)
-            self.data_values["A0"].append(values[0])
-            self.data_values["A1"].append(values[1])
-            self.data_values["A2"].append(values[2])
+            self.history.append(values)
+
+    def store_block(self, values):
+        """Simpan blok (n, 3) dari mode biner."""
+        self.history.extend(values)
 
     def update_selected_data(self):
         self.selected_data = self.data_selector.currentText()
 
     def update_plot(self):
+        if BINARY_FRAMES:
+            loss = self.serial_thread.integrity.tracker(SOURCE).stats()
+            self.setWindowTitle(f"Real-time Serial Data - hilang {loss['lost']} ({loss['loss_rate'] * 100:.2f}%)")
         # Hanya perbarui grafik untuk data yang dipilih
-        for key in self.curves:
+        first, values = self.history.snapshot()
+        x = np.arange(first, first + len(values))
+        for i, key in enumerate(CHANNELS):
             if key == self.selected_data:
-                self.curves[key].setData(self.data_x, self.data_values[key])
+                decimator = self.decimators[key]
+                decimator.resize(self.graphWidget.width())
+                self.curves[key].setData(*decimator.update(x, values[:, i], first))
             else:
                 self.curves[key].setData([], [])  # Sembunyikan data lainnya
 
     def closeEvent(self, event):
         self.serial_thread.stop()
         self.timer.stop()
+        if self.recorder:
+            self.serial_thread.join(timeout=1.0)
+            self.recorder.close()
         event.accept()
 
 if __name__ == "__main__":
@@ -1,20 +1,42 @@
-import spidev
+import os
+import sys
 import time
 
-# Initialize SPIs
-spi = spidev.SpiDev()
-spi.open(0, 0)  # Open bus 0, device 0
-spi.max_speed_hz = 50000
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.spi_reader import FakeSpiDev, SpiReader, open_spi, spidev
 
-def spi_transfer(data):
-    response = spi.xfer2(data)
-    return response
+# Konfigurasi SPI
+SPI_BUS = 0
+SPI_DEVICE = 0
+SPI_SPEED_HZ = 8000000  # 8 MHz, sekitar 1 MB/s mentah
+SPI_MODE = 0
+TRANSFER_SIZE = 4096  # Byte per transfer (batas default spidev)
+PERIOD = 0.01  # Satu transfer tiap 10 ms jika tidak memakai pin DRDY
+NUM_CHANNELS = 3
+USE_FAKE_SPI = spidev is None  # Tanpa Raspberry Pi: slave palsu 10 kHz untuk uji tanpa hardware
 
-try:
-    while True:
-        send_data = [0x01, 0x02, 0x03]  # Example data to send
-        received_data = spi_transfer(send_data)
-        print(f"Sent: {send_data}, Received: {received_data}")
-        time.sleep(1)
-except KeyboardInterrupt:
-    spi.close()
\ No newline at end of file
+if __name__ == "__main__":
+    if USE_FAKE_SPI:
+        spi = FakeSpiDev(channels=NUM_CHANNELS, sample_rate=10000)
+        spi.open(SPI_BUS, SPI_DEVICE)
+        print("spidev tidak ada, memakai FakeSpiDev")
+    else:
+        spi = open_spi(SPI_BUS, SPI_DEVICE, SPI_SPEED_HZ, SPI_MODE)
+
+    reader = SpiReader(spi, channels=NUM_CHANNELS, transfer_size=TRANSFER_SIZE, period=PERIOD)
+    reader.start()
+    try:
+        while True:
+            time.sleep(1)
+            stats = reader.stats()
+            first, codes = reader.buffer.snapshot(1)
+            print(
+                f"{stats['frames_per_s']:.0f} frame/s, {stats['bytes_per_s'] / 1000:.0f} kB/s, "
+                f"CRC error {stats['crc_errors']}, hilang {stats['lost']}, terlambat {stats['late_transfers']}, "
+                f"terakhir {codes[-1].tolist() if len(codes) else '-'}"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.stop()
+        spi.close()
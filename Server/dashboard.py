@@ -1,33 +1,59 @@
-import socket
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "Python"))
+from streamer.udp_ingest import UdpIngest, UdpReceiver, open_udp_socket
+
 # Konfigurasi server
 UDP_IP = "0.0.0.0"  # Mendengarkan di semua antarmuka
 UDP_PORT = 5000     # Port yang digunakan (sesuai dengan pengaturan ESP32)
+RCVBUF_BYTES = 8 << 20  # Buffer kernel besar agar burst dari beberapa board tidak di-drop
+NUM_CHANNELS = 3
+BUFFER_SAMPLES = 100000  # Sampel terakhir yang disimpan per sumber
+REPORT_INTERVAL = 1.0  # Statistik dicetak per interval, bukan per paket
+# Stream = (IP, board id). Paket diurutkan ulang per stream; celah dianggap hilang setelah
+# REORDER_WINDOW paket tertahan atau MAX_REORDER_DELAY detik, jadi latensi tambahan terbatas
+REORDER_WINDOW = 32
+MAX_REORDER_DELAY = 0.05
+
 
-# Membuat socket UDP
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)  # Izinkan menerima broadcast
-sock.bind((UDP_IP, UDP_PORT))
+def report(ingest, previous, elapsed):
+    """Cetak paket/s, kB/s dan sampel/s per sumber sejak laporan sebelumnya."""
+    for source, counters in ingest.stats().items():
+        before = previous.get(source, dict.fromkeys(counters, 0))
+        print(
+            f"{source}: {(counters['packets'] - before['packets']) / elapsed:.0f} paket/s, "
+            f"{(counters['bytes'] - before['bytes']) / elapsed / 1000:.1f} kB/s, "
+            f"{(counters['samples'] - before['samples']) / elapsed:.0f} sampel/s, "
+            f"{counters['bad_packets']} paket rusak"
+        )
+        previous[source] = counters
+    for (source, board_id), stream in ingest.stream_stats().items():
+        print(
+            f"  board {board_id} @ {source}: hilang {stream.get('lost', 0)} "
+            f"({stream.get('loss_rate', 0.0) * 100:.2f}%), terlambat {stream['late']}, "
+            f"tertahan maks {stream['max_held']}"
+        )
 
-print(f"Server listening on {UDP_IP}:{UDP_PORT}")
 
-packet_count = 0
-last_time = time.time()
+if __name__ == "__main__":
+    # Paket diterima dan di-decode ke ring buffer di thread sendiri, tanpa print per paket
+    ingest = UdpIngest(channels=NUM_CHANNELS, capacity=BUFFER_SAMPLES,
+                       window=REORDER_WINDOW, max_delay=MAX_REORDER_DELAY)
+    receiver = UdpReceiver(ingest, open_udp_socket(UDP_IP, UDP_PORT, RCVBUF_BYTES))
+    receiver.start()
+    print(f"Server listening on {UDP_IP}:{UDP_PORT}")
 
-while True:
+    previous = {}
+    last_time = time.monotonic()
     try:
-        data, addr = sock.recvfrom(1024)  # Buffer size 1024 bytes
-        packet_count += 1
-        print(f"Received message: {data.decode()} from {addr}")
-        
-        current_time = time.time()
-        if current_time - last_time >= 1:  # Hitung per detik
-            print(f"Packets received in the last second: {packet_count}")
-            packet_count = 0
-            last_time = current_time
+        while True:
+            time.sleep(REPORT_INTERVAL)
+            now = time.monotonic()
+            report(ingest, previous, now - last_time)
+            last_time = now
     except KeyboardInterrupt:
         print("\nServer shutting down.")
-        break
-    except Exception as e:
-        print(f"Error: {e}")
+    finally:
+        receiver.stop()
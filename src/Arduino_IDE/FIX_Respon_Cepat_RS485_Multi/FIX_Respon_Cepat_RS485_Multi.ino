@@ -11,9 +11,28 @@
 #define TX_PIN 17
 #define DE_RE_PIN 4  
 
+// Block mode register map
+// Hreg 0..3 : sampel terbaru A0..A3 (mode lama, satu sampel per transaksi)
+// Hreg 4    : jumlah sampel valid di dalam blok
+// Hreg 5    : nomor urut (16 bit) sampel pertama di dalam blok
+// Hreg 6..  : BLOCK_SAMPLES x 4 kanal, urutan A0, A1, A2, A3 per sampel
+// Satu FC03 dari Hreg 4 dengan 2 + N * 4 register mengambil N sampel pertama dari blok (maks 30, 125 register).
+// Hanya sampel yang ikut terbaca yang dibuang, sisanya digeser ke depan dan Hreg 5 maju N.
+#define NUM_CHANNELS 4
+#define BLOCK_COUNT_REG 4
+#define BLOCK_SEQ_REG 5
+#define BLOCK_DATA_REG 6
+#define BLOCK_SAMPLES 30
+
 ModbusRTU mb;
 uint16_t analogValues[4] = {0, 0, 0, 0};  // Array untuk menyimpan nilai A0, A1, A2, A3
 
+uint16_t blockCount = 0;       // Jumlah sampel yang sudah ada di blok
+uint16_t sampleSeq = 0;        // Nomor urut sampel berikutnya
+bool blockDrained = false;     // Diset saat master membaca register jumlah sampel
+uint16_t blockSamplesRead = 0; // Sampel blok yang ikut terbaca oleh FC03 terakhir
+unsigned long blockOverflow = 0;  // Sampel yang dibuang karena blok penuh
+
 unsigned long lastReadMillis = 0;  // Waktu pembacaan terakhir
 unsigned long sampleCount = 0;  // Hitungan sampel per detik
 
@@ -33,6 +52,13 @@ void setup() {
     Serial.printf("Register %d added with initial value: %d\n", i, analogValues[i]);
   }
 
+  // Register untuk block mode
+  mb.addHreg(BLOCK_COUNT_REG, 0);
+  mb.addHreg(BLOCK_SEQ_REG, 0);
+  mb.addHreg(BLOCK_DATA_REG, 0, BLOCK_SAMPLES * NUM_CHANNELS);
+  mb.onGetHreg(BLOCK_COUNT_REG, cbBlockRead);
+  mb.onGetHreg(BLOCK_DATA_REG, cbBlockData, BLOCK_SAMPLES * NUM_CHANNELS);
+
   // Initialize SPI dan ADS1256
   SPI.begin();
   pinMode(CS, OUTPUT);
@@ -50,6 +76,7 @@ void loop() {
   
   if (currentMillis - lastReadMillis >= 1) {
     readsensorads();
+    pushBlockSample();
     sampleCount++;  // Hitung jumlah sampel setiap kali membaca sensor
     lastReadMillis = currentMillis;  // Catat waktu pembacaan terakhir
   }
@@ -58,6 +85,8 @@ void loop() {
   if (currentMillis - lastReadMillis >= 1000) {  // Setiap 1 detik
     Serial.print("Samples per second: ");
     Serial.println(sampleCount);
+    Serial.print("Block overflow: ");
+    Serial.println(blockOverflow);
     sampleCount = 0;  // Reset hitungan sampel
   }
 
@@ -68,9 +97,64 @@ void loop() {
 
   // Handle komunikasi Modbus
   mb.task();
+
+  // Seluruh respon sudah dibangun di dalam mb.task(), sampel yang terbaca aman dibuang
+  if (blockDrained) {
+    drainBlock(min(blockSamplesRead, blockCount));
+    blockDrained = false;
+    blockSamplesRead = 0;
+  }
   yield();
 }
 
+// Simpan sampel terbaru ke blok, dibaca master sekaligus dengan satu FC03
+void pushBlockSample() {
+  if (blockCount >= BLOCK_SAMPLES) {
+    blockOverflow++;
+    sampleSeq++;  // Sampel tetap diberi nomor agar master bisa menghitung yang hilang
+    return;
+  }
+  if (blockCount == 0) {
+    mb.Hreg(BLOCK_SEQ_REG, sampleSeq);
+  }
+  for (int i = 0; i < NUM_CHANNELS; i++) {
+    mb.Hreg(BLOCK_DATA_REG + blockCount * NUM_CHANNELS + i, analogValues[i]);
+  }
+  blockCount++;
+  sampleSeq++;
+  mb.Hreg(BLOCK_COUNT_REG, blockCount);
+}
+
+// Buang n sampel pertama dari blok, sisanya digeser ke awal
+void drainBlock(uint16_t n) {
+  if (n == 0) {
+    return;
+  }
+  for (uint16_t s = n; s < blockCount; s++) {
+    for (int i = 0; i < NUM_CHANNELS; i++) {
+      mb.Hreg(BLOCK_DATA_REG + (s - n) * NUM_CHANNELS + i, mb.Hreg(BLOCK_DATA_REG + s * NUM_CHANNELS + i));
+    }
+  }
+  blockCount -= n;
+  mb.Hreg(BLOCK_SEQ_REG, mb.Hreg(BLOCK_SEQ_REG) + n);
+  mb.Hreg(BLOCK_COUNT_REG, blockCount);
+}
+
+// Dipanggil library saat register jumlah sampel dibaca oleh master
+uint16_t cbBlockRead(TRegister* reg, uint16_t val) {
+  blockDrained = true;
+  return val;
+}
+
+// Dipanggil library untuk setiap register data yang dibaca: catat sampel terakhir yang ikut terbaca
+uint16_t cbBlockData(TRegister* reg, uint16_t val) {
+  uint16_t sample = (reg->address.address - BLOCK_DATA_REG) / NUM_CHANNELS + 1;
+  if (sample > blockSamplesRead) {
+    blockSamplesRead = sample;
+  }
+  return val;
+}
+
 // Fungsi untuk membaca sensor ADS1256
 void readsensorads() {
   analogValues[0] = (uint16_t)(readSingleEndedChannel(0) * 1000);  // Convert to mV
@@ -5,6 +5,14 @@
 #define RDY 21  
 #define SPISPEED 2500000  
 
+// 1 = kirim frame biner (sync A5 5A, seq uint16, 3 x int24, CRC16 Modbus, little endian),
+// 0 = teks "A0;A1;A2". Lihat src/Python/streamer/frames.py
+#define BINARY_FRAMES 0
+#define NUM_CHANNELS 3  // Harus sama dengan ADS1256_FRAME_CHANNELS di streamer/frames.py
+#define FRAME_SIZE (2 + 2 + 3 * NUM_CHANNELS + 2)
+
+uint16_t frameSeq = 0;             // Nomor urut frame biner
+
 unsigned long previousMillis = 0;   // Menyimpan waktu sebelumnya untuk debug
 unsigned long lastReadMillis = 0;  // Menyimpan waktu pembacaan terakhir
 unsigned long sampleCount = 0;     // Hitungan jumlah sampel per detik
@@ -17,7 +25,9 @@ void setup() {
   pinMode(RDY, INPUT);
 
   configureADS1256();
+#if !BINARY_FRAMES
   Serial.println("System initialized. Starting readings...");
+#endif
 }
 
 void loop() {
@@ -32,8 +42,10 @@ void loop() {
 
   // Tampilkan jumlah sampel per detik setiap 1 detik
   if (currentMillis - previousMillis >= 1000) {
+#if !BINARY_FRAMES
     Serial.print("Samples per second: ");
     Serial.println(sampleCount);
+#endif
     sampleCount = 0;  // Reset hitungan sampel
     previousMillis = currentMillis;
   }
@@ -71,7 +83,45 @@ void writeRegister(byte reg, byte value) {
   delayMicroseconds(100);
 }
 
+uint16_t crc16(const uint8_t *data, uint8_t length) {
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 1) ? (crc >> 1) ^ 0xA001 : crc >> 1;
+    }
+  }
+  return crc;
+}
+
+void sendFrame(const long *codes) {
+  uint8_t frame[FRAME_SIZE];
+  uint8_t n = 0;
+  frame[n++] = 0xA5;
+  frame[n++] = 0x5A;
+  frame[n++] = frameSeq & 0xFF;
+  frame[n++] = frameSeq >> 8;
+  for (uint8_t ch = 0; ch < NUM_CHANNELS; ch++) {
+    frame[n++] = codes[ch] & 0xFF;
+    frame[n++] = (codes[ch] >> 8) & 0xFF;
+    frame[n++] = (codes[ch] >> 16) & 0xFF;
+  }
+  uint16_t crc = crc16(frame + 2, n - 2);
+  frame[n++] = crc & 0xFF;
+  frame[n++] = crc >> 8;
+  Serial.write(frame, n);
+  frameSeq++;
+}
+
 void readsensorads() {
+#if BINARY_FRAMES
+  long codes[NUM_CHANNELS];
+  for (uint8_t ch = 0; ch < NUM_CHANNELS; ch++) {
+    codes[ch] = readRawChannel(ch);
+  }
+  sendFrame(codes);
+  return;
+#endif
   float voltageA0 = readSingleEndedChannel(0);
   float voltageA1 = readSingleEndedChannel(1);
   float voltageA2 = readSingleEndedChannel(2);
@@ -85,6 +135,11 @@ void readsensorads() {
 }
 
 float readSingleEndedChannel(byte channel) {
+  // Konversi ke tegangan (asumsi referensi tegangan adalah 3.3V)
+  return readRawChannel(channel) * (3.3 / 0x7FFFFF);
+}
+
+long readRawChannel(byte channel) {
   SPI.beginTransaction(SPISettings(SPISPEED, MSBFIRST, SPI_MODE1));
   digitalWrite(CS, LOW);
 
@@ -115,12 +170,9 @@ float readSingleEndedChannel(byte channel) {
   digitalWrite(CS, HIGH);
   SPI.endTransaction();
 
-  // Konversi nilai mentah menjadi tegangan
+  // Konversi nilai mentah ke signed
   if (rawValue & 0x800000) { // Jika nilai negatif
     rawValue -= 16777216;    // Konversi ke dua's complement
   }
-
-  // Konversi ke tegangan (asumsi referensi tegangan adalah 3.3V)
-  float voltage = rawValue * (3.3 / 0x7FFFFF);
-  return voltage;
+  return rawValue;
 }
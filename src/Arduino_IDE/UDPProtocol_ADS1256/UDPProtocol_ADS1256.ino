@@ -18,6 +18,18 @@ EthernetUDP Udp;
 IPAddress remoteIP(255, 255, 255, 255);  // Replace with the IP of the laptop or server
 const unsigned int remotePort = 5000;   // Port to send data to
 
+// 1 = kirim paket biner berisi PACKET_SAMPLES sampel (lihat src/Python/streamer/udp_ingest.py),
+// 0 = satu baris teks per paket
+#define BINARY_PACKETS 0
+#define BOARD_ID 1           // Unik per board, dipakai server untuk memisahkan stream
+#define NUM_CHANNELS 3
+#define PACKET_SAMPLES 32
+#define PACKET_HEADER_SIZE 12
+
+uint8_t sampleBuffer[PACKET_HEADER_SIZE + PACKET_SAMPLES * NUM_CHANNELS * 4];
+uint16_t bufferedSamples = 0;
+uint32_t packetSeq = 0;
+
 void setup() {
   Serial.begin(115200);
   delay(500);
@@ -47,6 +59,14 @@ void setup() {
 }
 
 void loop() {
+#if BINARY_PACKETS
+  long codes[NUM_CHANNELS];
+  for (uint8_t ch = 0; ch < NUM_CHANNELS; ch++) {
+    codes[ch] = readRawChannel(ch);
+  }
+  bufferSample(codes);
+  return;
+#endif
   // Read analog values from A0, A1, and A2 (Potentiometers)
   float voltageA0 = readSingleEndedChannel(0); // Channel 0 corresponds to AIN0
   float voltageA1 = readSingleEndedChannel(1); // Channel 1 corresponds to AIN1
@@ -72,6 +92,30 @@ void loop() {
   delay(1);  // Minimal delay for sending data
 }
 
+// Simpan satu sampel, kirim paket saat PACKET_SAMPLES sampel terkumpul
+void bufferSample(const long *codes) {
+  uint8_t *data = sampleBuffer + PACKET_HEADER_SIZE + bufferedSamples * NUM_CHANNELS * 4;
+  memcpy(data, codes, NUM_CHANNELS * 4);  // ESP32 little endian, long = int32
+  if (++bufferedSamples < PACKET_SAMPLES) {
+    return;
+  }
+  // Header: "HY", board id, channels, seq uint32, samples uint16, reserved uint16
+  sampleBuffer[0] = 'H';
+  sampleBuffer[1] = 'Y';
+  sampleBuffer[2] = BOARD_ID;
+  sampleBuffer[3] = NUM_CHANNELS;
+  memcpy(sampleBuffer + 4, &packetSeq, 4);
+  memcpy(sampleBuffer + 8, &bufferedSamples, 2);
+  sampleBuffer[10] = 0;
+  sampleBuffer[11] = 0;
+  if (Udp.beginPacket(remoteIP, remotePort)) {
+    Udp.write(sampleBuffer, sizeof(sampleBuffer));
+    Udp.endPacket();
+  }
+  packetSeq++;  // Juga naik jika gagal kirim, server menghitungnya sebagai paket hilang
+  bufferedSamples = 0;
+}
+
 // Function to configure ADS1256
 void configureADS1256() {
   SPI.beginTransaction(SPISettings(SPISPEED, MSBFIRST, SPI_MODE1));
@@ -108,6 +152,11 @@ void writeRegister(byte reg, byte value) {
 
 // Function to read single-ended channel
 float readSingleEndedChannel(byte channel) {
+  return readRawChannel(channel) * (3.3 / (0x7FFFFF)); // Assuming reference voltage is 3.3V
+}
+
+// Signed 24-bit ADC code of one channel
+long readRawChannel(byte channel) {
   SPI.beginTransaction(SPISettings(SPISPEED, MSBFIRST, SPI_MODE1));
   digitalWrite(CS, LOW);
 
@@ -138,13 +187,10 @@ float readSingleEndedChannel(byte channel) {
   digitalWrite(CS, HIGH);
   SPI.endTransaction();
 
-  // Convert raw value to voltage
   if (rawValue & 0x800000) {
     rawValue |= 0xFF000000; // Sign extend for negative values
   }
-
-  float voltage = rawValue * (3.3 / (0x7FFFFF)); // Assuming reference voltage is 3.3V
-  return voltage;
+  return rawValue;
 }
 
 void WizReset() {
@@ -4,31 +4,53 @@ from pymodbus.exceptions import ModbusException, ConnectionException
 from pymodbus.pdu import ExceptionResponse
 import logging
 import sys
-from datetime import datetime
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtWidgets, QtCore
 import threading
 import time
-
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("modbus_master_graph.log"),
-    ],
-)
+import numpy as np
+from streamer.async_logging import SampleSummaryLogger, setup_async_logging
+from streamer.decode import RegisterDecoder
+from streamer.integrity import IntegrityMonitor
+from streamer.latency import RttTracker
+from streamer.rtu import RtuError, RtuTimeout, RtuTransport
+from streamer.ring_buffer import RingBuffer
+from streamer.scheduler import PollScheduler
+
+# Logging configuration: formatting and file I/O run on a background QueueListener
+setup_async_logging("modbus_master_graph.log")
+sample_log = SampleSummaryLogger(interval=5.0)  # One summary line per slave every 5 s
 
 # Global variables
-data = {}  # Store data for each slave
-lock = threading.Lock()
+data = {}  # RingBuffer of A0..A3 samples for each slave, written only by the Modbus thread
+MAX_POINTS = 500  # Samples kept per slave for plotting
 data_count = 0  # Total count of incoming data
 start_time = time.time()  # Track start time for data rate calculation
 register_counts = {"A0": 0, "A1": 0, "A2": 0, "A3": 0}  # Track counts for each register
+scheduler = None  # PollScheduler owning the bus, created in modbus_main
+
+# Block mode register map (see FIX_Respon_Cepat_RS485_Multi.ino)
+NUM_CHANNELS = 4
+BLOCK_COUNT_REGISTER = 4  # Number of valid samples in the block
+BLOCK_SEQ_REGISTER = 5  # 16-bit sequence number of the first sample in the block
+BLOCK_DATA_REGISTER = 6  # Start of the sample block, A0..A3 per sample
+MAX_REGISTERS_PER_READ = 125  # FC03 limit
+MAX_BLOCK_SAMPLES = (MAX_REGISTERS_PER_READ - 2) // NUM_CHANNELS
+SLAVE_TURNAROUND = 0.002  # Seconds the slave needs before it starts replying
+
+
+def transaction_time(baudrate, block_samples, registers_per_sample=NUM_CHANNELS):
+    """Seconds of bus time for one FC03 block read of block_samples samples (8N1, 10 bits per byte)."""
+    request = 8  # Address, function, start, count, CRC
+    reply = 5 + 2 * (2 + block_samples * registers_per_sample)  # Address, function, byte count, registers, CRC
+    silence = 2 * 3.5  # t3.5 frame gap after request and reply
+    return (request + reply + silence) * 10 / baudrate + SLAVE_TURNAROUND
+
 
 class ModbusRTUMaster:
-    def __init__(self, port, slave_ids, baudrate=9600, timeout=3, max_retries=5, retry_delay=1):
+    def __init__(self, port, slave_ids, baudrate=9600, timeout=3, max_retries=5, retry_delay=1, block_samples=0,
+                 adaptive_timeout=True, timeout_floor=0.005, timeout_margin=3.0, transport="pymodbus",
+                 decoder=None, sample_rate=None, backlog_margin=1.25):
         self.port = port
         self.slave_ids = slave_ids
         self.baudrate = baudrate
@@ -37,6 +59,32 @@ class ModbusRTUMaster:
         self.connected = False
         self.max_retries = max_retries  # Max retries for connection
         self.retry_delay = retry_delay  # Delay between retries
+        # 0 reads one sample per transaction, N > 0 drains up to N buffered samples per transaction.
+        # Keep N equal to BLOCK_SAMPLES in the firmware; the slave drops only the samples a read covered.
+        self.block_samples = block_samples
+        self.block_seq = {}  # Sequence number of the first sample of the last block, per slave
+        # With the firmware sample_rate known, a read asks only for the samples expected since the last
+        # read (times backlog_margin) instead of the full block; the slave drains just what was read.
+        self.sample_rate = sample_rate
+        self.backlog_margin = backlog_margin
+        self.last_block = {}  # monotonic time of the last block read, per slave
+        self.block_left = {}  # Samples the last read left in the slave buffer, per slave
+        # Gaps in the block sequence numbers are samples lost to overflow or to a failed read
+        self.integrity = IntegrityMonitor(bits=16)
+        # With adaptive_timeout, each slave gets p99(RTT) * timeout_margin clamped to
+        # [timeout_floor, timeout]; the fixed timeout is then only the ceiling.
+        self.adaptive_timeout = adaptive_timeout
+        self.timeout_floor = timeout_floor
+        self.timeout_margin = timeout_margin
+        self.rtt = {}  # RttTracker per slave
+        # "pymodbus" uses AsyncModbusSerialClient, "native" the slim RtuTransport framer
+        if transport not in ("pymodbus", "native"):
+            raise ValueError(f"Unknown transport: {transport}")
+        self.transport = transport
+        # Registers are millivolts unless the firmware says otherwise
+        self.decoder = decoder or RegisterDecoder(NUM_CHANNELS, "u16", scale=0.001)
+        if block_samples < 0 or 2 + block_samples * self.decoder.registers_per_sample > MAX_REGISTERS_PER_READ:
+            raise ValueError(f"A block of {block_samples} samples does not fit in one FC03 read")
 
     async def connect(self):
         """Establish connection to Modbus RTU device."""
@@ -46,14 +94,17 @@ class ModbusRTUMaster:
         retries = 0
         while retries < self.max_retries:
             try:
-                self.client = AsyncModbusSerialClient(
-                    port=self.port,
-                    baudrate=self.baudrate,
-                    bytesize=8,
-                    parity="N",
-                    stopbits=1,
-                    timeout=self.timeout,
-                )
+                if self.transport == "native":
+                    self.client = RtuTransport(self.port, baudrate=self.baudrate, timeout=self.timeout)
+                else:
+                    self.client = AsyncModbusSerialClient(
+                        port=self.port,
+                        baudrate=self.baudrate,
+                        bytesize=8,
+                        parity="N",
+                        stopbits=1,
+                        timeout=self.timeout,
+                    )
                 self.connected = await self.client.connect()
                 if self.connected:
                     logging.info(f"Connected to {self.port}")
@@ -77,25 +128,70 @@ class ModbusRTUMaster:
             self.connected = False
             logging.info("Disconnected from Modbus RTU device")
 
+    def slave_timeout(self, slave_id):
+        """Current per-transaction timeout for a slave in seconds."""
+        if not self.adaptive_timeout:
+            return self.timeout
+        return self._rtt_tracker(slave_id).timeout()
+
+    def latency_stats(self):
+        """p50/p99 round-trip time and current timeout per slave."""
+        return {slave_id: tracker.stats() for slave_id, tracker in self.rtt.items()}
+
+    def _rtt_tracker(self, slave_id):
+        if slave_id not in self.rtt:
+            self.rtt[slave_id] = RttTracker(
+                margin=self.timeout_margin, floor=self.timeout_floor, ceiling=self.timeout
+            )
+        return self.rtt[slave_id]
+
+    async def _read_registers(self, slave_id, address, count):
+        """Timed FC03 read returning the register values.
+
+        Raises asyncio.TimeoutError past the slave's timeout. The native
+        transport returns a NumPy view that is only valid until the next read.
+        """
+        tracker = self._rtt_tracker(slave_id)
+        timeout = self.slave_timeout(slave_id)
+        start = time.perf_counter()
+        try:
+            if self.transport == "native":
+                registers = await self.client.read_holding_registers(
+                    address=address, count=count, slave=slave_id, timeout=timeout
+                )
+            else:
+                response = await asyncio.wait_for(
+                    self.client.read_holding_registers(address=address, count=count, slave=slave_id),
+                    timeout=timeout,
+                )
+        except (asyncio.TimeoutError, RtuTimeout):
+            tracker.record_timeout()
+            raise asyncio.TimeoutError()
+        tracker.add(time.perf_counter() - start)
+
+        if self.transport == "native":
+            return registers
+        if isinstance(response, ExceptionResponse):
+            raise ModbusException(f"Slave {slave_id} returned exception: {response}")
+        if not hasattr(response, "registers"):
+            raise ModbusException("Invalid response format")
+        return response.registers
+
     async def read_voltages(self, slave_id):
         """Read holding registers from a specific slave."""
         try:
             if not self.connected:
                 await self.connect()
 
-            response = await self.client.read_holding_registers(
-                address=0, count=4, slave=slave_id
-            )
+            registers = await self._read_registers(slave_id, address=0, count=self.decoder.registers_per_sample)
 
-            if isinstance(response, ExceptionResponse):
-                raise ModbusException(f"Slave {slave_id} returned exception: {response}")
-
-            if hasattr(response, "registers"):
-                # Decode values into voltages
-                voltages = [value / 1000.0 for value in response.registers]
-                return voltages
-            else:
-                raise ModbusException("Invalid response format")
+            # Decode values into voltages
+            return self.decoder.decode(registers)[0]
+        except asyncio.TimeoutError:
+            # A lost frame is not a broken port, keep the connection
+            logging.warning(f"Slave {slave_id} timed out after {self.slave_timeout(slave_id) * 1000:.1f} ms")
+        except RtuError as e:
+            logging.error(f"Bad frame from slave {slave_id}: {str(e)}")
         except (ConnectionException, ModbusException) as e:
             logging.error(f"Error reading from slave {slave_id}: {str(e)}")
             self.connected = False
@@ -103,41 +199,84 @@ class ModbusRTUMaster:
             logging.error(f"Unexpected error: {str(e)}")
         return None
 
+    def expected_backlog(self, slave_id):
+        """Samples to request from a slave: the backlog since its last read, 1..block_samples."""
+        last = self.last_block.get(slave_id)
+        if not self.sample_rate or last is None:
+            return self.block_samples
+        expected = self.block_left.get(slave_id, 0) + (time.monotonic() - last) * self.sample_rate * self.backlog_margin
+        return max(1, min(self.block_samples, int(np.ceil(expected))))
 
-async def modbus_main(master):
-    """Main loop for reading data from slaves."""
-    global data_count, start_time, register_counts
-    try:
-        while True:
-            for slave_id in master.slave_ids:
-                voltages = await master.read_voltages(slave_id)
-                if voltages:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    logging.info(
-                        f"Slave ID: {slave_id} | Time: {timestamp} | Voltages: {voltages}"
-                    )
+    async def read_block(self, slave_id):
+        """Drain the buffered samples of a slave with a single FC03 read.
 
-                    with lock:
-                        if slave_id not in data:
-                            data[slave_id] = {"x": [], "A0": [], "A1": [], "A2": [], "A3": []}
+        Returns a (samples, 4) array of A0..A3 voltages (no rows when the
+        slave has no new samples) or None on error.
+        """
+        try:
+            if not self.connected:
+                await self.connect()
 
-                        x = data[slave_id]["x"][-1] + 1 if data[slave_id]["x"] else 0
-                        data[slave_id]["x"].append(x)
-                        for i, key in enumerate(["A0", "A1", "A2", "A3"]):
-                            data[slave_id][key].append(voltages[i])
-                            register_counts[key] += 1  # Increment count for each register
+            requested = self.expected_backlog(slave_id)
+            registers = await self._read_registers(
+                slave_id, address=BLOCK_COUNT_REGISTER, count=2 + requested * self.decoder.registers_per_sample
+            )
+            self.last_block[slave_id] = time.monotonic()
+
+            count = min(int(registers[0]), requested)
+            self.block_left[slave_id] = int(registers[0]) - count
+            self.block_seq[slave_id] = int(registers[1])
+            samples = self.decoder.decode(registers[2:2 + count * self.decoder.registers_per_sample])
+            keep = self.integrity.check_block(slave_id, self.block_seq[slave_id], count)
+            return samples[keep]
+        except asyncio.TimeoutError:
+            # A lost frame is not a broken port, keep the connection
+            logging.warning(f"Slave {slave_id} timed out after {self.slave_timeout(slave_id) * 1000:.1f} ms")
+        except RtuError as e:
+            logging.error(f"Bad frame from slave {slave_id}: {str(e)}")
+        except (ConnectionException, ModbusException) as e:
+            logging.error(f"Error reading block from slave {slave_id}: {str(e)}")
+            self.connected = False
+        except Exception as e:
+            logging.error(f"Unexpected error: {str(e)}")
+        return None
 
-                        # Keep only the last 500 points
-                        max_points = 500
-                        for key in ["x", "A0", "A1", "A2", "A3"]:
-                            data[slave_id][key] = data[slave_id][key][-max_points:]
 
-            await asyncio.sleep(0.001)  # Polling interval
+def store_samples(slave_id, samples):
+    """Append a (samples, 4) array of A0..A3 voltages to the plot data of a slave."""
+    if not len(samples):
+        return
+    sample_log.record(slave_id, samples)
+
+    if slave_id not in data:
+        data[slave_id] = RingBuffer(MAX_POINTS, NUM_CHANNELS)
+
+    # Single writer: the GUI reads with snapshot() and never blocks this thread
+    data[slave_id].extend(samples)
+    for key in ["A0", "A1", "A2", "A3"]:
+        register_counts[key] += len(samples)  # Increment count for each register
+
+
+async def modbus_main(master, poll_rates):
+    """Poll the slaves earliest-deadline-first at their own target rates (Hz)."""
+    global scheduler
+
+    async def poll(slave_id):
+        if master.block_samples:
+            return await master.read_block(slave_id)
+        voltages = await master.read_voltages(slave_id)
+        return voltages[np.newaxis, :] if voltages is not None else None
+
+    scheduler = PollScheduler(poll, on_result=store_samples, samples_in=len)
+    for slave_id in master.slave_ids:
+        scheduler.add_slave(slave_id, poll_rates[slave_id], timeout=master.timeout)
+    try:
+        await scheduler.run()
     except Exception as e:
         logging.error(f"Error in Modbus loop: {str(e)}")
 
 
-def pyqtgraph_main(slave_ids):
+def pyqtgraph_main(slave_ids, master):
     """Display data using PyQtGraph."""
     global data, data_count, register_counts
 
@@ -181,21 +320,45 @@ def pyqtgraph_main(slave_ids):
         selected_slave_index = dropdown.currentIndex()
         selected_slave_id = slave_ids[selected_slave_index]
 
-        with lock:
-            if selected_slave_id in data:
-                for key in ["A0", "A1", "A2", "A3"]:
-                    curves[key].setData(data[selected_slave_id]["x"], data[selected_slave_id][key])
-
-                # Calculate data rate
-                elapsed_time = time.time() - start_time
-                total_data = sum(register_counts.values())
-                rate_label.setText(
-                    f"A0 Rate: {register_counts['A0'] / elapsed_time:.2f} points/s\n"
-                    f"A1 Rate: {register_counts['A1'] / elapsed_time:.2f} points/s\n"
-                    f"A2 Rate: {register_counts['A2'] / elapsed_time:.2f} points/s\n"
-                    f"A3 Rate: {register_counts['A3'] / elapsed_time:.2f} points/s\n"
-                    f"Total Rate: {total_data / elapsed_time:.2f} points/s\n"
-                )
+        if selected_slave_id in data:
+            first, values = data[selected_slave_id].snapshot()
+            x = np.arange(first, first + len(values))
+            for i, key in enumerate(["A0", "A1", "A2", "A3"]):
+                curves[key].setData(x, values[:, i])
+
+            # Calculate data rate
+            elapsed_time = time.time() - start_time
+            total_data = sum(register_counts.values())
+            poll_text = ""
+            latency = master.latency_stats()
+            if scheduler:
+                for slave_id, stats in scheduler.stats().items():
+                    poll_text += (
+                        f"Slave {slave_id} Poll: {stats['achieved_hz']:.1f}/{stats['scheduled_hz']:.1f}"
+                        f"/{stats['requested_hz']:.1f} Hz "
+                        f"({stats['samples_per_s']:.0f} samples/s, {stats['deadline_misses']} late, "
+                        f"{stats['failures']} failed)"
+                    )
+                    loss = master.integrity.stats().get(slave_id)
+                    if loss:
+                        poll_text += f" Lost: {loss['lost']} ({loss['loss_rate'] * 100:.2f}%, max burst {loss['max_burst']})"
+                    if latency.get(slave_id, {}).get("p99") is not None:
+                        rtt = latency[slave_id]
+                        poll_text += (
+                            f" RTT p50/p99: {rtt['p50'] * 1000:.1f}/{rtt['p99'] * 1000:.1f} ms, "
+                            f"timeout {rtt['timeout'] * 1000:.1f} ms"
+                        )
+                    poll_text += "\n"
+                if scheduler.load is not None:
+                    poll_text += f"Bus load: {scheduler.load * 100:.0f}% of the requested rates\n"
+            rate_label.setText(
+                f"A0 Rate: {register_counts['A0'] / elapsed_time:.2f} points/s\n"
+                f"A1 Rate: {register_counts['A1'] / elapsed_time:.2f} points/s\n"
+                f"A2 Rate: {register_counts['A2'] / elapsed_time:.2f} points/s\n"
+                f"A3 Rate: {register_counts['A3'] / elapsed_time:.2f} points/s\n"
+                f"Total Rate: {total_data / elapsed_time:.2f} points/s\n"
+                + poll_text
+            )
 
     timer = QtCore.QTimer()
     timer.timeout.connect(update)
@@ -206,16 +369,30 @@ def pyqtgraph_main(slave_ids):
 
 if __name__ == "__main__":
     slave_ids = [1, 2, 3]  # Set slave IDs here
+    for slave_id in slave_ids:
+        data[slave_id] = RingBuffer(MAX_POINTS, NUM_CHANNELS)
+    # Bus budget at 115200 baud: a full 30-sample block read is 8 + 249 bytes + gaps + turnaround
+    # = transaction_time(115200, 30) ~ 25 ms, so 3 slaves x 10 Hz x 25 ms = 0.75 s of bus time per
+    # second (must stay below 1 s). That carries 300 of the 1000 samples/s each slave produces; to
+    # keep all of them every slave needs >= 34 polls/s (30-sample buffer at 1 kHz), i.e. 460800 baud
+    # (3 x 34 x 7.7 ms = 0.79 s), fewer slaves on the bus or a lower firmware sample rate.
+    poll_rates = {slave_id: 10 for slave_id in slave_ids}  # Target polls per second for each slave
+    bus_load = sum(rate * transaction_time(115200, MAX_BLOCK_SAMPLES) for rate in poll_rates.values())
+    if bus_load >= 1.0:
+        logging.warning(f"Poll rates need {bus_load:.2f} s of bus time per second, the bus cannot keep up")
     master = ModbusRTUMaster(
         port="COM15",  # Set the correct COM port
         slave_ids=slave_ids,
         baudrate=115200,
-        timeout=0.1,
+        timeout=0.1,  # Ceiling for the adaptive per-slave timeout
+        block_samples=MAX_BLOCK_SAMPLES,  # Set to 0 for slaves running the single-sample firmware
+        sample_rate=1000,  # Firmware samples per second, sizes each read to the expected backlog
+        transport="pymodbus",  # "native" skips the pymodbus stack for lower CPU per transaction
     )
 
     # Run Modbus loop in a separate thread
-    modbus_thread = threading.Thread(target=lambda: asyncio.run(modbus_main(master)))
+    modbus_thread = threading.Thread(target=lambda: asyncio.run(modbus_main(master, poll_rates)))
     modbus_thread.start()
 
     # Start PyQtGraph in the main thread
-    pyqtgraph_main(slave_ids)
+    pyqtgraph_main(slave_ids, master)
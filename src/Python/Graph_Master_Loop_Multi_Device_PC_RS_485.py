@@ -4,20 +4,15 @@ from pymodbus.exceptions import ModbusException, ConnectionException
 from pymodbus.pdu import ExceptionResponse
 import logging
 import sys
-from datetime import datetime
+from streamer.async_logging import SampleSummaryLogger, setup_async_logging
+from streamer.decode import RegisterDecoder
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtWidgets, QtCore
 import threading
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('modbus_master_graph.log')
-    ]
-)
+# Logging configuration: formatting and file I/O run on a background QueueListener
+setup_async_logging("modbus_master_graph.log")
+sample_log = SampleSummaryLogger(interval=5.0)  # One summary line per slave every 5 s
 
 # Global data storage for each slave
 data = {}
@@ -33,6 +28,7 @@ class ModbusRTUMaster:
         self.connected = False
         self.reconnect_delay = 5  # seconds
         self.max_retries = 3
+        self.decoder = RegisterDecoder(3, "u16", scale=0.001)  # Registers are millivolts
 
     async def connect(self):
         """Establish connection with retry mechanism"""
@@ -70,8 +66,7 @@ class ModbusRTUMaster:
     def decode_voltages(self, registers):
         """Convert register values to voltages with error checking"""
         try:
-            voltages = [reg / 1000.0 for reg in registers]
-            return voltages
+            return self.decoder.decode(registers)[0]
         except Exception as e:
             logging.error(f"Error decoding voltages: {str(e)}")
             return None
@@ -130,10 +125,8 @@ async def modbus_main(master):
             for slave_id in master.slave_ids:
                 voltages = await master.read_voltages(slave_id)
                 
-                if voltages:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    logging.info(f"Slave ID: {slave_id} | Time: {timestamp}")
-                    logging.info(f"Voltages: A1={voltages[0]:.3f}V, A2={voltages[1]:.3f}V, A3={voltages[2]:.3f}V")
+                if voltages is not None:
+                    sample_log.record(slave_id, [voltages])
                     
                     with lock:
                         if slave_id not in data:
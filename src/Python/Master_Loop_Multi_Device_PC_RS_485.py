@@ -5,16 +5,14 @@ from pymodbus.pdu import ExceptionResponse
 import logging
 import sys
 from datetime import datetime
+import time
+from streamer.async_logging import SampleSummaryLogger, setup_async_logging
+from streamer.decode import RegisterDecoder
+from streamer.recorder import Recorder
 
-# Konfigurasi logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('modbus_master.log')
-    ]
-)
+# Konfigurasi logging: formatting and file I/O run on a background QueueListener
+setup_async_logging("modbus_master.log")
+sample_log = SampleSummaryLogger(interval=5.0)  # One summary line per slave every 5 s
 
 class ModbusRTUMaster:
     def __init__(self, port, slave_ids, baudrate=9600, timeout=3): # Default Baudrate 9600
@@ -26,6 +24,7 @@ class ModbusRTUMaster:
         self.connected = False
         self.reconnect_delay = 5  # seconds
         self.max_retries = 3
+        self.decoder = RegisterDecoder(3, "u16", scale=0.001)  # Registers are millivolts
 
     async def connect(self):
         """Establish connection with retry mechanism"""
@@ -63,8 +62,7 @@ class ModbusRTUMaster:
     def decode_voltages(self, registers):
         """Convert register values to voltages with error checking"""
         try:
-            voltages = [reg / 1000.0 for reg in registers]
-            return voltages
+            return self.decoder.decode(registers)[0]
         except Exception as e:
             logging.error(f"Error decoding voltages: {str(e)}")
             return None
@@ -126,6 +124,15 @@ async def main():
         timeout=2
     )
 
+    # Binary recording (replaces voltage_data_new.csv), read back with streamer.recorder.read_recording
+    recorder = Recorder(
+        f"voltage_data_{datetime.now():%Y%m%d_%H%M%S}.bin",
+        sources=slave_ids,
+        channels=["A1", "A2", "A3"],
+        scale=master.decoder.scale,
+        offset=master.decoder.offset,
+    )
+
     logging.info("Starting Modbus RTU Master")
     
     try:
@@ -133,14 +140,9 @@ async def main():
             for slave_id in slave_ids:
                 voltages = await master.read_voltages(slave_id)
                 
-                if voltages:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    logging.info(f"Slave ID: {slave_id} | Time: {timestamp}")
-                    logging.info(f"Voltages: A1={voltages[0]:.3f}V, A2={voltages[1]:.3f}V, A3={voltages[2]:.3f}V")
-                    
-                    # Optional: Save to CSV
-                    with open('voltage_data_new.csv', 'a') as f:
-                        f.write(f"{timestamp},{slave_id},{voltages[0]:.3f},{voltages[1]:.3f},{voltages[2]:.3f}\n")
+                if voltages is not None:
+                    sample_log.record(slave_id, [voltages])
+                    recorder.write(slave_id, voltages, time.monotonic_ns())
                 else:
                     logging.warning(f"Failed to read voltages from slave {slave_id}")
             
@@ -152,6 +154,7 @@ async def main():
         logging.error(f"Main loop error: {str(e)}")
     finally:
         await master.disconnect()
+        recorder.close()
 
 if __name__ == "__main__":
     try:
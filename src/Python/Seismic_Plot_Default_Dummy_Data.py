@@ -3,6 +3,7 @@ import numpy as np
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 from PyQt5.QtCore import QTimer
 import pyqtgraph as pg
+from streamer.ring_buffer import ScrollingGather
 
 class RealtimeSeismicViewer(QMainWindow):
     def __init__(self):
@@ -14,9 +15,13 @@ class RealtimeSeismicViewer(QMainWindow):
         self.num_traces = 200  # Batas awal
         self.num_samples = 500
         self.current_time = 0
+        self.sample_axis = np.arange(self.num_samples)  # Sumbu y, dibuat sekali
+
+        # Mode tampilan: "wiggle" = semua trace dalam satu PlotCurveItem, "lines" = satu PlotDataItem per trace
+        self.display_mode = "wiggle"
         
         # Inisialisasi buffer data
-        self.data_buffer = np.zeros((self.num_samples, self.num_traces))
+        self.data_buffer = ScrollingGather(self.num_samples, self.num_traces)  # view() -> (num_samples, num_traces)
         
         # Setup UI
         self.setup_ui()
@@ -49,8 +54,23 @@ class RealtimeSeismicViewer(QMainWindow):
         # Inisialisasi plot lines
         self.plot_lines = []
         self.max_traces = self.num_traces  # Menyimpan jumlah trace yang saat ini digunakan
-        self.add_plot_lines(self.num_traces)  # Menambahkan garis plot sesuai jumlah trace awal
-    
+        if self.display_mode == "wiggle":
+            self.add_wiggle_item()
+        else:
+            self.add_plot_lines(self.num_traces)  # Menambahkan garis plot sesuai jumlah trace awal
+
+    def add_wiggle_item(self):
+        """Satu PlotCurveItem untuk semua trace, offset/sumbu y/array connect dihitung sekali"""
+        offset = 1
+        self.trace_offsets = (np.arange(self.num_traces) * offset)[:, np.newaxis]  # (num_traces, 1)
+        self.wiggle_x = np.empty((self.num_traces, self.num_samples))
+        self.wiggle_y = np.tile(self.sample_axis.astype(np.float64), self.num_traces)
+        # connect[i] = sambungkan titik i ke i+1; diputus di sampel terakhir tiap trace (tanpa NaN)
+        self.wiggle_connect = np.ones(self.num_traces * self.num_samples, dtype=bool)
+        self.wiggle_connect[self.num_samples - 1::self.num_samples] = False
+        self.wiggle_item = pg.PlotCurveItem(pen=pg.mkPen('k', width=0.8))
+        self.plot_widget.addItem(self.wiggle_item)
+
     def add_plot_lines(self, num_traces):
         """Menambahkan garis plot sesuai dengan jumlah trace"""
         offset = 0.5
@@ -73,13 +93,19 @@ class RealtimeSeismicViewer(QMainWindow):
         return wavelet + noise
     
     def update_data(self):
-        # Geser data lama ke kiri
-        self.data_buffer = np.roll(self.data_buffer, -1, axis=1)
-        
-        # Generate trace baru
+        # Generate trace baru, trace tertua bergeser keluar tanpa menyalin seluruh buffer
         new_trace = self.generate_new_trace()
-        self.data_buffer[:, -1] = new_trace
+        self.data_buffer.push(new_trace)
         
+        gather = self.data_buffer.view()
+        if self.display_mode == "wiggle":
+            # Satu panggilan setData untuk semua trace: x = trace + offset, baris per trace
+            np.add(gather.T, self.trace_offsets, out=self.wiggle_x)
+            self.wiggle_item.setData(self.wiggle_x.ravel(), self.wiggle_y,
+                                     connect=self.wiggle_connect, skipFiniteCheck=True)
+            self.current_time += 1
+            return
+
         # Cek apakah jumlah trace melebihi batas
         if self.num_traces > self.max_traces:
             self.add_plot_lines(self.num_traces - self.max_traces)  # Menambahkan lebih banyak garis plot
@@ -88,8 +114,8 @@ class RealtimeSeismicViewer(QMainWindow):
         # Update plot
         offset = 1
         for i in range(self.num_traces):
-            trace = self.data_buffer[:, i]
-            self.plot_lines[i].setData(trace + i * offset, np.arange(self.num_samples))
+            trace = gather[:, i]
+            self.plot_lines[i].setData(trace + i * offset, self.sample_axis)
         
         self.current_time += 1
 
@@ -5,11 +5,20 @@ import pyqtgraph as pg
 from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget
 from PyQt5.QtCore import QTimer
 import time
+import numpy as np
+from streamer.frames import ADS1256_FRAME_CHANNELS, FrameParser
+from streamer.integrity import SequenceTracker
 
 # Konfigurasi port serial
 SERIAL_PORT = "COM16"  # Ganti dengan port yang sesuai
 BAUD_RATE = 115200
 
+# Mode biner: frame sync + seq + int24 per kanal + CRC (lihat streamer/frames.py), jauh lebih ringkas dari teks.
+# Frame dari Serial_Graph_ADS1256.ino berisi ADS1256_FRAME_CHANNELS kanal (Reg 0..2), Reg 3 hanya ada di mode teks
+BINARY_FRAMES = False
+NUM_CHANNELS = 4  # Kanal di grafik dan di baris teks "||"
+VOLTS_PER_CODE = 3.3 / 0x7FFFFF  # ADS1256, referensi 3.3 V
+
 # Buffer data untuk setiap kanal
 data_buffer_channel_0 = []
 data_buffer_channel_1 = []
@@ -36,8 +45,12 @@ class SerialThread(threading.Thread):
         self.baud_rate = baud_rate
         self.running = True
         self.serial_conn = None
+        self.integrity = SequenceTracker(bits=16)  # Mode biner: frame hilang/duplikat dari nomor seq
 
     def run(self):
+        if BINARY_FRAMES:
+            self.run_binary()
+            return
         # Membuka koneksi serial
         self.serial_conn = serial.Serial(self.serial_port, self.baud_rate)
         while self.running:
@@ -45,6 +58,36 @@ class SerialThread(threading.Thread):
                 line = self.serial_conn.readline().decode('utf-8').strip()
                 self.process_data(line)
 
+    def run_binary(self):
+        """Baca semua byte yang tersedia sekaligus dan decode semua frame lengkap dalam satu langkah."""
+        self.parser = FrameParser(ADS1256_FRAME_CHANNELS, "i24")
+        self.serial_conn = serial.Serial(self.serial_port, self.baud_rate, timeout=0.05)
+        while self.running:
+            # read() menunggu paling lama timeout, tidak perlu spin di in_waiting
+            chunk = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+            if chunk:
+                seq, codes = self.parser.feed(chunk)
+                if len(codes):
+                    keep, _ = self.integrity.update(seq)
+                    self.process_block(codes[keep] * VOLTS_PER_CODE)
+
+    def process_block(self, values):
+        """Tambahkan blok (n, kanal) nilai sekaligus ke buffer kanal; kanal yang tidak ada di frame tetap kosong."""
+        global data_count_channel_0, data_count_channel_1, data_count_channel_2, data_count_channel_3, total_data_count
+        for buffer, column in zip(
+            (data_buffer_channel_0, data_buffer_channel_1, data_buffer_channel_2, data_buffer_channel_3), values.T
+        ):
+            buffer.extend(column.tolist())
+            del buffer[:-MAX_DATA_POINTS]  # Menjaga ukuran buffer tetap pada batas maksimum
+
+        n = len(values)
+        channels = values.shape[1]
+        data_count_channel_0 += n
+        data_count_channel_1 += n if channels > 1 else 0
+        data_count_channel_2 += n if channels > 2 else 0
+        data_count_channel_3 += n if channels > 3 else 0
+        total_data_count += n
+
     def process_data(self, line):
         global data_count_channel_0, data_count_channel_1, data_count_channel_2, data_count_channel_3, total_data_count
         try:
@@ -152,6 +195,7 @@ class MainWindow(QMainWindow):
                 f"  Reg 2 (Blue): {rate_channel_2:.2f} data/sec\n"
                 f"  Reg 3 (Yellow): {rate_channel_3:.2f} data/sec\n"
                 f"  Average Rate: {total_rate:.2f} data/sec"
+                + self.loss_text()
             )
 
             # Reset penghitung data
@@ -162,6 +206,14 @@ class MainWindow(QMainWindow):
             total_data_count = 0
             last_update_time = current_time
 
+    def loss_text(self):
+        if not BINARY_FRAMES:
+            return ""
+        loss = self.serial_thread.integrity.stats()
+        bursts = ", ".join(f"{size}: {count}" for size, count in self.serial_thread.integrity.burst_histogram().items() if count)
+        return (f"\n  Frame hilang: {loss['lost']} ({loss['loss_rate'] * 100:.2f}%), duplikat: {loss['duplicates']}"
+                f"\n  Panjang burst: {bursts or '-'}")
+
     def closeEvent(self, event):
         # Menghentikan thread serial saat jendela ditutup
         self.serial_thread.stop()
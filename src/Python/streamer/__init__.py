@@ -0,0 +1 @@
+"""Shared acquisition helpers used by the scripts in src/Python, GUIServer and Server."""
@@ -0,0 +1,86 @@
+import atexit
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the message in the calling thread; here the
+    record goes on the queue as is, so callers should log with %-style
+    arguments that are not mutated afterwards.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_async_logging(log_file=None, level=logging.INFO, fmt=LOG_FORMAT, stream=sys.stdout):
+    """Route the root logger through a queue to a background QueueListener.
+
+    Formatting, console output and file I/O all happen on the listener
+    thread. Returns the started listener; it is stopped (and the queue
+    drained) at interpreter exit.
+    """
+    formatter = logging.Formatter(fmt)
+    handlers = []
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class SampleSummaryLogger:
+    """Periodic per-source summary lines instead of one log record per sample.
+
+    record() only counts; at most one line per source is logged every
+    ``interval`` seconds with the sample count, rate and last sample.
+    """
+
+    def __init__(self, interval=1.0, logger=None, label="Slave"):
+        self.interval = interval
+        self.logger = logger or logging.getLogger()
+        self.label = label
+        self.counts = {}
+        self.last_sample = {}
+        self.last_log = {}
+
+    def record(self, source, samples):
+        """Count a batch of samples (one row per sample) from ``source``."""
+        now = time.monotonic()
+        if source not in self.last_log:
+            self.last_log[source] = now
+            self.counts[source] = 0
+        self.counts[source] += len(samples)
+        if len(samples):
+            self.last_sample[source] = samples[-1]
+
+        elapsed = now - self.last_log[source]
+        if elapsed >= self.interval:
+            last = self.last_sample.get(source)
+            self.logger.info(
+                "%s %s: %d samples in %.1f s (%.1f samples/s), last %s",
+                self.label, source, self.counts[source], elapsed, self.counts[source] / elapsed,
+                None if last is None else [round(float(value), 4) for value in last],
+            )
+            self.counts[source] = 0
+            self.last_log[source] = now
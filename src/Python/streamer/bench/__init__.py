@@ -0,0 +1,6 @@
+"""Benchmarks of the acquisition stack against the simulated devices of streamer.sim.
+
+python -m streamer.bench --help runs them and writes the results as JSON;
+pass an earlier result file with --baseline to see what got faster or
+slower.
+"""
@@ -0,0 +1,149 @@
+"""Run the benchmarks from the command line, from src/Python:
+
+    python -m streamer.bench --output baseline.json
+    python -m streamer.bench --output after.json --baseline baseline.json
+    python -m streamer.bench serial_graph udp_packets --duration 10 --rate 50000
+    python -m streamer.bench --suite gui --output gui.json
+    python -m streamer.bench gui_realtime_seismic --traces 1000 --interval 50 --display-mode lines
+
+Every case reports samples/s, p50/p99 per transaction (one FC03 read, one
+parser call, one datagram or one recorder write), CPU microseconds per
+sample without the simulator threads and RSS growth during the run. For
+the streamed cases samples/s is capped by --rate; CPU per sample is what
+to compare there.
+
+The gui suite shows every viewer offscreen (QT_QPA_PLATFORM=offscreen,
+matplotlib Agg) with synthetic data and drives its update slot from its
+own timer: it reports achieved fps against the timer's target, frame
+time p50/p99, dropped frames (whole timer intervals skipped), time in the
+update slot and time painting the pyqtgraph views.
+
+With --baseline the exit status is 1 when any metric got worse by more
+than --tolerance. The log files of the scripts under test are written to
+a directory next to the result file (<output>_logs).
+"""
+import copy
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from streamer.bench import acquisition, gui
+from streamer.bench.metrics import compare
+
+SUITES = {"acquisition": acquisition.CASES, "gui": gui.CASES}
+DEFAULT_RATE = {"acquisition": 20000.0, "gui": 2000.0}
+
+
+def build_parser():
+    cases = {name: case for suite in SUITES.values() for name, case in suite.items()}
+    parser = argparse.ArgumentParser(
+        prog="python -m streamer.bench", description="Acquisition and GUI benchmarks against simulated devices",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="Cases:\n" + "\n".join(f"  {name:22} {case.__doc__.splitlines()[0]}" for name, case in cases.items()),
+    )
+    parser.add_argument("cases", nargs="*", metavar="case", help="cases to run (default: the whole --suite)")
+    parser.add_argument("--suite", choices=list(SUITES), default="acquisition")
+    parser.add_argument("--duration", type=float, default=3.0, help="measured seconds per case")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="samples/s offered by the simulated devices, per slave for Modbus "
+                             "(default 20000, 2000 for the gui suite)")
+    parser.add_argument("--slaves", type=int, nargs="+", default=[1, 2, 3], help="Modbus slaves, also the slaves fed to the accumulated plot")
+    parser.add_argument("--baudrate", type=int, default=115200, help="Modbus bus speed, sets the wire time")
+    parser.add_argument("--latency", type=float, default=0.0, help="Modbus slave turnaround in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--transport", choices=["native", "pymodbus"], default="native")
+    parser.add_argument("--boards", type=int, default=2, help="UDP boards sending binary packets")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="gui: timer interval in ms instead of the viewer's own")
+    parser.add_argument("--traces", type=int, default=None, help="gui: traces in the seismic gathers")
+    parser.add_argument("--samples", type=int, default=None, help="gui: samples per trace in the seismic gathers")
+    parser.add_argument("--display-mode", choices=["wiggle", "lines"], default="wiggle",
+                        help="gui: RealtimeSeismicViewer display mode")
+    parser.add_argument("--gather-mode", choices=["wiggle", "image"], default="wiggle",
+                        help="gui: GatherRenderer mode")
+    parser.add_argument("--output", default=None, help="JSON file for the results (default bench_<time>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier result file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="relative change that counts as a regression")
+    return parser
+
+
+def summary(result):
+    if "fps" in result:
+        target = f"/{result['target_fps']:g}" if result["target_fps"] else ""
+        slot = result["slot_ms_p99"] if result["slot_ms_p99"] is not None else float("nan")
+        paint = f", paint p99 {result['paint_ms_p99']:.2f} ms" if result["paint_ms_p99"] is not None else ""
+        frame = result["frame_ms_p99"] if result["frame_ms_p99"] is not None else float("nan")
+        return (f"{result['fps']:.1f}{target} fps, frame p99 {frame:.1f} ms, "
+                f"{result['dropped_frames']} frame terlewat, slot p99 {slot:.2f} ms{paint}")
+    p99 = f"{result['p99_ms']:.3f} ms" if result["p99_ms"] is not None else "-"
+    cpu = f"{result['cpu_us_per_sample']:.2f} us" if result["cpu_us_per_sample"] is not None else "-"
+    return (f"{result['samples_per_s']:.0f} sampel/s, p99 {p99}, CPU {cpu}/sampel, "
+            f"RSS +{result['rss_growth_kb']} kB")
+
+
+def print_comparison(rows):
+    print(f"\n{'case':22} {'metric':18} {'baseline':>12} {'now':>12} {'change':>8}")
+    for case, metric, before, after, change, regressed in rows:
+        change = f"{change * 100:+.1f}%" if change is not None else "-"
+        print(f"{case:22} {metric:18} {before:12.4g} {after:12.4g} {change:>8}{'  REGRESSION' if regressed else ''}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    cases = {name: (suite, case) for suite, suite_cases in SUITES.items() for name, case in suite_cases.items()}
+    unknown = [name for name in args.cases if name not in cases]
+    if unknown:
+        parser.error(f"unknown case(s) {', '.join(unknown)}, see --help")
+    names = args.cases or list(SUITES[args.suite])
+    output = args.output or f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    acquisition.LOG_DIR = os.path.abspath(os.path.splitext(output)[0] + "_logs")
+
+    results = {}
+    for name in names:
+        print(f"{name} ...", end=" ", flush=True)
+        suite, case = cases[name]
+        options = copy.copy(args)
+        if options.rate is None:
+            options.rate = DEFAULT_RATE[suite]
+        try:
+            result = case(options)
+        except Exception as e:
+            print(f"gagal: {e}")
+            results[name] = {"error": str(e)}
+            continue
+        results[name] = result
+        print(summary(result))
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+    if os.path.isdir(acquisition.LOG_DIR):
+        print(f"Log script di {acquisition.LOG_DIR}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = [key for key, value in report["options"].items()
+                   if key not in ("cases", "suite", "tolerance") and baseline["options"].get(key) != value]
+        if changed:
+            print(f"Peringatan: opsi berbeda dari baseline ({', '.join(changed)}), angka tidak sebanding")
+        rows = compare(results, baseline["results"], args.tolerance)
+        print_comparison(rows)
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
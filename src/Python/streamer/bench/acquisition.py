@@ -0,0 +1,274 @@
+import asyncio
+import contextlib
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from streamer.bench.metrics import Measurement
+from streamer.frames import ADS1256_FRAME_CHANNELS
+from streamer.recorder import Recorder
+from streamer.sim.modbus import PtyBus, SlaveFarm
+from streamer.sim.streamers import SerialStreamer, UdpStreamer
+from streamer.udp_ingest import UdpIngest, UdpReceiver, open_udp_socket
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+# Working directory the scripts are imported from, so their log files end up there
+# and not in the repository (None: a new temporary directory)
+LOG_DIR = None
+
+_scripts = {}
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """chdir into path for the with block (contextlib.chdir needs Python 3.11)."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def load_script(path):
+    """Import a viewer script (path relative to the repository root) without running its __main__ block.
+
+    Scripts open their log files relative to the working directory on
+    import, so they are imported from LOG_DIR and log there.
+    """
+    global LOG_DIR
+    if path not in _scripts:
+        if LOG_DIR is None:
+            LOG_DIR = tempfile.mkdtemp(prefix="streamer_bench_")
+        os.makedirs(LOG_DIR, exist_ok=True)
+        name = "bench_" + os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        with working_directory(LOG_DIR):
+            spec.loader.exec_module(module)
+        _scripts[path] = module
+        # The scripts log every timeout and gap, the results already count them
+        logging.getLogger().setLevel(logging.ERROR)
+    return _scripts[path]
+
+
+def timed_subclass(cls, method, measurement):
+    """Subclass of cls whose ``method`` is timed, for objects a script creates itself."""
+    return type(cls.__name__, (cls,), {method: measurement.timed(getattr(cls, method))})
+
+
+def _modbus(options, block):
+    module = load_script("src/Python/FIX_Respon_Cepat_RS485_Multi.py")
+    farm = SlaveFarm.create(options.slaves, options.rate, block_samples=module.MAX_BLOCK_SAMPLES,
+                            baudrate=options.baudrate, latency=options.latency, jitter=options.jitter)
+    bus = PtyBus(farm).start()
+    master = module.ModbusRTUMaster(
+        bus.port, options.slaves, baudrate=options.baudrate, timeout=0.1,
+        block_samples=module.MAX_BLOCK_SAMPLES if block else 0, transport=options.transport,
+    )
+    read = master.read_block if block else master.read_voltages
+
+    async def poll():
+        await master.connect()
+        await read(options.slaves[0])  # Warm up: open the port, first reply
+        measurement = Measurement(exclude=[bus._thread]).start()
+        end = time.perf_counter() + options.duration
+        while time.perf_counter() < end:
+            for slave_id in options.slaves:
+                start = time.perf_counter()
+                result = await read(slave_id)
+                measurement.add_latency(time.perf_counter() - start)
+                if result is None:
+                    measurement.errors += 1
+                else:
+                    measurement.add(len(result) if block else 1)
+        result = measurement.stop()
+        await master.disconnect()
+        return result
+
+    try:
+        result = asyncio.run(poll())
+    finally:
+        bus.close()
+    loss = master.integrity.stats()
+    result["extra"] = dict(farm.stats(), lost=sum(stats["lost"] for stats in loss.values()))
+    return result
+
+
+def modbus_read_voltages(options):
+    """ModbusRTUMaster.read_voltages: one sample per FC03 transaction."""
+    return _modbus(options, block=False)
+
+
+def modbus_read_block(options):
+    """ModbusRTUMaster.read_block: up to 30 buffered samples per FC03 transaction."""
+    return _modbus(options, block=True)
+
+
+def _serial(options, fmt, channels, make_reader, count_samples=None):
+    """Runs a reader thread against a SerialStreamer; make_reader(port, measurement) returns the thread."""
+    streamer = SerialStreamer(fmt, rate=options.rate, chunk=max(1, int(options.rate / 200)), channels=channels)
+    measurement = Measurement(exclude=[streamer])
+    reader = make_reader(streamer.port, measurement)
+    reader.daemon = True  # Some readers block in readline() without a timeout
+    reader.start()
+    streamer.start()
+    time.sleep(0.2)  # Port open, first lines through
+    measurement.samples = 0
+    measurement.latencies.clear()
+    before = count_samples() if count_samples else 0
+    measurement.start()
+    time.sleep(options.duration)
+    if count_samples:
+        measurement.samples = count_samples() - before
+    result = measurement.stop()
+    reader.running = False
+    reader.join(0.5)
+    streamer.stop()
+    if reader.serial_conn:
+        reader.serial_conn.close()
+    result["extra"] = dict(offered_per_s=options.rate, overflow_bytes=streamer.overflow_bytes)
+    return result
+
+
+def serial_graph(options):
+    """RS485FULLDUPLEX/Serial_Graph.py SerialReader: Diterima lines, LabeledLineParser batch per read."""
+    module = load_script("RS485FULLDUPLEX/Serial_Graph.py")
+
+    def make_reader(port, measurement):
+        reader = module.SerialReader(port, 115200, lambda rows, lines: measurement.add(len(rows)))
+        reader.parser.feed = measurement.timed(reader.parser.feed)
+        return reader
+    return _serial(options, "diterima", 3, make_reader)
+
+
+def dashboard_spi_text(options):
+    """Server/DashboardSPI.py SerialReader, text mode: readline() and split(';') per line."""
+    module = load_script("Server/DashboardSPI.py")
+    module.BINARY_FRAMES = False
+
+    def make_reader(port, measurement):
+        reader = module.SerialReader(port, 115200, lambda values: measurement.add(1))
+        reader.parse_serial_data = measurement.timed(reader.parse_serial_data)
+        return reader
+    return _serial(options, "semicolon", 3, make_reader)
+
+
+def dashboard_spi_frames(options):
+    """Server/DashboardSPI.py SerialReader with BINARY_FRAMES: FrameParser per read."""
+    module = load_script("Server/DashboardSPI.py")
+    frame_parser = module.FrameParser
+
+    def make_reader(port, measurement):
+        module.FrameParser = timed_subclass(frame_parser, "feed", measurement)
+        return module.SerialReader(port, 115200, None, block_callback=lambda values: measurement.add(len(values)))
+    module.BINARY_FRAMES = True
+    try:
+        return _serial(options, "frames", ADS1256_FRAME_CHANNELS, make_reader)
+    finally:
+        module.BINARY_FRAMES = False
+        module.FrameParser = frame_parser
+
+
+def ads1256_text(options):
+    """Serial_Graph_ADS1256.py SerialThread, text mode: readline() and process_data() per line."""
+    module = load_script("src/Python/Serial_Graph_ADS1256.py")
+    module.BINARY_FRAMES = False
+
+    def make_reader(port, measurement):
+        reader = module.SerialThread(port, 115200)
+        reader.process_data = measurement.timed(reader.process_data)
+        return reader
+    return _serial(options, "bars", 4, make_reader, lambda: module.total_data_count)
+
+
+def ads1256_frames(options):
+    """Serial_Graph_ADS1256.py SerialThread with BINARY_FRAMES: FrameParser and process_block() per read."""
+    module = load_script("src/Python/Serial_Graph_ADS1256.py")
+    frame_parser = module.FrameParser
+
+    def make_reader(port, measurement):
+        module.FrameParser = timed_subclass(frame_parser, "feed", measurement)
+        return module.SerialThread(port, 115200)
+    module.BINARY_FRAMES = True
+    try:
+        return _serial(options, "frames", ADS1256_FRAME_CHANNELS, make_reader, lambda: module.total_data_count)
+    finally:
+        module.BINARY_FRAMES = False
+        module.FrameParser = frame_parser
+
+
+def _udp(options, fmt):
+    ingest = UdpIngest(channels=3)
+    sock = open_udp_socket("127.0.0.1", 0)
+    streamer = UdpStreamer("127.0.0.1", sock.getsockname()[1], fmt, rate=options.rate, chunk=32,
+                           boards=options.boards if fmt == "packets" else 1)
+    measurement = Measurement(exclude=[streamer])
+    ingest.datagram_received = measurement.timed(ingest.datagram_received)
+    receiver = UdpReceiver(ingest, sock)
+    receiver.start()
+    streamer.start()
+    time.sleep(0.2)
+    measurement.latencies.clear()
+    before = sum(counters["samples"] for counters in ingest.stats().values())
+    measurement.start()
+    time.sleep(options.duration)
+    measurement.samples = sum(counters["samples"] for counters in ingest.stats().values()) - before
+    result = measurement.stop()
+    streamer.stop()
+    receiver.stop()
+    streams = ingest.stream_stats().values()
+    result["extra"] = dict(
+        offered_per_s=options.rate * streamer.boards,
+        lost_packets=sum(stream.get("lost", 0) for stream in streams),
+        late_packets=sum(stream["late"] for stream in streams),
+    )
+    return result
+
+
+def udp_packets(options):
+    """UdpIngest on a UdpReceiver thread: binary packets of 32 samples from --boards boards."""
+    return _udp(options, "packets")
+
+
+def udp_text(options):
+    """UdpIngest on a UdpReceiver thread: text datagrams of the older firmware, 32 lines each."""
+    return _udp(options, "labels")
+
+
+def recorder(options):
+    """Recorder.write of 32 x 4 float blocks as fast as possible, including the final flush."""
+    block = np.random.default_rng(0).uniform(0, 3.3, (32, 4))
+    with tempfile.TemporaryDirectory() as workdir:
+        rec = Recorder(os.path.join(workdir, "bench.bin"), [1], 4, scale=3.3 / 0x7FFFFF)
+        write = rec.write
+        measurement = Measurement().start()
+        end = time.perf_counter() + options.duration
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            write(1, block)
+            measurement.add_latency(time.perf_counter() - start)
+            measurement.add(len(block))
+        rec.close()
+        result = measurement.stop()
+        result["extra"] = dict(bytes_written=os.path.getsize(rec.path), blocks=rec.blocks_written)
+    return result
+
+
+# Order of a full run
+CASES = {
+    "modbus_read_voltages": modbus_read_voltages,
+    "modbus_read_block": modbus_read_block,
+    "serial_graph": serial_graph,
+    "dashboard_spi_text": dashboard_spi_text,
+    "dashboard_spi_frames": dashboard_spi_frames,
+    "ads1256_text": ads1256_text,
+    "ads1256_frames": ads1256_frames,
+    "udp_packets": udp_packets,
+    "udp_text": udp_text,
+    "recorder": recorder,
+}
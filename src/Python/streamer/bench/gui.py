@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+
+# Offscreen Qt and Agg: runs without a display; set QT_QPA_PLATFORM=xcb to watch the windows
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pyqtgraph as pg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from streamer.bench.acquisition import load_script
+from streamer.bench.metrics import FrameMeter
+from streamer.gather_plot import GatherRenderer
+from streamer.ring_buffer import ScrollingGather
+from streamer.sim.streamers import SerialStreamer
+
+
+_app = None
+
+
+def application():
+    """The QApplication, created once and kept alive for all cases."""
+    global _app
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+class _PaintTimer:
+    """Times every pyqtgraph GraphicsView.paintEvent (all plots) into a FrameMeter while active."""
+
+    def __init__(self, meter):
+        self.meter = meter
+        self._original = pg.GraphicsView.paintEvent
+
+    def __enter__(self):
+        original, meter = self._original, self.meter
+
+        def paintEvent(view, event):
+            start = time.perf_counter()
+            try:
+                return original(view, event)
+            finally:
+                meter.add_paint(time.perf_counter() - start)
+        pg.GraphicsView.paintEvent = paintEvent
+        return self
+
+    def __exit__(self, *exc):
+        pg.GraphicsView.paintEvent = self._original
+
+
+def run_frames(timer, slot, options, default_interval_ms, window=None):
+    """Reconnect ``timer`` to a timed ``slot``, run the Qt event loop for --duration and return the frame stats.
+
+    The timer keeps the viewer's own interval unless --interval is given.
+    """
+    app = application()
+    interval_ms = options.interval if options.interval is not None else default_interval_ms
+    meter = FrameMeter(interval_ms / 1000)
+    timer.stop()
+    try:
+        timer.timeout.disconnect()
+    except TypeError:
+        pass  # Nothing connected yet
+    timer.timeout.connect(meter.slot(slot))
+    if window is not None:
+        window.show()
+    timer.start(int(interval_ms))
+    with _PaintTimer(meter):
+        end = time.perf_counter() + 0.3
+        while time.perf_counter() < end:  # Warm up: first layout and paint
+            app.processEvents()
+        meter.start()
+        QTimer.singleShot(int(options.duration * 1000), app.quit)
+        app.exec_()
+        result = meter.stop()
+    timer.stop()
+    result["interval_ms"] = interval_ms
+    return result
+
+
+def _close(window):
+    reader = getattr(window, "serial_thread", None)
+    if reader is not None:
+        reader.running = False  # Let the thread leave its loop before closeEvent closes the port
+        reader.join(1.0)
+    window.close()
+    application().processEvents()
+
+
+class _Feeder(threading.Thread):
+    """Calls push(rows) every 10 ms with ``rate`` samples per second of a (rows, columns) sine block."""
+
+    def __init__(self, push, rate, columns):
+        super().__init__(name="Feeder", daemon=True)
+        self.push = push
+        self.rate = rate
+        self.columns = columns
+        self.running = True
+
+    def run(self):
+        start = time.perf_counter()
+        produced = 0
+        while self.running:
+            time.sleep(0.01)
+            due = int((time.perf_counter() - start) * self.rate)
+            index = np.arange(produced, due)
+            if len(index):
+                phase = 2 * np.pi * index[:, np.newaxis] / 500 + np.arange(self.columns)
+                self.push(index, 1.5 + np.sin(phase))
+                produced = due
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+
+def accumulated_plot(options):
+    """GUIServer/Gui_Adhit.py AccumulatedPlotViewer (50 ms timer) with --slaves fed at --rate samples/s each."""
+    module = load_script("GUIServer/Gui_Adhit.py")
+    application()
+    module.data_buffer = {slave_id: module.new_slave_buffer() for slave_id in options.slaves}
+
+    def push(index, values):
+        rows = np.empty((len(index), len(module.BUFFER_COLUMNS)))
+        rows[:, module.ITERATION] = index
+        rows[:, module.REG_COLUMNS["A0"]:module.REG_COLUMNS["A3"] + 1] = values
+        rows[:, module.TIMESTAMP] = time.time()
+        for slave_id in options.slaves:
+            module.data_buffer[slave_id].extend(rows)
+
+    feeder = _Feeder(push, options.rate, module.NUM_CHANNELS)
+    feeder.start()
+    window = module.AccumulatedPlotViewer(options.slaves)
+    try:
+        return run_frames(window.timer, window.update_plot, options, 50, window)
+    finally:
+        feeder.stop()
+        _close(window)
+
+
+def realtime_seismic(options):
+    """Seismic_Plot_Default_Dummy_Data.py RealtimeSeismicViewer (1000 ms timer), --traces x --samples gather."""
+    module = load_script("src/Python/Seismic_Plot_Default_Dummy_Data.py")
+    application()
+    window = module.RealtimeSeismicViewer()
+    # Rebuild the gather at the requested size with the viewer's own setup methods
+    window.num_traces = window.max_traces = options.traces or window.num_traces
+    window.num_samples = options.samples or window.num_samples
+    window.sample_axis = np.arange(window.num_samples)
+    window.data_buffer = ScrollingGather(window.num_samples, window.num_traces)
+    window.display_mode = options.display_mode
+    window.plot_widget.clear()
+    window.plot_lines = []
+    if window.display_mode == "wiggle":
+        window.add_wiggle_item()
+    else:
+        window.add_plot_lines(window.num_traces)
+    try:
+        result = run_frames(window.timer, window.update_data, options, 1000, window)
+    finally:
+        _close(window)
+    result["traces"], result["samples"] = window.num_traces, window.num_samples
+    return result
+
+
+def seismic_viewer(options):
+    """Seismic_Plot_Default.py SeismicViewer: static 50-trace plot, build time and repaint at --interval (default 50 ms)."""
+    module = load_script("src/Python/Seismic_Plot_Default.py")
+    application()
+    start = time.perf_counter()
+    window = module.SeismicViewer()
+    build_ms = (time.perf_counter() - start) * 1000
+    plot = window.findChild(pg.PlotWidget)
+    timer = QTimer()
+    try:
+        # No timer of its own: every frame asks for a repaint, the paint time is the frame's work
+        result = run_frames(timer, plot.viewport().update, options, 50, window)
+    finally:
+        _close(window)
+    result["build_ms"] = round(build_ms, 1)
+    return result
+
+
+def gather_renderer(options):
+    """GUIServer/200traceyok.py RealtimeSeismicGUI rendering: GatherRenderer push + blit per frame on Agg.
+
+    The Tk window itself needs a display and opens the Modbus port in its
+    constructor, so only its renderer is measured, with the viewer's
+    settings (200 x 30 wiggle with fill, one trace per 1000 ms) unless
+    --traces, --samples, --gather-mode or --interval say otherwise.
+    """
+    application()
+    traces, samples = options.traces or 200, options.samples or 30
+    figure = Figure(figsize=(12, 7), dpi=100)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    renderer = GatherRenderer(ax, samples, traces, mode=options.gather_mode, fill=True,
+                              times=np.arange(samples))
+    ax.set_xlim(-10, traces + 10)
+    renderer.draw()  # First full draw caches the background
+    rng = np.random.default_rng(0)
+
+    def update_plot():
+        renderer.push(rng.uniform(0, 5, samples))
+        renderer.draw()
+
+    result = run_frames(QTimer(), update_plot, options, 1000)
+    result["traces"], result["samples"] = traces, samples
+    return result
+
+
+def _serial_viewer(options, path, window_class, fmt, channels, configure=None):
+    """Viewer whose reader thread reads SERIAL_PORT, pointed at a SerialStreamer pty at --rate."""
+    module = load_script(path)
+    application()
+    streamer = SerialStreamer(fmt, rate=options.rate, chunk=max(1, int(options.rate / 200)), channels=channels)
+    module.SERIAL_PORT = streamer.port
+    if configure:
+        configure(module)
+    streamer.start()
+    window = getattr(module, window_class)()
+    try:
+        return run_frames(window.timer, window.update_plot, options, window.timer.interval(), window)
+    finally:
+        _close(window)
+        streamer.stop()
+
+
+def serial_graph(options):
+    """RS485FULLDUPLEX/Serial_Graph.py RealtimeGraph (UI_FPS timer), Diterima lines at --rate."""
+    return _serial_viewer(options, "RS485FULLDUPLEX/Serial_Graph.py", "RealtimeGraph", "diterima", 3)
+
+
+def dashboard_spi(options):
+    """Server/DashboardSPI.py RealtimeGraph (100 ms timer), semicolon lines at --rate."""
+    def configure(module):
+        module.BINARY_FRAMES = False
+    return _serial_viewer(options, "Server/DashboardSPI.py", "RealtimeGraph", "semicolon", 3, configure)
+
+
+def ads1256(options):
+    """Serial_Graph_ADS1256.py MainWindow (50 ms timer), "||" lines at --rate."""
+    def configure(module):
+        module.BINARY_FRAMES = False
+    return _serial_viewer(options, "src/Python/Serial_Graph_ADS1256.py", "MainWindow", "bars", 4, configure)
+
+
+# Order of a full run
+CASES = {
+    "gui_accumulated_plot": accumulated_plot,
+    "gui_realtime_seismic": realtime_seismic,
+    "gui_seismic_viewer": seismic_viewer,
+    "gui_gather_renderer": gather_renderer,
+    "gui_serial_graph": serial_graph,
+    "gui_dashboard_spi": dashboard_spi,
+    "gui_ads1256": ads1256,
+}
@@ -0,0 +1,198 @@
+import functools
+import os
+import time
+
+import numpy as np
+
+# metric -> True when higher is better
+METRICS = {
+    "samples_per_s": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "cpu_us_per_sample": False,
+    "rss_growth_kb": False,
+    "fps": True,
+    "frame_ms_p99": False,
+    "dropped_frames": False,
+    "slot_ms_p50": False,
+    "slot_ms_p99": False,
+    "paint_ms_p99": False,
+}
+# Differences smaller than this are noise on any machine, never a regression
+NOISE_FLOOR = {
+    "samples_per_s": 0.0,
+    "p50_ms": 0.02,
+    "p99_ms": 0.1,
+    "cpu_us_per_sample": 0.5,
+    "rss_growth_kb": 2048,
+    "fps": 0.0,
+    "frame_ms_p99": 2.0,
+    "dropped_frames": 1,
+    "slot_ms_p50": 0.1,
+    "slot_ms_p99": 0.5,
+    "paint_ms_p99": 0.5,
+}
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def thread_cpu(thread):
+    """CPU seconds used by a running thread, 0.0 where the platform cannot tell."""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+    except (AttributeError, OSError, TypeError):
+        return 0.0
+
+
+class Measurement:
+    """Samples, per-transaction times, CPU and memory of one benchmark case.
+
+    Call start() once the code under test is set up, count samples with
+    add(), time transactions with timed() or add_latency(), and stop() to
+    get the result dict. CPU of the ``exclude`` threads (the simulators) is
+    subtracted from the process CPU, so cpu_us_per_sample is what the
+    acquisition code itself costs.
+    """
+
+    def __init__(self, exclude=()):
+        self.exclude = list(exclude)
+        self.samples = 0
+        self.errors = 0
+        self.latencies = []
+        self.extra = {}
+
+    def start(self):
+        self._rss = rss_bytes()
+        self._cpu = time.process_time() - sum(thread_cpu(thread) for thread in self.exclude)
+        self._start = time.perf_counter()
+        return self
+
+    def add(self, samples):
+        self.samples += samples
+
+    def add_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def timed(self, func):
+        """func wrapped so every call adds its duration as one transaction."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return wrapper
+
+    def stop(self):
+        seconds = time.perf_counter() - self._start
+        cpu = time.process_time() - sum(thread_cpu(thread) for thread in self.exclude) - self._cpu
+        latencies = np.array(self.latencies) * 1000
+        return dict(
+            samples=self.samples,
+            seconds=round(seconds, 3),
+            samples_per_s=round(self.samples / seconds, 1) if seconds else 0.0,
+            transactions=len(latencies),
+            p50_ms=round(float(np.percentile(latencies, 50)), 4) if len(latencies) else None,
+            p99_ms=round(float(np.percentile(latencies, 99)), 4) if len(latencies) else None,
+            cpu_us_per_sample=round(cpu / self.samples * 1e6, 3) if self.samples else None,
+            rss_growth_kb=round((rss_bytes() - self._rss) / 1024),
+            errors=self.errors,
+            extra=self.extra,
+        )
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if len(values) else None
+
+
+class FrameMeter:
+    """Frame timing of a GUI update slot driven by its timer.
+
+    slot() wraps the update slot: every call is one frame; the time between
+    frame starts is the achieved frame time and every whole ``interval``
+    beyond the first in such a gap counts as a dropped frame. Time spent
+    painting is added with add_paint() (the slot only schedules the paint).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.starts = []
+        self.slot_times = []
+        self.paint_times = []
+
+    def slot(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.starts.append(start)
+                self.slot_times.append(time.perf_counter() - start)
+        return wrapper
+
+    def add_paint(self, seconds):
+        self.paint_times.append(seconds)
+
+    def start(self):
+        self.starts.clear()
+        self.slot_times.clear()
+        self.paint_times.clear()
+        self._rss = rss_bytes()
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        seconds = time.perf_counter() - self._start
+        frames = np.diff(self.starts) * 1000
+        interval_ms = self.interval * 1000
+        dropped = int(np.maximum(np.rint(frames / interval_ms) - 1, 0).sum()) if interval_ms else 0
+        slots = np.array(self.slot_times) * 1000
+        paints = np.array(self.paint_times) * 1000
+        return dict(
+            frames=len(self.starts),
+            seconds=round(seconds, 3),
+            target_fps=round(1 / self.interval, 2) if self.interval else None,
+            fps=round(len(self.starts) / seconds, 2) if seconds else 0.0,
+            frame_ms_p50=_percentile(frames, 50),
+            frame_ms_p99=_percentile(frames, 99),
+            dropped_frames=dropped,
+            slot_ms_p50=_percentile(slots, 50),
+            slot_ms_p99=_percentile(slots, 99),
+            paint_ms_p50=_percentile(paints, 50),
+            paint_ms_p99=_percentile(paints, 99),
+            busy=round((slots.sum() + paints.sum()) / 1000 / seconds, 3) if seconds else None,
+            cpu_s=round(time.process_time() - self._cpu, 3),
+            rss_growth_kb=round((rss_bytes() - self._rss) / 1024),
+        )
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Rows of (case, metric, baseline, current, relative change, regressed) for cases in both runs.
+
+    A metric regressed when it got worse by more than ``tolerance``
+    (relative) and by more than its NOISE_FLOOR (absolute).
+    """
+    rows = []
+    for case, current in results.items():
+        if case not in baseline:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = baseline[case].get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / abs(before) if before else None
+            worse = before - after if higher_is_better else after - before
+            regressed = worse > NOISE_FLOOR[metric] and (change is None or abs(change) > tolerance)
+            rows.append((case, metric, before, after, change, regressed))
+    return rows
@@ -0,0 +1,146 @@
+import math
+
+import numpy as np
+
+MODES = ("minmax", "lttb")
+
+
+def minmax_indices(y, bucket):
+    """Index of the min and max of every whole bucket of y in time order, shape (buckets, 2)."""
+    k = len(y) // bucket
+    blocks = np.asarray(y[:k * bucket]).reshape(k, bucket)
+    pairs = np.stack([blocks.argmin(axis=1), blocks.argmax(axis=1)], axis=1)
+    pairs.sort(axis=1)
+    return pairs + (np.arange(k) * bucket)[:, np.newaxis]
+
+
+def _lttb_pick(x, y, start, stop, ax, ay, cx, cy):
+    """Index in [start, stop) forming the largest triangle with points a and c."""
+    xs = x[start:stop]
+    ys = y[start:stop]
+    area = np.abs((ax - cx) * (ys - ay) - (ax - xs) * (cy - ay))
+    return start + int(area.argmax())
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points, first and last included."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        nxt = slice(stop, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        a = _lttb_pick(x, y, start, stop, x[a], y[a], x[nxt].mean(), y[nxt].mean())
+        picks[i + 1] = a
+    return picks
+
+
+class Decimator:
+    """Incremental min/max or LTTB decimation of a sliding window, sized to a pixel width.
+
+    update() takes the current window of a stream (e.g. a RingBuffer
+    snapshot) together with the absolute index of its first sample. Buckets
+    are fixed in absolute sample index, so the result for every complete
+    bucket is cached and only buckets touched by new samples are computed.
+    Windows that fit in about two points per pixel are returned untouched.
+    """
+
+    def __init__(self, width, window, mode="minmax"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown decimation mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.window = window
+        self.width = self.bucket = None
+        self.resize(width)
+
+    def resize(self, width, window=None):
+        """Change the pixel width (or window length); the cache is dropped if the bucket size changes."""
+        self.width = max(1, int(width))
+        window = window or self.window
+        bucket = max(1, math.ceil(window / self.width))
+        if bucket != self.bucket or window != self.window:
+            self.window = window
+            self.bucket = bucket
+            self.reset()
+
+    def reset(self):
+        """Forget cached buckets, e.g. after the source buffer was cleared."""
+        self._slots = math.ceil(self.window / self.bucket) + 2
+        self._picks = np.zeros((self._slots, 2 if self.mode == "minmax" else 1), dtype=np.int64)
+        self._lo = self._hi = 0  # Cached bucket numbers [lo, hi)
+        self._anchor = None  # Last cached LTTB pick (x, y)
+
+    def update(self, x, y, first_index=0):
+        """Decimated (x, y) for the window x, y whose first sample has absolute index first_index."""
+        n = len(y)
+        if n <= 2 * self.width:
+            return x, y
+        if n > self.window:
+            self.resize(self.width, n)
+        bucket = self.bucket
+        end = first_index + n
+        first_bucket = -(-first_index // bucket)  # First bucket fully inside the window
+        last_bucket = end // bucket  # One past the last complete bucket
+        if first_bucket < self._lo or first_bucket > self._hi or end < self._hi * bucket:
+            self._lo = self._hi = first_bucket  # Gap, restart or cleared buffer
+            self._anchor = None
+
+        if self.mode == "minmax":
+            picks = self._update_minmax(y, first_index, first_bucket, last_bucket)
+        else:
+            picks = self._update_lttb(x, y, first_index, first_bucket, last_bucket)
+        return x[picks], y[picks]
+
+    def _cached(self, first_bucket, stop_bucket, first_index):
+        slots = np.arange(first_bucket, stop_bucket) % self._slots
+        return self._picks[slots].ravel() - first_index
+
+    def _store(self, start_bucket, picks):
+        slots = np.arange(start_bucket, start_bucket + len(picks)) % self._slots
+        self._picks[slots] = picks
+        self._hi = start_bucket + len(picks)
+        self._lo = max(self._lo, self._hi - self._slots)
+
+    def _update_minmax(self, y, first_index, first_bucket, last_bucket):
+        bucket = self.bucket
+        if last_bucket > self._hi:
+            start = self._hi * bucket - first_index
+            stop = last_bucket * bucket - first_index
+            self._store(self._hi, minmax_indices(y[start:stop], bucket) + self._hi * bucket)
+
+        parts = []
+        lead = first_bucket * bucket - first_index  # Samples before the first whole bucket
+        if lead:
+            parts.append(np.unique([y[:lead].argmin(), y[:lead].argmax()]))
+        parts.append(self._cached(first_bucket, last_bucket, first_index))
+        tail = last_bucket * bucket - first_index
+        if tail < len(y):
+            rest = y[tail:]
+            parts.append(tail + np.unique([rest.argmin(), rest.argmax()]))
+        return np.concatenate(parts)
+
+    def _update_lttb(self, x, y, first_index, first_bucket, last_bucket):
+        bucket = self.bucket
+        if self._anchor is None:
+            self._anchor = (x[0], y[0])
+
+        # A bucket's pick is final once the bucket after it is complete
+        for b in range(self._hi, last_bucket - 1):
+            start = b * bucket - first_index
+            nxt = slice(start + bucket, start + 2 * bucket)
+            pick = _lttb_pick(x, y, start, start + bucket, *self._anchor, x[nxt].mean(), y[nxt].mean())
+            self._store(b, np.array([[pick + first_index]]))
+            self._anchor = (x[pick], y[pick])
+
+        parts = [[0], self._cached(first_bucket, self._hi, first_index)]
+        if last_bucket > self._hi:
+            # Last complete bucket: provisional pick against the partial tail
+            start = self._hi * bucket - first_index
+            rest = slice(start + bucket, len(y)) if start + bucket < len(y) else slice(len(y) - 1, len(y))
+            parts.append([_lttb_pick(x, y, start, start + bucket, *self._anchor, x[rest].mean(), y[rest].mean())])
+        parts.append([len(y) - 1])
+        return np.unique(np.concatenate(parts).astype(np.int64))
@@ -0,0 +1,59 @@
+import numpy as np
+
+
+class RegisterDecoder:
+    """Turn a batch of raw 16-bit register words into a (samples, channels) array in one step.
+
+    fmt:
+        "u16"  one unsigned register per channel
+        "i16"  one two's complement register per channel
+        "i24"  ADS1256 24-bit code split over two registers per channel,
+               high register first (bits 23..16 in its low byte), then bits 15..0
+    Values are ``code * scale + offset`` with scale and offset either scalars
+    or one value per channel. With an integer dtype the raw codes are returned
+    and scale/offset are ignored.
+    """
+
+    FORMATS = ("u16", "i16", "i24")
+
+    def __init__(self, channels, fmt="u16", scale=1.0, offset=0.0, dtype=np.float32):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown register format {fmt!r}, expected one of {self.FORMATS}")
+        self.channels = channels
+        self.fmt = fmt
+        self.registers_per_sample = channels * (2 if fmt == "i24" else 1)
+        self.dtype = np.dtype(dtype)
+        self.scale = np.asarray(scale, dtype=np.float64 if self.dtype == np.float64 else np.float32)
+        self.offset = np.asarray(offset, dtype=self.scale.dtype)
+        for name, value in (("scale", self.scale), ("offset", self.offset)):
+            if value.ndim and value.shape != (channels,):
+                raise ValueError(f"{name} must be a scalar or have one value per channel")
+
+    def codes(self, registers):
+        """Raw int32 codes, shape (samples, channels). Trailing partial samples are dropped."""
+        words = np.asarray(registers, dtype=np.uint16)
+        whole = len(words) - len(words) % self.registers_per_sample
+        words = words[:whole]
+        if self.fmt == "u16":
+            codes = words.astype(np.int32)
+        elif self.fmt == "i16":
+            codes = words.view(np.int16).astype(np.int32)
+        else:
+            codes = ((words[0::2] & 0xFF).astype(np.int32) << 16) | words[1::2]
+            codes = (codes ^ 0x800000) - 0x800000  # Sign extend bit 23
+        return codes.reshape(-1, self.channels)
+
+    def decode(self, registers):
+        """Decoded values, shape (samples, channels)."""
+        codes = self.codes(registers)
+        if self.dtype.kind in "iu":
+            return codes.astype(self.dtype, copy=False)
+        values = codes.astype(self.scale.dtype)
+        values *= self.scale
+        if self.offset.any():
+            values += self.offset
+        return values.astype(self.dtype, copy=False)
+
+
+# Slaves send millivolts in unsigned registers
+MILLIVOLT_DECODER = RegisterDecoder(4, "u16", scale=0.001)
@@ -0,0 +1,126 @@
+import numpy as np
+
+from streamer.rtu import CRC16_TABLE
+
+# Binary sample frame, little endian:
+#   sync  2 bytes  0xA5 0x5A
+#   seq   uint16   frame counter, wraps at 65536
+#   data  channels x int24 (3 bytes) or int32 ADC codes
+#   crc   uint16   Modbus CRC16 of seq + data
+SYNC = b"\xA5\x5A"
+SAMPLE_FORMATS = ("i24", "i32")
+# Channels per frame sent by src/Arduino_IDE/Serial_Graph_ADS1256 (its NUM_CHANNELS):
+# every reader of that sketch takes the count from here, change both together
+ADS1256_FRAME_CHANNELS = 3
+
+_CRC_TABLE = np.array(CRC16_TABLE, dtype=np.uint16)
+
+
+def crc16_rows(rows):
+    """Modbus CRC16 of every row of a (frames, bytes) uint8 array, computed across all frames at once."""
+    crc = np.full(len(rows), 0xFFFF, dtype=np.uint16)
+    for column in rows.T:
+        crc = (crc >> 8) ^ _CRC_TABLE[(crc ^ column) & 0xFF]
+    return crc
+
+
+class FrameFormat:
+    """Layout of one binary frame with ``channels`` samples of int24 or int32."""
+
+    def __init__(self, channels, sample="i24"):
+        if sample not in SAMPLE_FORMATS:
+            raise ValueError(f"Unknown sample format {sample!r}, expected one of {SAMPLE_FORMATS}")
+        self.channels = channels
+        self.sample = sample
+        data = ("data", "u1", (channels, 3)) if sample == "i24" else ("data", "<i4", (channels,))
+        self.dtype = np.dtype([("sync", "u1", (2,)), ("seq", "<u2"), data, ("crc", "<u2")])
+        self.size = self.dtype.itemsize
+
+    def codes(self, frames):
+        """int32 (frames, channels) codes from a structured frame array."""
+        data = frames["data"]
+        if self.sample == "i32":
+            return data.astype(np.int32)
+        codes = data[..., 0].astype(np.int32) | (data[..., 1].astype(np.int32) << 8) | (data[..., 2].astype(np.int32) << 16)
+        return (codes ^ 0x800000) - 0x800000  # Sign extend bit 23
+
+    def encode(self, seq, codes):
+        """Frames for a (frames, channels) code array, e.g. for a simulator or a test."""
+        codes = np.asarray(codes, dtype=np.int32).reshape(-1, self.channels)
+        frames = np.zeros(len(codes), dtype=self.dtype)
+        frames["sync"] = np.frombuffer(SYNC, dtype=np.uint8)
+        frames["seq"] = np.asarray(seq, dtype=np.int64) & 0xFFFF
+        if self.sample == "i32":
+            frames["data"] = codes
+        else:
+            raw = codes.astype("<i4").view(np.uint8).reshape(len(codes), self.channels, 4)
+            frames["data"] = raw[..., :3]
+        body = frames.view(np.uint8).reshape(len(codes), self.size)[:, 2:-2]
+        frames["crc"] = crc16_rows(body)
+        return frames.tobytes()
+
+
+class FrameParser:
+    """Incremental decoder for a byte stream of binary frames.
+
+    feed() takes whatever the port returned, carries an incomplete tail over
+    to the next call and decodes all complete frames at once: aligned runs
+    of frames are viewed with np.frombuffer and the CRC is checked for all of
+    them together. Bytes that do not belong to a frame are skipped until the
+    next sync word.
+    """
+
+    def __init__(self, channels, sample="i24"):
+        self.format = FrameFormat(channels, sample)
+        self._carry = b""
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        """Returns (seq uint16 array, int32 (frames, channels) codes) of the frames completed by data."""
+        buf = self._carry + bytes(data)
+        size = self.format.size
+        raw = np.frombuffer(buf, dtype=np.uint8)
+        seqs, codes = [], []
+        pos = 0
+        while len(buf) - pos >= size:
+            start = buf.find(SYNC, pos)
+            if start < 0:
+                # Keep a trailing 0xA5, it may be the first half of the next sync word
+                keep = 1 if raw[-1] == SYNC[0] else 0
+                self.skipped_bytes += len(buf) - pos - keep
+                pos = len(buf) - keep
+                break
+            self.skipped_bytes += start - pos
+            count = (len(buf) - start) // size
+            if not count:
+                pos = start
+                break
+            frames = np.frombuffer(buf, dtype=self.format.dtype, count=count, offset=start)
+            aligned = (frames["sync"][:, 0] == SYNC[0]) & (frames["sync"][:, 1] == SYNC[1])
+            run = count if aligned.all() else int(aligned.argmin())  # Frames up to the first lost sync
+            frames = frames[:run]
+            body = raw[start:start + run * size].reshape(run, size)[:, 2:-2]
+            good = crc16_rows(body) == frames["crc"]
+            if not good[0]:
+                # Most likely a sync pattern inside the data, look for the next one
+                self.skipped_bytes += 1
+                pos = start + 1
+                continue
+            self.crc_errors += run - int(good.sum())
+            frames = frames[good]
+            seqs.append(frames["seq"].astype(np.uint16))
+            codes.append(self.format.codes(frames))
+            self.frames += len(frames)
+            pos = start + run * size
+            if run < count:
+                # The last frame of the run may be cut short, resync from inside it
+                pos -= size - 2
+        self._carry = buf[pos:]
+        if not seqs:
+            return np.empty(0, np.uint16), np.empty((0, self.format.channels), np.int32)
+        return np.concatenate(seqs), np.concatenate(codes)
+
+    def stats(self):
+        return {"frames": self.frames, "crc_errors": self.crc_errors, "skipped_bytes": self.skipped_bytes}
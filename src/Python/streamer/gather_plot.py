@@ -0,0 +1,129 @@
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.transforms import Affine2D
+
+from streamer.ring_buffer import ScrollingGather
+
+MODES = ("wiggle", "image")
+
+
+class GatherRenderer:
+    """Scrolling seismic gather drawn with a few matplotlib artists and blitting.
+
+    "wiggle" draws every trace as one path of a single LineCollection, with
+    the positive lobes filled (variable area) by one PolyCollection. Traces
+    keep a fixed slot and absolute x position; scrolling only moves a
+    translation in the artists' transform, so push() rewrites the vertices
+    of one slot and nothing else. "image" shows the gather as one
+    rasterized image instead.
+
+    The axes, ticks and labels are drawn once and cached as the blit
+    background, draw() only repaints the gather artists. Call from the GUI
+    thread.
+    """
+
+    def __init__(self, ax, num_samples, num_traces, mode="wiggle", fill=True, scale=1.0,
+                 times=None, color="black", cmap="gray"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown gather mode {mode!r}, expected one of {MODES}")
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.num_samples = num_samples
+        self.num_traces = num_traces
+        self.mode = mode
+        self.fill = fill
+        self.scale = scale
+        self.times = np.arange(num_samples, dtype=np.float64) if times is None else np.asarray(times, np.float64)
+        self._background = None
+        self._artists = []
+
+        ax.set_xlim(-1, num_traces + 1)
+        ax.set_ylim(self.times[0], self.times[-1])
+        if mode == "wiggle":
+            self._shift = Affine2D()
+            transform = self._shift + ax.transData
+            self.lines = LineCollection(self._trace_vertices(np.arange(num_traces), np.zeros((num_traces, num_samples))),
+                                        colors=color, linewidths=0.6, transform=transform, animated=True)
+            ax.add_collection(self.lines, autolim=False)
+            self._artists.append(self.lines)
+            if fill:
+                self.fills = PolyCollection(self._fill_vertices(np.arange(num_traces), np.zeros((num_traces, num_samples))),
+                                            facecolors=color, edgecolors="none", alpha=0.5,
+                                            transform=transform, animated=True)
+                ax.add_collection(self.fills, autolim=False)
+                self._artists.insert(0, self.fills)
+        else:
+            self._gather = ScrollingGather(num_samples, num_traces)
+            self.image = ax.imshow(self._gather.view(), aspect="auto", origin="lower", cmap=cmap, interpolation="nearest",
+                                   extent=(-0.5, num_traces - 0.5, self.times[0], self.times[-1]), animated=True)
+            self._artists.append(self.image)
+        self.reset()
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _trace_vertices(self, positions, traces):
+        """(traces, samples, 2) wiggle polylines, trace i centred on x = positions[i]."""
+        vertices = np.empty((len(positions), self.num_samples, 2))
+        vertices[:, :, 0] = positions[:, np.newaxis] + self.scale * traces
+        vertices[:, :, 1] = self.times
+        return vertices
+
+    def _fill_vertices(self, positions, traces):
+        """(traces, samples + 2, 2) polygons between the baseline and the positive part of each trace."""
+        vertices = np.empty((len(positions), self.num_samples + 2, 2))
+        vertices[:, 1:-1] = self._trace_vertices(positions, np.maximum(traces, 0))
+        vertices[:, 0, 0] = vertices[:, -1, 0] = positions
+        vertices[:, 0, 1] = self.times[0]
+        vertices[:, -1, 1] = self.times[-1]
+        return vertices
+
+    def reset(self):
+        """Show an all-zero gather."""
+        self.count = 0  # Traces pushed since reset
+        if self.mode == "wiggle":
+            zeros = np.zeros((self.num_traces, self.num_samples))
+            positions = np.arange(self.num_traces)
+            for path, vertices in zip(self.lines.get_paths(), self._trace_vertices(positions, zeros)):
+                path.vertices[:] = vertices
+            if self.fill:
+                for path, vertices in zip(self.fills.get_paths(), self._fill_vertices(positions, zeros)):
+                    path.vertices[:len(vertices)] = vertices
+            self._shift.clear()
+        else:
+            self._gather.clear()
+            self.image.set_data(self._gather.view())
+
+    def push(self, trace):
+        """Add the newest trace on the right, scrolling the oldest one out."""
+        trace = np.zeros(self.num_samples) if trace is None else np.asarray(trace, dtype=np.float64)
+        position = self.num_traces + self.count  # Absolute x of the new trace before the shift
+        self.count += 1
+        if self.mode == "wiggle":
+            slot = position % self.num_traces
+            positions = np.array([position])
+            self.lines.get_paths()[slot].vertices[:] = self._trace_vertices(positions, trace[np.newaxis])[0]
+            if self.fill:
+                polygon = self._fill_vertices(positions, trace[np.newaxis])[0]
+                self.fills.get_paths()[slot].vertices[:len(polygon)] = polygon
+            self._shift.clear().translate(-self.count, 0)
+            for artist in self._artists:
+                artist.stale = True
+        else:
+            self._gather.push(trace)
+            self.image.set_data(self._gather.view())
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self._artists:
+            self.ax.draw_artist(artist)
+
+    def draw(self):
+        """Repaint only the gather on top of the cached axes background."""
+        if self._background is None:
+            self.canvas.draw()  # Fills the background through _on_draw
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
@@ -0,0 +1,156 @@
+import logging
+import time
+from collections import Counter
+
+import numpy as np
+
+# One row per gap: position in the batch of the first sample after the gap,
+# first missing sequence number and number of samples lost in a row.
+GAP_DTYPE = np.dtype([("index", "<i8"), ("seq", "<i8"), ("lost", "<i8")])
+
+
+class SequenceTracker:
+    """Loss accounting for one stream of wrapping sequence numbers.
+
+    update() takes the sequence numbers of a batch in arrival order and
+    compares every number with the one before it, modulo 2**bits, so the
+    wraparound from 2**bits - 1 to 0 is a normal step of 1. A step of 0 is
+    a duplicate, a forward step of n > 1 is a gap of n - 1 lost samples and
+    a step backwards is a restart of the sender (reset or reboot), after
+    which counting continues from the new number. Reordered streams should
+    go through a reorder buffer first.
+    """
+
+    def __init__(self, bits=16):
+        self.modulus = 1 << bits
+        self.expected = None  # Next sequence number, None before the first sample
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.restarts = 0
+        self.bursts = Counter()  # Lost samples in a row -> number of gaps
+
+    def update(self, seq):
+        """Returns (keep, gaps): keep is False for duplicates, gaps a GAP_DTYPE array."""
+        seq = np.asarray(seq, dtype=np.int64) % self.modulus
+        if not len(seq):
+            return np.ones(0, dtype=bool), np.empty(0, GAP_DTYPE)
+        first = seq[0] if self.expected is None else self.expected
+        previous = np.concatenate(([first - 1], seq[:-1]))
+        step = (seq - previous) % self.modulus
+
+        keep = step != 0
+        restart = step > self.modulus // 2
+        gap = (step > 1) & ~restart
+        gaps = np.empty(int(gap.sum()), GAP_DTYPE)
+        gaps["index"] = np.flatnonzero(gap)
+        gaps["seq"] = (previous[gap] + 1) % self.modulus
+        gaps["lost"] = step[gap] - 1
+
+        self.received += int(keep.sum())
+        self.duplicates += len(seq) - int(keep.sum())
+        self.restarts += int(restart.sum())
+        self.lost += int(gaps["lost"].sum())
+        self.bursts.update(gaps["lost"].tolist())
+        self.expected = int(seq[-1] + 1) % self.modulus
+        return keep, gaps
+
+    def loss_rate(self):
+        """Lost samples as a fraction of the samples the sender produced."""
+        total = self.received + self.lost
+        return self.lost / total if total else 0.0
+
+    def burst_histogram(self, edges=(1, 2, 4, 8, 16, 64, 256, 1024)):
+        """Number of gaps per burst length bin, {"1": n, "2-3": n, ..., "1024+": n}."""
+        histogram = {}
+        for low, high in zip(edges, list(edges[1:]) + [None]):
+            label = f"{low}+" if high is None else (str(low) if high == low + 1 else f"{low}-{high - 1}")
+            histogram[label] = sum(count for length, count in self.bursts.items()
+                                   if length >= low and (high is None or length < high))
+        return histogram
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "restarts": self.restarts,
+            "loss_rate": self.loss_rate(),
+            "max_burst": max(self.bursts) if self.bursts else 0,
+        }
+
+
+class IntegrityMonitor:
+    """A SequenceTracker per source, writing every gap to an optional Recorder.
+
+    check() returns the keep mask of the batch (duplicates dropped), so a
+    caller does ``samples = samples[monitor.check(source, seq)]``. Losses
+    are logged as at most one warning per source every ``log_interval``
+    seconds, summing the gaps since the last one; stats() has the totals.
+    """
+
+    def __init__(self, bits=16, recorder=None, logger=None, log_interval=5.0):
+        self.bits = bits
+        self.recorder = recorder
+        self.logger = logger or logging.getLogger(__name__)
+        self.log_interval = log_interval
+        self.trackers = {}
+        self._pending = {}  # source -> [lost, gaps] not logged yet
+        self._last_log = {}
+
+    def tracker(self, source):
+        if source not in self.trackers:
+            self.trackers[source] = SequenceTracker(self.bits)
+        return self.trackers[source]
+
+    def check(self, source, seq, timestamps=None):
+        """Track the sequence numbers of one batch; timestamps as for Recorder.write()."""
+        keep, gaps = self.tracker(source).update(seq)
+        if len(gaps):
+            pending = self._pending.setdefault(source, [0, 0])
+            pending[0] += int(gaps["lost"].sum())
+            pending[1] += len(gaps)
+            if self.recorder is not None:
+                if timestamps is None:
+                    timestamps = time.monotonic_ns()
+                stamps = np.broadcast_to(np.asarray(timestamps, dtype=np.int64), (len(keep),))
+                self.recorder.write_gaps(source, gaps["seq"], gaps["lost"], stamps[gaps["index"]])
+        if self._pending.get(source):
+            self._log_losses(source)
+        return keep
+
+    def _log_losses(self, source):
+        now = time.monotonic()
+        last = self._last_log.get(source)
+        if last is not None and now - last < self.log_interval:
+            return
+        lost, gaps = self._pending.pop(source)
+        tracker = self.trackers[source]
+        since = f"in the last {now - last:.1f} s" if last is not None else "so far"
+        self.logger.warning(f"Source {source}: {lost} samples lost in {gaps} gap(s) {since}, "
+                            f"{tracker.lost} in total ({tracker.loss_rate() * 100:.2f}%)")
+        self._last_log[source] = now
+
+    def check_block(self, source, first, count, timestamps=None):
+        """check() for a block of ``count`` consecutive numbers starting at ``first``.
+
+        A block that starts up to ``count`` numbers behind the expected one
+        repeats samples already delivered (the reply to a retried read): those
+        are dropped as duplicates instead of counted as a sender restart.
+        """
+        tracker = self.tracker(source)
+        seq = int(first) + np.arange(count)
+        repeated = 0
+        if tracker.expected is not None:
+            behind = (tracker.expected - int(first)) % tracker.modulus
+            if behind <= count:
+                repeated = behind
+        keep = np.zeros(count, dtype=bool)
+        tracker.duplicates += repeated
+        if timestamps is not None and np.ndim(timestamps):
+            timestamps = np.asarray(timestamps)[repeated:]
+        keep[repeated:] = self.check(source, seq[repeated:], timestamps)
+        return keep
+
+    def stats(self):
+        return {source: tracker.stats() for source, tracker in self.trackers.items()}
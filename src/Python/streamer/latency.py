@@ -0,0 +1,52 @@
+from collections import deque
+
+
+class RttTracker:
+    """Running round-trip time distribution of one slave and the timeout derived from it.
+
+    The timeout is ``percentile(99) * margin`` clamped to ``[floor, ceiling]``.
+    Until ``min_samples`` round trips have been seen the ceiling is used.
+    Every timeout in a row doubles the timeout (up to the ceiling) so a slave
+    that got slower is not cut off forever; the next good reply resets it.
+    """
+
+    def __init__(self, window=256, margin=3.0, floor=0.005, ceiling=0.5, min_samples=16):
+        self.samples = deque(maxlen=window)
+        self.margin = margin
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+        self._sorted = None  # Cached sorted copy of samples, reset on every add
+
+    def add(self, rtt):
+        self.samples.append(rtt)
+        self.consecutive_timeouts = 0
+        self._sorted = None
+
+    def record_timeout(self):
+        self.timeouts += 1
+        self.consecutive_timeouts += 1
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        index = min(len(self._sorted) - 1, int(round(q / 100.0 * (len(self._sorted) - 1))))
+        return self._sorted[index]
+
+    def timeout(self):
+        if len(self.samples) < self.min_samples:
+            return self.ceiling
+        timeout = self.percentile(99) * self.margin * 2 ** self.consecutive_timeouts
+        return min(max(timeout, self.floor), self.ceiling)
+
+    def stats(self):
+        return {
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "timeout": self.timeout(),
+            "timeouts": self.timeouts,
+        }
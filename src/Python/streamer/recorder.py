@@ -0,0 +1,238 @@
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# File layout (little endian):
+#   MAGIC, uint32 header length, UTF-8 JSON header (sources, channels, scale, offset)
+#   then blocks of BLOCK_HEADER (kind, source index, rows, payload bytes) + payload.
+# A samples block holds rows int64 monotonic-ns timestamps followed by
+# rows x channels int32 codes. A gaps block holds rows int64 timestamps of the
+# first sample after each gap, then rows int64 first missing sequence numbers
+# and rows int64 lost counts (see streamer.integrity). Readers skip block
+# kinds they do not know.
+MAGIC = b"STRMREC1"
+FORMAT_VERSION = 1
+BLOCK_HEADER = struct.Struct("<HHII")
+BLOCK_SAMPLES = 1
+BLOCK_GAPS = 2
+GAP_RECORD_DTYPE = np.dtype([("timestamp", "<i8"), ("seq", "<i8"), ("lost", "<i8")])
+
+
+class Recorder:
+    """Append-only binary recording of int32 samples from several sources.
+
+    write() only puts the arrays on a queue; a background thread groups
+    everything queued per source into one block every ``flush_interval``
+    seconds and writes it through a large buffer. Values are stored as int32
+    codes with the per-channel scale/offset in the header, so float input is
+    quantized with ``round((value - offset) / scale)``.
+    """
+
+    def __init__(self, path, sources, channels, scale=1.0, offset=0.0, metadata=None,
+                 flush_interval=0.5, buffer_size=1 << 20):
+        if isinstance(channels, int):
+            channels = [f"A{i}" for i in range(channels)]
+        self.path = path
+        self.channels = len(channels)
+        self.scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), (self.channels,)).copy()
+        self.offset = np.broadcast_to(np.asarray(offset, dtype=np.float64), (self.channels,)).copy()
+        self.source_index = {source: index for index, source in enumerate(sources)}
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.blocks_written = 0
+
+        header = {
+            "format": "streamer-recording",
+            "version": FORMAT_VERSION,
+            "created": datetime.now().isoformat(),
+            "monotonic_ns": time.monotonic_ns(),  # Pairs with "created" to map timestamps to wall time
+            "sources": [
+                {"id": source, "channels": list(channels),
+                 "scale": self.scale.tolist(), "offset": self.offset.tolist()}
+                for source in sources
+            ],
+            "metadata": metadata or {},
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer, name="Recorder", daemon=True)
+        self._thread.start()
+
+    def write(self, source, samples, timestamps=None):
+        """Queue a (rows, channels) array from ``source``.
+
+        timestamps is one monotonic-ns value per row, a single value for the
+        whole batch, or None for "now".
+        """
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            samples = samples[np.newaxis, :]
+        if not len(samples):
+            return
+        if samples.shape[1] != self.channels:
+            raise ValueError(f"Expected {self.channels} channels, got {samples.shape[1]}")
+        if samples.dtype.kind == "f":
+            codes = np.rint((samples - self.offset) / self.scale).astype(np.int32)
+        else:
+            codes = samples.astype(np.int32)  # Always a copy, the caller may reuse its array
+        if timestamps is None:
+            timestamps = time.monotonic_ns()
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.int64), (len(codes),))
+        self._queue.put((BLOCK_SAMPLES, self.source_index[source], timestamps, codes))
+
+    def write_gaps(self, source, seq, lost, timestamps=None):
+        """Queue gap records: first missing sequence number and samples lost, per gap."""
+        seq = np.atleast_1d(np.asarray(seq, dtype=np.int64)).copy()
+        lost = np.broadcast_to(np.asarray(lost, dtype=np.int64), seq.shape).copy()
+        if timestamps is None:
+            timestamps = time.monotonic_ns()
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.int64), seq.shape)
+        self._queue.put((BLOCK_GAPS, self.source_index[source], timestamps, np.stack([seq, lost])))
+
+    def close(self):
+        """Write everything still queued and close the file."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _writer(self):
+        while True:
+            stopping = self._stop.wait(self.flush_interval)
+            self._write_pending()
+            if stopping:
+                break
+        self._file.flush()
+
+    def _write_pending(self):
+        pending = {}
+        while True:
+            try:
+                kind, index, timestamps, rows = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.setdefault((kind, index), []).append((timestamps, rows))
+
+        for (kind, index), batches in pending.items():
+            timestamps = np.concatenate([batch[0] for batch in batches])
+            if kind == BLOCK_GAPS:
+                gaps = np.concatenate([batch[1] for batch in batches], axis=1)  # (seq, lost) rows
+                self._write_block(kind, index, len(timestamps), timestamps.tobytes() + gaps.tobytes())
+                continue
+            codes = np.concatenate([batch[1] for batch in batches])
+            self._write_block(kind, index, len(codes), timestamps.tobytes() + codes.tobytes())
+            self.rows_written += len(codes)
+        if pending:
+            self._file.flush()
+
+    def _write_block(self, kind, index, rows, payload):
+        self._file.write(BLOCK_HEADER.pack(kind, index, rows, len(payload)))
+        self._file.write(payload)
+        self.blocks_written += 1
+
+
+class Recording:
+    """A recording read back into NumPy arrays, indexed by source id."""
+
+    def __init__(self, header, timestamps, codes, gaps=None):
+        self.header = header
+        self.sources = [source["id"] for source in header["sources"]]
+        self._layout = {source["id"]: source for source in header["sources"]}
+        self._timestamps = timestamps
+        self._codes = codes
+        self._gaps = gaps or {}
+
+    def channels(self, source):
+        return self._layout[source]["channels"]
+
+    def timestamps(self, source):
+        """int64 monotonic-ns timestamp of every row."""
+        return self._timestamps[source]
+
+    def codes(self, source):
+        """Raw int32 codes, shape (rows, channels)."""
+        return self._codes[source]
+
+    def gaps(self, source):
+        """GAP_RECORD_DTYPE array (timestamp, seq, lost) of the losses recorded for a source."""
+        return self._gaps.get(source, np.empty(0, GAP_RECORD_DTYPE))
+
+    def values(self, source, dtype=np.float64):
+        """Codes converted with the scale and offset stored in the header."""
+        layout = self._layout[source]
+        values = self._codes[source].astype(dtype)
+        values *= np.asarray(layout["scale"], dtype=dtype)
+        values += np.asarray(layout["offset"], dtype=dtype)
+        return values
+
+
+def read_recording(path):
+    """Load a file written by Recorder. Blocks of unknown kinds are skipped."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a streamer recording")
+    (header_len,) = struct.unpack_from("<I", buf, len(MAGIC))
+    pos = len(MAGIC) + 4
+    header = json.loads(buf[pos:pos + header_len].decode("utf-8"))
+    pos += header_len
+
+    sources = header["sources"]
+    timestamps = [[] for _ in sources]
+    codes = [[] for _ in sources]
+    gaps = [[] for _ in sources]
+    while pos + BLOCK_HEADER.size <= len(buf):
+        kind, index, rows, size = BLOCK_HEADER.unpack_from(buf, pos)
+        pos += BLOCK_HEADER.size
+        if pos + size > len(buf):
+            break  # Truncated last block, e.g. the writer was killed
+        if kind == BLOCK_SAMPLES:
+            channels = len(sources[index]["channels"])
+            timestamps[index].append(np.frombuffer(buf, np.int64, rows, pos))
+            codes[index].append(np.frombuffer(buf, np.int32, rows * channels, pos + 8 * rows).reshape(rows, channels))
+        elif kind == BLOCK_GAPS:
+            records = np.empty(rows, GAP_RECORD_DTYPE)
+            fields = np.frombuffer(buf, np.int64, 3 * rows, pos).reshape(3, rows)
+            records["timestamp"], records["seq"], records["lost"] = fields
+            gaps[index].append(records)
+        pos += size
+
+    def join(parts, empty):
+        return np.concatenate(parts) if parts else empty
+
+    return Recording(
+        header,
+        {source["id"]: join(timestamps[i], np.empty(0, np.int64)) for i, source in enumerate(sources)},
+        {source["id"]: join(codes[i], np.empty((0, len(source["channels"])), np.int32))
+         for i, source in enumerate(sources)},
+        {source["id"]: join(gaps[i], np.empty(0, GAP_RECORD_DTYPE)) for i, source in enumerate(sources)},
+    )
+
+
+if __name__ == "__main__":
+    # python -m streamer.recorder recording.bin
+    recording = read_recording(sys.argv[1])
+    print(f"Created {recording.header['created']}")
+    for source in recording.sources:
+        stamps = recording.timestamps(source)
+        span = (stamps[-1] - stamps[0]) / 1e9 if len(stamps) > 1 else 0.0
+        gaps = recording.gaps(source)
+        print(f"Source {source}: {len(stamps)} rows over {span:.1f} s, channels {recording.channels(source)}, "
+              f"{int(gaps['lost'].sum())} lost in {len(gaps)} gaps")
@@ -0,0 +1,124 @@
+import time
+
+from streamer.integrity import IntegrityMonitor
+
+
+class ReorderBuffer:
+    """Puts the packets of one stream back in sequence order.
+
+    push() holds packets that arrive ahead of the next expected sequence
+    number and releases them in order as soon as the gap is filled. A gap
+    is given up (the missing packets count as lost) when more than
+    ``window`` packets are held or the oldest held packet has waited
+    ``max_delay`` seconds, so the added latency is bounded by both.
+    Packets behind the expected number (they were given up already, or are
+    duplicates) are dropped and counted in ``late``; a jump back by more
+    than ``restart_gap`` is a restart of the sender and starts over.
+    """
+
+    def __init__(self, window=32, max_delay=0.05, bits=32, restart_gap=1024):
+        self.window = window
+        self.max_delay = max_delay
+        self.restart_gap = restart_gap
+        self.modulus = 1 << bits
+        self.expected = None
+        self._pending = {}  # seq -> (arrival time, block)
+        self.late = 0
+        self.restarts = 0
+        self.max_held = 0
+
+    def push(self, seq, block, now=None):
+        """Returns the list of (seq, block) that are now in order."""
+        now = time.monotonic() if now is None else now
+        ready = []
+        if self.expected is None:
+            self.expected = seq
+        behind = (self.expected - seq) % self.modulus
+        if 0 < behind <= self.modulus // 2:
+            if behind <= self.restart_gap:
+                self.late += 1
+                return ready
+            # Far behind: the sender restarted, hand out what is held and follow the new numbers
+            self.restarts += 1
+            ready = self.flush()
+            self.expected = seq
+        if seq in self._pending:
+            self.late += 1
+            return ready
+        self._pending[seq] = (now, block)
+        self.max_held = max(self.max_held, len(self._pending))
+        return ready + self.poll(now)
+
+    def poll(self, now=None):
+        """Release what is in order, giving up gaps past the window or max_delay; call also when idle."""
+        now = time.monotonic() if now is None else now
+        ready = self._release()
+        while self._pending and (len(self._pending) > self.window or
+                                 min(arrival for arrival, _ in self._pending.values()) + self.max_delay <= now):
+            self.expected = min(self._pending, key=lambda seq: (seq - self.expected) % self.modulus)
+            ready += self._release()
+        return ready
+
+    def flush(self):
+        """Release everything held, in order, skipping the gaps."""
+        ready = []
+        while self._pending:
+            self.expected = min(self._pending, key=lambda seq: (seq - self.expected) % self.modulus)
+            ready += self._release()
+        return ready
+
+    def _release(self):
+        ready = []
+        while self.expected in self._pending:
+            ready.append((self.expected, self._pending.pop(self.expected)[1]))
+            self.expected = (self.expected + 1) % self.modulus
+        return ready
+
+    def __len__(self):
+        return len(self._pending)
+
+
+class StreamDemux:
+    """Splits packets into streams keyed by (source address, board id) and reorders each one.
+
+    feed() hands every in-order block to ``on_block(key, seq, block)``;
+    poll() must also be called periodically so a stream that went quiet
+    still releases what it holds within ``max_delay``. Packet loss per
+    stream is counted by an IntegrityMonitor on the released sequence
+    numbers, see stats().
+    """
+
+    def __init__(self, on_block, window=32, max_delay=0.05, bits=32):
+        self.on_block = on_block
+        self.window = window
+        self.max_delay = max_delay
+        self.bits = bits
+        self.streams = {}
+        self.integrity = IntegrityMonitor(bits=bits)
+
+    def feed(self, source, board_id, seq, block, now=None):
+        key = (source, board_id)
+        if key not in self.streams:
+            self.streams[key] = ReorderBuffer(self.window, self.max_delay, self.bits)
+        self._deliver(key, self.streams[key].push(seq, block, now))
+
+    def poll(self, now=None):
+        now = time.monotonic() if now is None else now
+        for key, stream in self.streams.items():
+            if len(stream):
+                self._deliver(key, stream.poll(now))
+
+    def _deliver(self, key, ready):
+        if not ready:
+            return
+        self.integrity.check(key, [seq for seq, _ in ready])
+        for seq, block in ready:
+            self.on_block(key, seq, block)
+
+    def stats(self):
+        """Per stream: lost/received packets from the sequence numbers plus late and held packets."""
+        loss = self.integrity.stats()
+        return {
+            key: dict(loss.get(key, {}), late=stream.late, held=len(stream), max_held=stream.max_held)
+            for key, stream in self.streams.items()
+        }
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer of multi-channel samples.
+
+    Backed by one (2 * capacity, channels) array: every sample is written at
+    slot i and again at i + capacity, so the last N samples are always one
+    contiguous slice and latest() never copies. append() and extend() are
+    O(1) per sample and never allocate.
+
+    With a single writer thread, snapshot() gives other threads a consistent
+    copy without a lock: the writer announces the range it is about to write
+    in ``_writing`` and publishes ``count`` only after the data is in place,
+    and the reader retries if the writer lapped the slots it copied.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32):
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((2 * capacity, channels), dtype=dtype)
+        self._pos = 0  # Next slot to write
+        self.count = 0  # Samples appended since creation (or clear), published last
+        self._writing = 0  # count once the write in progress is published
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, sample):
+        self._writing = self.count + 1
+        pos = self._pos
+        self._data[pos] = sample
+        self._data[pos + self.capacity] = sample
+        self._pos = (pos + 1) % self.capacity
+        self.count += 1
+
+    def extend(self, samples):
+        """Append a (n, channels) batch; only the last ``capacity`` rows are kept."""
+        samples = np.asarray(samples).reshape(-1, self.channels)
+        n = len(samples)
+        if n == 0:
+            return
+        self._writing = self.count + n
+        skipped = max(0, n - self.capacity)
+        if skipped:
+            samples = samples[skipped:]
+        pos = (self._pos + skipped) % self.capacity
+        cap = self.capacity
+        first = min(len(samples), cap - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[pos + cap:pos + cap + first] = samples[:first]
+        rest = len(samples) - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+        self._pos = (pos + len(samples)) % cap
+        self.count += n
+
+    def latest(self, n=None):
+        """Contiguous (n, channels) view of the newest samples, oldest first."""
+        n = len(self) if n is None else min(n, len(self))
+        end = self._pos + self.capacity
+        return self._data[end - n:end]
+
+    def indices(self, n=None):
+        """Running sample numbers matching latest(n), handy as a plot x-axis."""
+        n = len(self) if n is None else min(n, len(self))
+        return np.arange(self.count - n, self.count)
+
+    def snapshot(self, n=None):
+        """Lock-free consistent copy of the newest samples for a reader thread.
+
+        Returns ``(first_index, samples)`` where ``samples`` is an (n, channels)
+        copy, oldest first, and ``first_index`` its running sample number.
+        """
+        cap = self.capacity
+        while True:
+            count = self.count
+            size = min(count, cap) if n is None else min(n, count, cap)
+            end = count % cap + cap
+            samples = self._data[end - size:end].copy()
+            # Slots of samples [count - size, count) are reused by samples from count - size + cap on
+            if self._writing <= count - size + cap:
+                return count - size, samples
+
+    def clear(self):
+        self._pos = 0
+        self._writing = 0
+        self.count = 0
+
+
+class ScrollingGather(RingBuffer):
+    """Seismic gather of the newest ``num_traces`` traces, scrolling one trace at a time.
+
+    Traces are the rows of a RingBuffer, so push() writes one trace instead
+    of np.roll copying the whole gather, and view() returns the
+    (num_samples, num_traces) gather, oldest trace first, as a transposed
+    view without copying. Traces not received yet are zeros.
+    """
+
+    def __init__(self, num_samples, num_traces, dtype=np.float64):
+        super().__init__(num_traces, num_samples, dtype)
+        self.num_samples = num_samples
+        self.num_traces = num_traces
+        self._trace = np.zeros(num_samples, dtype=dtype)
+
+    def push(self, trace):
+        """Add the newest trace; shorter traces are padded with zeros, longer ones cut."""
+        trace = np.asarray(trace)[:self.num_samples]
+        self._trace[:len(trace)] = trace
+        self._trace[len(trace):] = 0
+        self.append(self._trace)
+
+    def view(self):
+        """(num_samples, num_traces) view of the gather, oldest trace in column 0."""
+        end = self._pos + self.capacity
+        return self._data[end - self.capacity:end].T
+
+    def clear(self):
+        self._data[:] = 0
+        super().clear()
+
+
+class WindowedHistory(RingBuffer):
+    """RingBuffer live window that also spills every sample to a Recorder.
+
+    The window keeps memory and plot cost constant however long a dashboard
+    runs; with a ``recorder`` the samples that scroll out of the window are
+    still on disk (Recorder.write() only queues, the file is written by its
+    own thread). Without a recorder it is a plain RingBuffer.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32, recorder=None, source=0):
+        super().__init__(capacity, channels, dtype)
+        self.recorder = recorder
+        self.source = source
+
+    def append(self, sample, timestamp=None):
+        if self.recorder is not None:
+            self.recorder.write(self.source, sample, timestamp)
+        super().append(sample)
+
+    def extend(self, samples, timestamps=None):
+        if self.recorder is not None and len(samples):
+            self.recorder.write(self.source, samples, timestamps)
+        super().extend(samples)
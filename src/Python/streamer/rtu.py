@@ -0,0 +1,161 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import serial
+
+
+def _make_crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = _make_crc16_table()
+
+
+def crc16(data, length=None):
+    """Modbus CRC16 (poly 0xA001, init 0xFFFF) of the first ``length`` bytes."""
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for byte in data[:length] if length is not None else data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+class RtuError(Exception):
+    """Malformed, mismatched or corrupted RTU frame."""
+
+
+class RtuTimeout(RtuError):
+    """No complete reply within the timeout."""
+
+
+class RtuExceptionResponse(RtuError):
+    """The slave answered with a Modbus exception code."""
+
+    def __init__(self, slave, function, code):
+        super().__init__(f"Slave {slave} returned exception code {code} for function {function:#04x}")
+        self.slave = slave
+        self.function = function
+        self.code = code
+
+
+class RtuTransport:
+    """Slim Modbus RTU master for FC03 reads on a serial port.
+
+    Frames are built and parsed in preallocated buffers. The registers come
+    back as a big-endian NumPy view into the receive buffer, so they are only
+    valid until the next call; copy them if they must be kept. Blocking serial
+    I/O runs on one worker thread, so calls are serialized like on the bus.
+    """
+
+    MAX_REGISTERS = 125
+
+    def __init__(self, port, baudrate=115200, timeout=0.1, serial_factory=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        # serial_factory(port, baudrate, timeout) lets tests and simulators supply any pyserial-like object
+        self.serial_factory = serial_factory or (
+            lambda port, baudrate, timeout: serial.serial_for_url(
+                port, baudrate=baudrate, bytesize=8, parity="N", stopbits=1, timeout=timeout
+            )
+        )
+        self.serial = None
+        self._tx = bytearray(8)
+        self._rx = bytearray(5 + 2 * self.MAX_REGISTERS)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rtu")
+
+    @property
+    def connected(self):
+        return self.serial is not None and self.serial.is_open
+
+    async def connect(self):
+        if self.connected:
+            return True
+        loop = asyncio.get_running_loop()
+        self.serial = await loop.run_in_executor(
+            self._executor, self.serial_factory, self.port, self.baudrate, self.timeout
+        )
+        return self.connected
+
+    async def close(self):
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
+
+    async def read_holding_registers(self, address, count, slave, timeout=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.transact_read_holding_registers, address, count, slave, timeout
+        )
+
+    def build_read_request(self, address, count, slave):
+        """Fill the transmit buffer with an FC03 request and return it."""
+        if not 1 <= count <= self.MAX_REGISTERS:
+            raise ValueError(f"count must be between 1 and {self.MAX_REGISTERS}")
+        tx = self._tx
+        tx[0] = slave
+        tx[1] = 0x03
+        tx[2] = address >> 8
+        tx[3] = address & 0xFF
+        tx[4] = count >> 8
+        tx[5] = count & 0xFF
+        crc = crc16(tx, 6)
+        tx[6] = crc & 0xFF
+        tx[7] = crc >> 8
+        return tx
+
+    def transact_read_holding_registers(self, address, count, slave, timeout=None):
+        """Blocking FC03 transaction, returns a '>u2' NumPy view of the registers."""
+        ser = self.serial
+        if ser is None:
+            raise serial.SerialException("Port is not open")
+        timeout = self.timeout if timeout is None else timeout
+        if ser.timeout != timeout:
+            ser.timeout = timeout
+
+        # Drop late replies of earlier timed-out transactions
+        ser.reset_input_buffer()
+        ser.write(self.build_read_request(address, count, slave))
+
+        rx = memoryview(self._rx)
+        # Slave, function and byte count (or exception code) come first
+        if self._read_exact(rx, 0, 3) < 3:
+            raise RtuTimeout(f"Slave {slave} did not answer")
+        if self._rx[0] != slave:
+            raise RtuError(f"Reply from slave {self._rx[0]} while waiting for slave {slave}")
+        if self._rx[1] == 0x83:
+            if self._read_exact(rx, 3, 2) < 2:
+                raise RtuTimeout(f"Slave {slave} exception reply truncated")
+            self._check_crc(5)
+            raise RtuExceptionResponse(slave, 0x03, self._rx[2])
+        if self._rx[1] != 0x03 or self._rx[2] != 2 * count:
+            raise RtuError(f"Unexpected reply header {bytes(self._rx[:3]).hex()} from slave {slave}")
+
+        length = 5 + 2 * count
+        if self._read_exact(rx, 3, length - 3) < length - 3:
+            raise RtuTimeout(f"Slave {slave} reply truncated")
+        self._check_crc(length)
+        return np.frombuffer(self._rx, dtype=">u2", count=count, offset=3)
+
+    def _read_exact(self, rx, start, size):
+        got = 0
+        while got < size:
+            chunk = self.serial.read(size - got)
+            if not chunk:
+                break
+            rx[start + got:start + got + len(chunk)] = chunk
+            got += len(chunk)
+        return got
+
+    def _check_crc(self, length):
+        expected = crc16(self._rx, length - 2)
+        received = self._rx[length - 2] | (self._rx[length - 1] << 8)
+        if expected != received:
+            raise RtuError(f"CRC mismatch: expected {expected:#06x}, received {received:#06x}")
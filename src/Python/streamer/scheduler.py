@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import logging
+import time
+
+from streamer.latency import RttTracker
+
+DEFAULT_TIMEOUT = 1.0  # Seconds a poll may take when neither deadline nor timeout is given
+
+
+class SlaveSchedule:
+    """Poll rate, deadline and counters for one slave."""
+
+    def __init__(self, slave_id, rate_hz, deadline=None, timeout=None):
+        self.slave_id = slave_id
+        self.rate_hz = rate_hz  # Requested rate
+        self.period = 1.0 / rate_hz  # Longer than requested while the bus is overloaded
+        # Time allowed from release to end of the poll. None: one period, or one
+        # round of polls over all slaves when that takes longer (see PollScheduler)
+        self.fixed_deadline = deadline
+        self.deadline = deadline if deadline is not None else self.period
+        # Longest a single poll may hold the bus. Not the period: a poll longer
+        # than its period must still succeed so its RTT can be measured
+        if timeout is None:
+            timeout = deadline if deadline is not None else DEFAULT_TIMEOUT
+        self.timeout = timeout
+        self.rtt = RttTracker(ceiling=self.timeout)  # Bus time of the successful polls
+        self.next_release = 0.0
+        self.polls = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.misses = 0  # Polls that finished after a deadline that could be met
+        self.samples = 0
+
+
+class PollScheduler:
+    """Earliest-deadline-first poll scheduler for slaves sharing one bus.
+
+    ``poll`` is an async callable ``poll(slave_id)`` returning the result of
+    one transaction, or None on failure. Results are handed to
+    ``on_result(slave_id, result)``; ``samples_in(result)`` tells how many
+    samples a result carries (1 by default, len(result) for block reads).
+    A poll never holds the bus longer than
+    its slave's timeout, and failing slaves back off exponentially so a dead
+    slave does not set the pace for the others.
+
+    The bus time of every poll is measured. Once each slave has enough
+    round trips, the load sum(rate * median RTT) is checked every second:
+    above ``max_load`` a warning is logged once and, with ``scale_rates``,
+    all periods are stretched by the same factor so the polls fit. Default
+    deadlines become the longer of the period and one round of polls over
+    all slaves (sum of p99 RTTs), the latest a poll released together with
+    all the others can finish, so a miss means the bus really fell behind.
+    """
+
+    def __init__(self, poll, on_result=None, samples_in=None, max_backoff=2.0, max_load=0.9, scale_rates=True):
+        self.poll = poll
+        self.on_result = on_result
+        self.samples_in = samples_in or (lambda result: 1)
+        self.max_backoff = max_backoff
+        self.max_load = max_load
+        self.scale_rates = scale_rates
+        self.load = None  # Share of the bus the requested rates need, None until measured
+        self.slaves = {}
+        self.start_time = None
+        self._running = False
+        self._overload_logged = False
+        self._next_budget_check = 0.0
+
+    def add_slave(self, slave_id, rate_hz, deadline=None, timeout=None):
+        self.slaves[slave_id] = SlaveSchedule(slave_id, rate_hz, deadline, timeout)
+        return self.slaves[slave_id]
+
+    def stop(self):
+        self._running = False
+
+    async def run(self, stop_event=None):
+        """Poll the slaves until stop() is called or ``stop_event`` is set."""
+        self._running = True
+        self.start_time = time.monotonic()
+        pending = []  # (release time, order, schedule)
+        ready = []  # (absolute deadline, order, schedule)
+        for order, schedule in enumerate(self.slaves.values()):
+            schedule.next_release = self.start_time
+            heapq.heappush(pending, (schedule.next_release, order, schedule))
+
+        while self._running and not (stop_event and stop_event.is_set()):
+            now = time.monotonic()
+            while pending and pending[0][0] <= now:
+                release, order, schedule = heapq.heappop(pending)
+                heapq.heappush(ready, (release + schedule.deadline, order, schedule))
+
+            if not ready:
+                await asyncio.sleep(pending[0][0] - now)
+                continue
+
+            deadline, order, schedule = heapq.heappop(ready)
+            started = time.monotonic()
+            result = await self._poll_once(schedule)
+            finished = time.monotonic()
+            # Default deadlines only count once they come from measured RTTs
+            if finished > deadline and (self.load is not None or schedule.fixed_deadline is not None):
+                schedule.misses += 1
+
+            if result is None:
+                schedule.failures += 1
+                schedule.consecutive_failures += 1
+                backoff = min(schedule.period * 2 ** schedule.consecutive_failures, self.max_backoff)
+                schedule.next_release = finished + backoff
+            else:
+                schedule.successes += 1
+                schedule.consecutive_failures = 0
+                schedule.samples += self.samples_in(result)
+                schedule.rtt.add(finished - started)
+                # Do not burst to catch up after a late poll, keep the nominal rate
+                schedule.next_release = max(schedule.next_release + schedule.period, finished)
+                if self.on_result:
+                    self.on_result(schedule.slave_id, result)
+            heapq.heappush(pending, (schedule.next_release, order, schedule))
+            if finished >= self._next_budget_check:
+                self._next_budget_check = finished + 1.0
+                self._update_budget()
+
+    def utilisation(self):
+        """sum(rate * median RTT) over the slaves, None until every slave has min_samples round trips."""
+        load = 0.0
+        for schedule in self.slaves.values():
+            if len(schedule.rtt.samples) < schedule.rtt.min_samples:
+                return None
+            load += schedule.rate_hz * schedule.rtt.percentile(50)
+        return load
+
+    def _update_budget(self):
+        self.load = self.utilisation()
+        if self.load is None:
+            return
+        scale = 1.0
+        if self.load > self.max_load:
+            if not self._overload_logged:
+                rates = ", ".join(f"{s.slave_id}: {s.rate_hz:g} Hz x {s.rtt.percentile(50) * 1000:.1f} ms"
+                                  for s in self.slaves.values())
+                action = "scaling the rates down" if self.scale_rates else "polls will run late"
+                logging.warning(f"Poll rates need {self.load:.2f} s of bus time per second ({rates}), {action}")
+                self._overload_logged = True
+            if self.scale_rates:
+                scale = self.load / self.max_load
+        round_time = sum(s.rtt.percentile(99) for s in self.slaves.values())
+        for schedule in self.slaves.values():
+            schedule.period = scale / schedule.rate_hz
+            if schedule.fixed_deadline is None:
+                schedule.deadline = max(schedule.period, round_time)
+
+    async def _poll_once(self, schedule):
+        schedule.polls += 1
+        try:
+            return await asyncio.wait_for(self.poll(schedule.slave_id), timeout=schedule.timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Slave {schedule.slave_id} missed its {schedule.timeout * 1000:.0f} ms poll budget")
+        except Exception as e:
+            logging.error(f"Poll error slave {schedule.slave_id}: {e}")
+        return None
+
+    def stats(self):
+        """Requested, scheduled and achieved poll rate per slave."""
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        report = {}
+        for slave_id, schedule in self.slaves.items():
+            report[slave_id] = {
+                "requested_hz": schedule.rate_hz,
+                "scheduled_hz": 1.0 / schedule.period,
+                "achieved_hz": schedule.successes / elapsed if elapsed > 0 else 0.0,
+                "samples_per_s": schedule.samples / elapsed if elapsed > 0 else 0.0,
+                "polls": schedule.polls,
+                "failures": schedule.failures,
+                "deadline_misses": schedule.misses,
+                "deadline_ms": schedule.deadline * 1000,
+                "bus_load": self.load,
+            }
+        return report
@@ -0,0 +1,237 @@
+import argparse
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+from streamer.recorder import read_recording
+
+TEXT_HEADER_SIZE = 3200
+BINARY_HEADER_SIZE = 400
+TRACE_HEADER_SIZE = 240
+
+# Data sample format codes (binary header bytes 3225-3226)
+FORMAT_INT32 = 2
+FORMAT_IEEE_FLOAT = 5
+SAMPLE_DTYPES = {FORMAT_INT32: np.dtype(">i4"), FORMAT_IEEE_FLOAT: np.dtype(">f4")}
+
+# Trace header fields: name -> (first byte, 1-based as in the standard, struct format)
+TRACE_HEADER_FIELDS = {
+    "trace_sequence_line": (1, "i"),
+    "trace_sequence_file": (5, "i"),
+    "field_record": (9, "i"),
+    "trace_number": (13, "i"),
+    "energy_source_point": (17, "i"),
+    "cdp": (21, "i"),
+    "cdp_trace": (25, "i"),
+    "trace_id": (29, "h"),
+    "offset": (37, "i"),
+    "receiver_elevation": (41, "i"),
+    "source_x": (73, "i"),
+    "source_y": (77, "i"),
+    "group_x": (81, "i"),
+    "group_y": (85, "i"),
+    "samples": (115, "H"),
+    "sample_interval": (117, "H"),
+    "year": (157, "h"),
+    "day_of_year": (159, "h"),
+    "hour": (161, "h"),
+    "minute": (163, "h"),
+    "second": (165, "h"),
+    "time_basis": (167, "h"),
+}
+
+
+class SegyWriter:
+    """Streaming SEG-Y (rev 1 or 2) writer for fixed-length traces.
+
+    The textual and binary headers are written when the file is opened and
+    every write_trace() appends one 240-byte trace header plus its samples.
+    Nothing already written is touched again except, for revision 2, the
+    trace count of the file (bytes 3513-3520), which close() patches in place.
+    """
+
+    def __init__(self, path, samples_per_trace, sample_interval_us, data_format=FORMAT_IEEE_FLOAT,
+                 revision=1, text_header=None, traces_per_ensemble=0, buffer_size=1 << 20):
+        if data_format not in SAMPLE_DTYPES:
+            raise ValueError(f"Unsupported data format {data_format}, expected one of {list(SAMPLE_DTYPES)}")
+        if revision not in (1, 2):
+            raise ValueError("revision must be 1 or 2")
+        if not 0 < round(sample_interval_us):
+            raise ValueError(f"Sample interval must be at least 1 us, got {sample_interval_us} us")
+        if round(sample_interval_us) > 0xFFFF:
+            # Bytes 3217-3218 and 115-116 are unsigned 16-bit microseconds
+            raise ValueError(f"Sample interval {sample_interval_us:.0f} us does not fit in SEG-Y (max 65535 us, "
+                             f"so sample rates below {1e6 / 0xFFFF:.1f} Hz cannot be written)")
+        if not 0 < samples_per_trace <= 0xFFFF:
+            raise ValueError("samples per trace must fit in 16 bits")
+        self.path = path
+        self.samples_per_trace = samples_per_trace
+        self.sample_interval_us = int(round(sample_interval_us))
+        self.data_format = data_format
+        self.revision = revision
+        self.traces_per_ensemble = traces_per_ensemble
+        self.traces_written = 0
+        self._dtype = SAMPLE_DTYPES[data_format]
+        self._trace = np.zeros(samples_per_trace, dtype=self._dtype)
+        self._header = bytearray(TRACE_HEADER_SIZE)
+
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(self._text_header(text_header))
+        self._file.write(self._binary_header())
+
+    def _text_header(self, text):
+        lines = (text or "").splitlines()
+        lines = [f"C{i + 1:2d} {lines[i] if i < len(lines) else ''}" for i in range(38)]
+        if self.revision == 2:
+            lines += ["C39 SEG-Y_REV2.0", "C40 END TEXTUAL HEADER"]
+        else:
+            lines += ["C39 SEG Y REV1", "C40 END EBCDIC"]
+        return "".join(line[:80].ljust(80) for line in lines).encode("cp500")  # EBCDIC
+
+    def _binary_header(self):
+        header = bytearray(BINARY_HEADER_SIZE)
+
+        def put(position, fmt, value):
+            struct.pack_into(">" + fmt, header, position - 3201, value)
+
+        put(3213, "h", self.traces_per_ensemble)
+        put(3217, "H", self.sample_interval_us)
+        put(3219, "H", self.sample_interval_us)
+        put(3221, "H", self.samples_per_trace)
+        put(3223, "H", self.samples_per_trace)
+        put(3225, "h", self.data_format)
+        put(3229, "h", 1)  # Trace sorting: as recorded
+        put(3255, "h", 1)  # Meters
+        put(3501, "B", self.revision)
+        put(3503, "h", 1)  # Fixed length traces
+        if self.revision == 2:
+            put(3297, "I", 0x01020304)  # Byte order marker
+            put(3521, "Q", TEXT_HEADER_SIZE + BINARY_HEADER_SIZE)  # Offset of the first trace
+        return header
+
+    def write_trace(self, samples, timestamp=None, **fields):
+        """Append one trace.
+
+        samples is padded with zeros or cut to samples_per_trace. fields are
+        TRACE_HEADER_FIELDS names, e.g. field_record=3, trace_number=12;
+        sequence numbers, sample count/interval and the time of day (from
+        ``timestamp``, a datetime, default now) are filled in.
+        """
+        samples = np.asarray(samples)
+        n = min(len(samples), self.samples_per_trace)
+        self._trace[:n] = samples[:n]
+        self._trace[n:] = 0
+
+        timestamp = timestamp or datetime.now()
+        values = {
+            "trace_sequence_line": self.traces_written + 1,
+            "trace_sequence_file": self.traces_written + 1,
+            "field_record": 1,
+            "trace_number": self.traces_written + 1,
+            "trace_id": 1,  # Seismic data
+            "samples": self.samples_per_trace,
+            "sample_interval": self.sample_interval_us,
+            "year": timestamp.year,
+            "day_of_year": timestamp.timetuple().tm_yday,
+            "hour": timestamp.hour,
+            "minute": timestamp.minute,
+            "second": timestamp.second,
+            "time_basis": 1,  # Local time
+        }
+        values.update(fields)
+
+        header = self._header
+        header[:] = bytes(TRACE_HEADER_SIZE)
+        for name, value in values.items():
+            position, fmt = TRACE_HEADER_FIELDS[name]
+            struct.pack_into(">" + fmt, header, position - 1, value)
+        self._file.write(header)
+        self._file.write(self._trace.tobytes())
+        self.traces_written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        """Patch the rev 2 trace count into the binary header and close the file."""
+        if self._file.closed:
+            return
+        if self.revision == 2:
+            self._file.seek(3513 - 1)
+            self._file.write(struct.pack(">Q", self.traces_written))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def recording_to_segy(recording_path, segy_path, samples_per_trace, sources=None, channels=None,
+                      sample_interval_us=None, revision=1):
+    """Convert a streamer recording to SEG-Y.
+
+    Every (source, channel) stream becomes one receiver; the streams are cut
+    into consecutive windows of samples_per_trace samples and each window is
+    written as one field record with a trace per receiver. Streams are
+    aligned by sample index. The sample interval defaults to the time
+    between the first and last timestamp of the first source divided by the
+    rows in between, which also holds when rows are stamped per batch; pass
+    it explicitly when the whole recording is one batch. Returns the number of traces written.
+    """
+    recording = read_recording(recording_path)
+    sources = sources or recording.sources
+    streams = []
+    for source in sources:
+        values = recording.values(source, dtype=np.float32)
+        for channel in channels or range(values.shape[1]):
+            streams.append(values[:, channel])
+    if not streams:
+        return 0
+
+    if sample_interval_us is None:
+        stamps = recording.timestamps(sources[0])
+        # A batch stamp is the arrival of its last row: the span covers every row after the first batch
+        after_first = len(stamps) - int(np.count_nonzero(stamps == stamps[0])) if len(stamps) else 0
+        if not after_first:
+            raise ValueError(f"Cannot derive the sample interval from the timestamps of source {sources[0]} "
+                             f"(all in one batch), pass sample_interval_us")
+        sample_interval_us = (int(stamps[-1]) - int(stamps[0])) / after_first / 1000
+
+    windows = min(len(stream) for stream in streams) // samples_per_trace
+    created = datetime.fromisoformat(recording.header["created"])
+    start_ns = recording.header["monotonic_ns"]
+    first_stamps = recording.timestamps(sources[0])
+    text = (f"Converted from {recording_path}\n"
+            f"Recorded {recording.header['created']}\n"
+            f"{len(streams)} receivers from sources {list(sources)}, one field record per window")
+
+    with SegyWriter(segy_path, samples_per_trace, sample_interval_us, revision=revision,
+                    text_header=text, traces_per_ensemble=len(streams)) as writer:
+        for window in range(windows):
+            start = window * samples_per_trace
+            when = created
+            if len(first_stamps) > start:
+                when = datetime.fromtimestamp(created.timestamp() + (first_stamps[start] - start_ns) / 1e9)
+            for receiver, stream in enumerate(streams):
+                writer.write_trace(stream[start:start + samples_per_trace], timestamp=when,
+                                   field_record=window + 1, trace_number=receiver + 1)
+        return writer.traces_written
+
+
+if __name__ == "__main__":
+    # python -m streamer.segy recording.bin output.sgy --samples 30
+    parser = argparse.ArgumentParser(description="Convert a streamer recording to SEG-Y")
+    parser.add_argument("recording")
+    parser.add_argument("output")
+    parser.add_argument("--samples", type=int, required=True, help="samples per trace")
+    parser.add_argument("--interval-us", type=float, help="sample interval, default from timestamps")
+    parser.add_argument("--revision", type=int, choices=(1, 2), default=1)
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    count = recording_to_segy(args.recording, args.output, args.samples,
+                              sample_interval_us=args.interval_us, revision=args.revision)
+    print(f"Wrote {count} traces to {args.output} in {time.perf_counter() - t0:.2f} s")
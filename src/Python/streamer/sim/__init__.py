@@ -0,0 +1,7 @@
+"""Simulated slaves and streamers for running the acquisition scripts without hardware.
+
+python -m streamer.sim --help lists the modes: Modbus RTU slaves on a
+pseudo-terminal, serial text/frame streamers on a pseudo-terminal and UDP
+streamers. Tests and benchmarks can use SlaveFarm.serial_factory() to
+connect RtuTransport to the slaves in-process without any port.
+"""
@@ -0,0 +1,93 @@
+"""Run the simulators from the command line, from src/Python:
+
+    python -m streamer.sim modbus --slaves 1 2 3 --rate 1000 --latency 0.002 --jitter 0.001
+    python -m streamer.sim serial --format diterima --rate 500 --drop 0.01
+    python -m streamer.sim udp --format packets --boards 4 --port 5000 --jitter 0.005
+
+The modbus and serial modes print the pseudo-terminal to open in place of
+the COM port; Ctrl+C stops and prints the counters.
+"""
+import argparse
+import time
+
+from streamer.sim.modbus import PtyBus, SlaveFarm
+from streamer.sim.streamers import FORMATS, SerialStreamer, UdpStreamer
+from streamer.sim.waveforms import KINDS, Waveform
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m streamer.sim", description="Hardware-free data sources")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--rate", type=float, default=1000.0, help="samples per second (per slave/board)")
+    common.add_argument("--waveform", choices=KINDS, default="sine")
+    common.add_argument("--frequency", type=float, default=5.0, help="signal frequency in Hz")
+    common.add_argument("--amplitude", type=float, default=1.0, help="volts (standard deviation for --waveform noise)")
+    common.add_argument("--offset", type=float, default=1.5, help="volts")
+    common.add_argument("--noise", type=float, default=0.0, help="standard deviation in volts")
+    common.add_argument("--latency", type=float, default=0.0, help="seconds added to every reply/payload")
+    common.add_argument("--jitter", type=float, default=0.0, help="random extra delay up to this many seconds")
+    common.add_argument("--drop", type=float, default=0.0, help="fraction of replies/payloads never sent")
+    common.add_argument("--seed", type=int, default=None)
+    common.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    modbus = modes.add_parser("modbus", parents=[common], help="Modbus RTU slaves (FIX_Respon_Cepat_RS485_Multi)")
+    modbus.add_argument("--slaves", type=int, nargs="+", default=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+    modbus.add_argument("--baudrate", type=int, default=115200, help="only used for the wire time")
+    modbus.add_argument("--block-samples", type=int, default=30)
+    modbus.add_argument("--corrupt", type=float, default=0.0, help="fraction of replies with a CRC error")
+
+    streams = "; ".join(f"{name}: {reader}" for name, (_, _, reader) in FORMATS.items())
+    serial = modes.add_parser("serial", parents=[common], help="text lines or binary frames on a pseudo-terminal",
+                              epilog=f"Formats - {streams}")
+    serial.add_argument("--format", choices=[name for name in FORMATS if name != "packets"], default="diterima")
+    serial.add_argument("--chunk", type=int, default=10, help="samples written at once")
+
+    udp = modes.add_parser("udp", parents=[common], help="UDP datagrams from one or more boards",
+                           epilog=f"Formats - {streams}")
+    udp.add_argument("--format", choices=list(FORMATS), default="packets")
+    udp.add_argument("--chunk", type=int, default=32, help="samples per datagram")
+    udp.add_argument("--boards", type=int, default=1)
+    udp.add_argument("--host", default="127.0.0.1")
+    udp.add_argument("--port", type=int, default=5000)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    waveform = Waveform(args.waveform, args.frequency, args.amplitude, args.offset, args.noise, args.seed)
+    if args.mode == "modbus":
+        farm = SlaveFarm.create(args.slaves, args.rate, waveform, args.block_samples, baudrate=args.baudrate,
+                                latency=args.latency, jitter=args.jitter, drop_rate=args.drop,
+                                corrupt_rate=args.corrupt, seed=args.seed)
+        source = PtyBus(farm).start()
+        print(f"{len(args.slaves)} slave Modbus di {source.port}")
+        stats = farm.stats
+    else:
+        options = dict(rate=args.rate, waveform=waveform, chunk=args.chunk, latency=args.latency,
+                       jitter=args.jitter, drop_rate=args.drop, seed=args.seed)
+        if args.mode == "serial":
+            source = SerialStreamer(args.format, **options)
+            print(f"Stream {args.format} di {source.port}")
+        else:
+            source = UdpStreamer(args.host, args.port, args.format, boards=args.boards, **options)
+            print(f"Stream {args.format} dari {args.boards} board ke {args.host}:{args.port}")
+        source.start()
+        stats = source.stats
+
+    end = None if args.duration is None else time.monotonic() + args.duration
+    try:
+        while end is None or time.monotonic() < end:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(stats())
+        if args.mode == "modbus":
+            source.close()
+        else:
+            source.stop()
+
+
+if __name__ == "__main__":
+    main()
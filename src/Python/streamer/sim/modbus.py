@@ -0,0 +1,258 @@
+import os
+import random
+import threading
+import time
+import tty
+
+import numpy as np
+
+from streamer.rtu import crc16
+from streamer.sim.waveforms import Waveform
+
+# Register map of FIX_Respon_Cepat_RS485_Multi.ino
+NUM_CHANNELS = 4
+BLOCK_COUNT_REGISTER = 4
+BLOCK_SEQ_REGISTER = 5
+BLOCK_DATA_REGISTER = 6
+
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+
+
+class SimulatedSlave:
+    """One ADS1256 Modbus slave with the register map of FIX_Respon_Cepat_RS485_Multi.ino.
+
+    Samples are produced at ``sample_rate`` from ``waveform`` (volts, sent as
+    millivolts) whenever the slave is asked for registers. Hreg 0..3 hold
+    the newest sample; the block from Hreg 4 holds up to ``block_samples``
+    samples. A read that includes Hreg 4 removes the samples whose registers
+    it covered and moves the rest to the front. Samples arriving with a full
+    block are counted and skipped in the sequence number, exactly like the
+    firmware.
+    """
+
+    def __init__(self, slave_id, sample_rate=1000.0, waveform=None, channels=NUM_CHANNELS, block_samples=30,
+                 millivolts=True):
+        self.slave_id = slave_id
+        self.sample_rate = sample_rate
+        self.waveform = waveform or Waveform()
+        self.channels = channels
+        self.block_samples = block_samples
+        self.scale = 1000.0 if millivolts else 1.0
+        self.registers = np.zeros(BLOCK_DATA_REGISTER + block_samples * channels, dtype=np.uint16)
+        self._start = None
+        self._produced = 0
+        self._seq = 0
+        self._count = 0
+        self.overflow = 0
+        self.requests = 0
+
+    def advance(self, now=None):
+        """Produce the samples due by ``now``."""
+        now = time.perf_counter() if now is None else now
+        if self._start is None:
+            self._start = now
+        due = int((now - self._start) * self.sample_rate)
+        if due <= self._produced:
+            return
+        new = due - self._produced
+        # Only the samples that fit in the block and the newest one (Hreg 0..3) are synthesized,
+        # however long the master stayed away; the rest are skipped like the firmware does
+        stored = min(new, self.block_samples - self._count)
+        index = np.append(np.arange(self._produced, self._produced + stored), due - 1)
+        codes = self._codes(index / self.sample_rate)
+        self._produced = due
+        self.registers[:self.channels] = codes[-1]
+
+        if self._count == 0 and stored:
+            self.registers[BLOCK_SEQ_REGISTER] = self._seq & 0xFFFF
+        start = BLOCK_DATA_REGISTER + self._count * self.channels
+        self.registers[start:start + stored * self.channels] = codes[:stored].ravel()
+        self._count += stored
+        self.registers[BLOCK_COUNT_REGISTER] = self._count
+        self.overflow += new - stored
+        self._seq += new  # Skipped samples keep their numbers, the master sees the gap
+
+    def _codes(self, times):
+        return np.clip(np.rint(self.waveform(times, self.channels) * self.scale), 0, 0xFFFF).astype(np.uint16)
+
+    def read_holding_registers(self, address, count, now=None):
+        """Register values, or raises ValueError for an address outside the map."""
+        if address < 0 or count < 1 or address + count > len(self.registers):
+            raise ValueError("Illegal data address")
+        self.requests += 1
+        self.advance(now)
+        values = self.registers[address:address + count].copy()
+        if address <= BLOCK_COUNT_REGISTER < address + count:
+            # The firmware drops the samples the reply carried (also a partly read one)
+            read = -(-max(0, address + count - BLOCK_DATA_REGISTER) // self.channels)
+            self._drain(min(read, self._count))
+        return values
+
+    def _drain(self, n):
+        if not n:
+            return
+        data = self.registers[BLOCK_DATA_REGISTER:]
+        rest = (self._count - n) * self.channels
+        data[:rest] = data[n * self.channels:self._count * self.channels].copy()
+        self._count -= n
+        self.registers[BLOCK_SEQ_REGISTER] = (int(self.registers[BLOCK_SEQ_REGISTER]) + n) & 0xFFFF
+        self.registers[BLOCK_COUNT_REGISTER] = self._count
+
+
+class SlaveFarm:
+    """N simulated slaves sharing one RTU bus, answering FC03 request frames.
+
+    Every reply is delayed by ``latency`` plus up to ``jitter`` seconds plus
+    its wire time at ``baudrate``; ``drop_rate`` of the requests get no
+    answer and ``corrupt_rate`` of the replies have a flipped byte (CRC
+    error), both drawn with ``seed``.
+    """
+
+    def __init__(self, slaves, baudrate=115200, latency=0.002, jitter=0.0005, drop_rate=0.0, corrupt_rate=0.0,
+                 seed=None):
+        self.slaves = {slave.slave_id: slave for slave in slaves}
+        self.baudrate = baudrate
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self._random = random.Random(seed)
+        self.dropped = 0
+        self.corrupted = 0
+
+    @classmethod
+    def create(cls, slave_ids, sample_rate=1000.0, waveform=None, block_samples=30, **options):
+        return cls([SimulatedSlave(i, sample_rate, waveform, block_samples=block_samples) for i in slave_ids],
+                   **options)
+
+    def wire_time(self, size):
+        return size * 10 / self.baudrate  # 8N1: 10 bits per byte
+
+    def respond(self, request, now=None):
+        """Returns (seconds until the reply is complete, reply bytes) or (0, None) for no reply."""
+        if len(request) != 8 or crc16(request, 6) != request[6] | (request[7] << 8):
+            return 0, None  # A real slave ignores frames with a bad CRC
+        slave = self.slaves.get(request[0])
+        if slave is None:
+            return 0, None
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            self.dropped += 1
+            return 0, None
+
+        function = request[1]
+        address = (request[2] << 8) | request[3]
+        count = (request[4] << 8) | request[5]
+        if function != 0x03:
+            reply = bytearray([slave.slave_id, function | 0x80, ILLEGAL_FUNCTION])
+        else:
+            try:
+                values = slave.read_holding_registers(address, count, now)
+                reply = bytearray([slave.slave_id, 0x03, 2 * count]) + values.astype(">u2").tobytes()
+            except ValueError:
+                reply = bytearray([slave.slave_id, 0x83, ILLEGAL_DATA_ADDRESS])
+        crc = crc16(reply)
+        reply += bytes([crc & 0xFF, crc >> 8])
+        if self.corrupt_rate and self._random.random() < self.corrupt_rate:
+            self.corrupted += 1
+            reply[self._random.randrange(3, len(reply))] ^= 0xFF
+        delay = self.latency + self._random.uniform(0, self.jitter) + self.wire_time(len(request) + len(reply))
+        return delay, bytes(reply)
+
+    def stats(self):
+        return dict(
+            requests=sum(slave.requests for slave in self.slaves.values()),
+            overflow=sum(slave.overflow for slave in self.slaves.values()),
+            dropped=self.dropped,
+            corrupted=self.corrupted,
+        )
+
+    def serial_factory(self):
+        """serial_factory for RtuTransport: an in-process LoopbackSerial per connection."""
+        return lambda port, baudrate, timeout: LoopbackSerial(self, timeout)
+
+
+class LoopbackSerial:
+    """pyserial-like port wired straight to a SlaveFarm, no pseudo-terminal needed."""
+
+    def __init__(self, farm, timeout=0.1):
+        self.farm = farm
+        self.timeout = timeout
+        self.is_open = True
+        self._rx = b""
+        self._ready_at = 0.0
+
+    @property
+    def in_waiting(self):
+        return len(self._rx) if time.perf_counter() >= self._ready_at else 0
+
+    def write(self, data):
+        delay, reply = self.farm.respond(bytes(data))
+        if reply is not None:
+            self._rx += reply
+            self._ready_at = time.perf_counter() + delay
+        return len(data)
+
+    def read(self, size=1):
+        deadline = time.perf_counter() + (self.timeout if self.timeout is not None else 3600)
+        wait = min(self._ready_at, deadline) - time.perf_counter() if self._rx else deadline - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        if not self._rx or time.perf_counter() < self._ready_at:
+            return b""
+        data, self._rx = self._rx[:size], self._rx[size:]
+        return data
+
+    def reset_input_buffer(self):
+        self._rx = b""
+
+    def close(self):
+        self.is_open = False
+
+
+class PtyBus:
+    """Serves a SlaveFarm on a pseudo-terminal; open ``port`` like a serial port (Linux/macOS).
+
+    The simulator thread reads 8-byte FC03 requests from the master side,
+    waits the farm's reply delay and writes the reply back, so pymodbus or
+    RtuTransport talk to it as to a real RS485 adapter.
+    """
+
+    def __init__(self, farm):
+        self.farm = farm
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self.running = True
+        self._thread = threading.Thread(target=self._serve, name="PtyBus", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        pending = b""
+        while self.running:
+            try:
+                chunk = os.read(self._master, 256)
+            except OSError:
+                break  # Closed
+            pending += chunk
+            while len(pending) >= 8:
+                delay, reply = self.farm.respond(pending[:8])
+                if reply is None and pending[:1] and crc16(pending[:8], 6) != pending[6] | (pending[7] << 8):
+                    pending = pending[1:]  # Not a frame start, resync byte by byte
+                    continue
+                pending = pending[8:]
+                if reply is not None:
+                    time.sleep(delay)
+                    os.write(self._master, reply)
+
+    def close(self):
+        self.running = False
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,195 @@
+import heapq
+import os
+import random
+import socket
+import threading
+import time
+import tty
+
+import numpy as np
+
+from streamer.frames import ADS1256_FRAME_CHANNELS, FrameFormat
+from streamer.sim.waveforms import Waveform
+from streamer.udp_ingest import encode_packet
+
+CODES_PER_VOLT = 0x7FFFFF / 3.3  # ADS1256 with a 3.3 V reference, same scale as VOLTS_PER_CODE in the viewers
+
+
+def _lines(template):
+    """Encoder printing one line per sample, with the sequence number if the template ends in %d."""
+    with_seq = "%d" in template
+
+    def encode(seq, values):
+        rows = values.tolist()
+        if with_seq:
+            rows = [row + [s] for s, row in zip(seq.tolist(), rows)]
+        return "".join(template % tuple(row) for row in rows).encode()
+    return encode
+
+
+def _frames(seq, values):
+    return FrameFormat(values.shape[1], "i24").encode(seq, np.rint(values * CODES_PER_VOLT))
+
+
+# name -> (channels, encode(seq, values) -> bytes, what reads it)
+FORMATS = {
+    "diterima": (3, _lines("Diterima => A0: %.4f | A1: %.4f | A2: %.4f | Seq: %d\r\n"),
+                 "RS485FULLDUPLEX/Serial_Graph.py, master_full_duplex2.ino"),
+    "semicolon": (3, _lines("%.4f;%.4f;%.4f\r\n"),
+                  "Server/DashboardSPI.py"),
+    "bars": (4, _lines("%.2f  ||  %.2f  ||  %.2f  ||  %.2f\r\n"),
+             "Serial_Graph_ADS1256.py, FIX_Respon_Cepat_RS485.ino"),
+    "labels": (3, _lines("A1: %.6f | A2: %.6f | A3: %.6f\r\n"),
+               "ADS1256_Read.ino on serial, UDPProtocol_ADS1256.ino text datagrams"),
+    "frames": (ADS1256_FRAME_CHANNELS, _frames, "BINARY_FRAMES in DashboardSPI.py and Serial_Graph_ADS1256.py, SpiReader"),
+    "packets": (3, None, "BINARY_PACKETS of UDPProtocol_ADS1256.ino, Server/dashboard.py"),
+}
+
+
+class Streamer(threading.Thread):
+    """Base of the simulated streamers: samples at ``rate`` of ``waveform`` in ``fmt``.
+
+    Every ``chunk`` samples become one payload (a burst of lines or frames,
+    or one datagram) that leaves after ``latency`` plus up to ``jitter``
+    seconds. ``drop_rate`` of the payloads are never sent; their sequence
+    numbers are used up anyway, so a receiver sees the gap. Subclasses
+    implement send(board, payload).
+    """
+
+    ordered = True  # A serial line cannot reorder; UDP datagrams with jitter can
+
+    def __init__(self, fmt="diterima", rate=1000.0, waveform=None, chunk=10, latency=0.0, jitter=0.0,
+                 drop_rate=0.0, boards=1, channels=None, seed=None, name="Streamer"):
+        super().__init__(name=name, daemon=True)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {tuple(FORMATS)}")
+        self.fmt = fmt
+        self.channels, self._encode, _ = FORMATS[fmt]
+        if channels is not None and fmt in ("frames", "packets"):
+            self.channels = channels  # Binary formats carry any channel count, e.g. 4 for the ADS1256 viewer
+        self.rate = rate
+        self.waveform = waveform or Waveform()
+        self.chunk = chunk
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.boards = boards
+        self._random = random.Random(seed)
+        self.running = True
+        self.samples = 0
+        self.payloads = 0
+        self.dropped = 0
+        self.bytes = 0
+
+    def encode(self, board, seq, values):
+        if self._encode is None:
+            return encode_packet(board, int(seq[0]), np.rint(values * CODES_PER_VOLT))
+        return self._encode(seq, values)
+
+    def send(self, board, payload):
+        raise NotImplementedError
+
+    def run(self):
+        start = time.perf_counter()
+        produced = 0
+        queue = []  # (send time, order, board, payload)
+        last_due = 0.0
+        order = 0
+        period = self.chunk / self.rate
+        while self.running:
+            now = time.perf_counter()
+            due = int((now - start) * self.rate) // self.chunk * self.chunk
+            while produced < due:
+                index = np.arange(produced, produced + self.chunk)
+                values = self.waveform(index / self.rate, self.channels)
+                for board in range(self.boards):
+                    seq = index if self._encode is not None else index // self.chunk  # Packets count packets
+                    if self.drop_rate and self._random.random() < self.drop_rate:
+                        self.dropped += 1
+                        continue
+                    send_at = start + (produced + self.chunk) / self.rate + self.latency
+                    send_at += self._random.uniform(0, self.jitter)
+                    if self.ordered:
+                        send_at = last_due = max(send_at, last_due)
+                    heapq.heappush(queue, (send_at, order, board, self.encode(board, seq, values)))
+                    order += 1
+                produced += self.chunk
+            while queue and queue[0][0] <= now:
+                _, _, board, payload = heapq.heappop(queue)
+                self.send(board, payload)
+                self.payloads += 1
+                self.bytes += len(payload)
+            self.samples = produced
+            wake = min(start + (produced + self.chunk) / self.rate, queue[0][0] if queue else now + period)
+            delay = wake - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join()
+
+    def stats(self):
+        return dict(samples=self.samples, payloads=self.payloads, dropped=self.dropped, bytes=self.bytes)
+
+
+class SerialStreamer(Streamer):
+    """Streams on a pseudo-terminal, open ``port`` in the viewer instead of the COM port.
+
+    Bytes the viewer does not read in time are thrown away like a full UART
+    buffer and counted in ``overflow_bytes``.
+    """
+
+    def __init__(self, fmt="diterima", **options):
+        super().__init__(fmt, name="SerialStreamer", **options)
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+        self.overflow_bytes = 0
+
+    def send(self, board, payload):
+        try:
+            written = os.write(self._master, payload)
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            self.running = False  # Closed
+            return
+        self.overflow_bytes += len(payload) - written
+
+    def stop(self):
+        super().stop()
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def stats(self):
+        return dict(super().stats(), overflow_bytes=self.overflow_bytes)
+
+
+class UdpStreamer(Streamer):
+    """Streams datagrams to (host, port) from ``boards`` simulated boards.
+
+    With the "packets" format every board numbers its own packets and
+    jitter larger than the packet period reorders them on the way, like
+    a busy network; text formats send ``chunk`` lines per datagram.
+    """
+
+    ordered = False
+
+    def __init__(self, host="127.0.0.1", port=5000, fmt="packets", **options):
+        super().__init__(fmt, name="UdpStreamer", **options)
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, board, payload):
+        self.sock.sendto(payload, self.address)
+
+    def stop(self):
+        super().stop()
+        self.sock.close()
@@ -0,0 +1,47 @@
+import numpy as np
+
+KINDS = ("sine", "square", "sawtooth", "chirp", "noise", "constant")
+
+
+class Waveform:
+    """Test signal sampled at arbitrary times, one phase-shifted copy per channel.
+
+    Values are ``offset + amplitude * shape(t) + noise * N(0, 1)``; the
+    chirp sweeps from ``frequency`` to twice that every 10 s. The shape of
+    "noise" is N(0, 1) itself, so its standard deviation is ``amplitude``
+    (plus ``noise`` on top, as for every kind).
+    """
+
+    def __init__(self, kind="sine", frequency=5.0, amplitude=1.0, offset=1.5, noise=0.0, seed=None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown waveform {kind!r}, expected one of {KINDS}")
+        self.kind = kind
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.offset = offset
+        self.noise = noise
+        self._rng = np.random.default_rng(seed)
+
+    def __call__(self, t, channels=1):
+        """(len(t), channels) float64 values at times t in seconds."""
+        t = np.asarray(t, dtype=np.float64)[:, np.newaxis]
+        shift = np.arange(channels) / channels  # Fraction of a period between channels
+        if self.kind == "chirp":
+            cycles = self.frequency * t * (1 + (t % 10) / 20)
+        else:
+            cycles = self.frequency * t
+        cycles = cycles + shift
+        if self.kind in ("sine", "chirp"):
+            shape = np.sin(2 * np.pi * cycles)
+        elif self.kind == "square":
+            shape = np.where(cycles % 1 < 0.5, 1.0, -1.0)
+        elif self.kind == "sawtooth":
+            shape = 2 * (cycles % 1) - 1
+        elif self.kind == "noise":
+            shape = self._rng.standard_normal(cycles.shape)
+        else:
+            shape = np.zeros_like(cycles)
+        values = self.offset + self.amplitude * shape
+        if self.noise:
+            values = values + self.noise * self._rng.standard_normal(values.shape)
+        return values
@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+
+from streamer.frames import FrameFormat, FrameParser
+from streamer.integrity import SequenceTracker
+from streamer.ring_buffer import RingBuffer
+
+try:
+    import spidev
+except ImportError:  # Not a Raspberry Pi / Linux SPI host, FakeSpiDev still works
+    spidev = None
+
+
+def open_spi(bus=0, device=0, speed_hz=8000000, mode=0):
+    """spidev.SpiDev opened with the given clock and mode."""
+    if spidev is None:
+        raise RuntimeError("spidev is not installed (pip install spidev), use FakeSpiDev to test without hardware")
+    spi = spidev.SpiDev()
+    spi.open(bus, device)
+    spi.max_speed_hz = speed_hz
+    spi.mode = mode
+    return spi
+
+
+class FakeSpiDev:
+    """Stand-in for spidev.SpiDev: a slave MCU streaming binary frames (streamer.frames).
+
+    The fake slave produces ``sample_rate`` frames per second of a sine per
+    channel; every transfer returns the frames produced since the previous
+    one, padded with zeros when the slave has nothing more. Bytes beyond
+    ``buffer_frames`` unread frames are dropped, like a slave FIFO
+    overflowing, which shows up as sequence gaps. With ``command_size`` the
+    first bytes of every xfer2() are the slave's reply to the command.
+    """
+
+    def __init__(self, channels=3, sample="i24", sample_rate=1000.0, buffer_frames=4096, amplitude=1 << 20,
+                 command_size=0):
+        self.format = FrameFormat(channels, sample)
+        self.command_size = command_size
+        self.sample_rate = sample_rate
+        self.buffer_frames = buffer_frames
+        self.amplitude = amplitude
+        self.max_speed_hz = 500000
+        self.mode = 0
+        self.bits_per_word = 8
+        self._seq = 0
+        self._start = None
+        self._pending = b""
+        self.dropped_frames = 0
+
+    def open(self, bus, device):
+        self._start = time.perf_counter()
+
+    def close(self):
+        self._start = None
+
+    def _produce(self):
+        if self._start is None:
+            self._start = time.perf_counter()
+        due = int((time.perf_counter() - self._start) * self.sample_rate)
+        count = due - self._seq
+        if count <= 0:
+            return
+        seq = np.arange(self._seq, due)
+        phase = 2 * np.pi * seq[:, np.newaxis] / 200 + np.arange(self.format.channels)
+        codes = (self.amplitude * np.sin(phase)).astype(np.int32)
+        self._pending += self.format.encode(seq, codes)
+        self._seq = due
+        excess = len(self._pending) // self.format.size - self.buffer_frames
+        if excess > 0:
+            self._pending = self._pending[excess * self.format.size:]
+            self.dropped_frames += excess
+
+    def readbytes(self, n):
+        self._produce()
+        data, self._pending = self._pending[:n], self._pending[n:]
+        return list(data + bytes(n - len(data)))
+
+    def xfer2(self, values):
+        return [0] * self.command_size + self.readbytes(len(values) - self.command_size)
+
+    def writebytes(self, values):
+        pass
+
+
+class SpiReader(threading.Thread):
+    """Bulk SPI acquisition of binary frames into a RingBuffer of int32 codes.
+
+    Each transfer clocks ``transfer_size`` bytes in one readbytes() (or
+    xfer2() when the slave needs a ``command`` first) and decodes every
+    complete frame with FrameParser; frames split across transfers are
+    carried over. Transfers are paced by ``drdy``, a callable that waits up
+    to its timeout argument for the data-ready line and returns True when
+    it went active, or else by a fixed ``period`` in seconds. Pick a
+    transfer size that holds more than period x sample rate frames so the
+    slave buffer never fills; spidev's default limit is 4096 bytes.
+    """
+
+    def __init__(self, spi, channels=3, sample="i24", capacity=100000, transfer_size=4096, period=0.01,
+                 drdy=None, command=None, on_block=None):
+        super().__init__(name="SpiReader", daemon=True)
+        self.spi = spi
+        self.parser = FrameParser(channels, sample)
+        self.integrity = SequenceTracker(bits=16)
+        self.buffer = RingBuffer(capacity, channels, dtype=np.int32)
+        self.transfer_size = transfer_size
+        self.period = period
+        self.drdy = drdy
+        self.on_block = on_block  # Optional callback(seq, codes) per transfer with frames
+        # xfer2 sends the command and clocks the rest of the transfer with zeros
+        self._tx = None if command is None else list(command) + [0] * (transfer_size - len(command))
+        self._skip = 0 if command is None else len(command)
+        self.running = True
+        self.transfers = 0
+        self.bytes = 0
+        self.late = 0  # Period pacing: transfers started after their deadline
+        self._start_time = None
+
+    def read_once(self):
+        """One transfer and decode; returns the number of new frames."""
+        if self._tx is None:
+            data = bytes(self.spi.readbytes(self.transfer_size))
+        else:
+            data = bytes(self.spi.xfer2(self._tx))[self._skip:]
+        self.transfers += 1
+        self.bytes += len(data)
+        seq, codes = self.parser.feed(data)
+        if not len(codes):
+            return 0
+        keep, _ = self.integrity.update(seq)
+        codes = codes[keep]
+        self.buffer.extend(codes)
+        if self.on_block is not None:
+            self.on_block(seq[keep], codes)
+        return len(codes)
+
+    def run(self):
+        self._start_time = time.perf_counter()
+        deadline = self._start_time
+        while self.running:
+            if self.drdy is not None:
+                if not self.drdy(0.1):
+                    continue
+            else:
+                deadline += self.period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.late += 1
+                    deadline = time.perf_counter()  # Behind schedule: do not burst to catch up
+            self.read_once()
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        stats = dict(self.parser.stats(), **self.integrity.stats())
+        stats.update(
+            transfers=self.transfers,
+            bytes=self.bytes,
+            late_transfers=self.late,
+            bytes_per_s=self.bytes / elapsed if elapsed else 0.0,
+            frames_per_s=self.parser.frames / elapsed if elapsed else 0.0,
+        )
+        return stats
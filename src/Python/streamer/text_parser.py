@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class LabeledLineParser:
+    """Chunked parser for text lines like "Diterima => A0: 0.6665 | A1: 0.0680 | A2: 1.0581 | Seq: 124".
+
+    feed() takes raw bytes as read from the port, carries a partial last line
+    over to the next call and parses all complete lines of the chunk in one
+    go: the lines are cut at the first label and split on whitespace as one
+    batch, labels and separators are checked per token column, and the value
+    strings are converted column by column with map(float). A batch that fails
+    the checks is parsed line by line. Lines that do not match are counted in
+    ``bad_lines`` (the last one kept in ``last_bad_line``) instead of being
+    dropped silently.
+    """
+
+    def __init__(self, labels=("A0", "A1", "A2", "Seq"), separator="|", encoding="ascii"):
+        self.labels = tuple(labels)
+        self.separator = separator
+        self.encoding = encoding
+        self._first = f"{self.labels[0]}:"
+        # Tokens of a good line: "A0:", value, "|", "A1:", value, "|", ..., "Seq:", value
+        self._label_tokens = tuple(f"{label}:" for label in self.labels)
+        self._separators = (separator,) * (len(self.labels) - 1)
+        self._tokens = 3 * len(self.labels) - 1
+        self._checks = [(3 * i, label) for i, label in enumerate(self._label_tokens)]
+        self._checks += [(3 * i + 2, separator) for i in range(len(self._separators))]
+        self._carry = b""
+        self.lines = 0
+        self.bad_lines = 0
+        self.last_bad_line = None
+
+    def feed(self, data):
+        """Returns ((lines, labels) float64 array, list of the good lines as str)."""
+        chunk = self._carry + bytes(data)
+        end = chunk.rfind(b"\n") + 1
+        self._carry = chunk[end:]  # Partial line, completed by the next chunk
+        text = chunk[:end].decode(self.encoding, "replace").replace("\r", "")
+        return self.parse_lines(text.split("\n"))
+
+    def parse_lines(self, lines):
+        """Parse complete lines (str, without line endings)."""
+        lines = [line for line in lines if line.strip()]
+        self.lines += len(lines)
+        if not lines:
+            return np.empty((0, len(self.labels))), lines
+
+        # Fast path: cut every line at the first label and split the whole batch at once. If every
+        # line has the expected token count, label and separator checks are list.count() calls.
+        first = self._first
+        tokens = " ".join([line[line.find(first):] for line in lines]).split()
+        n, width = len(lines), self._tokens
+        if len(tokens) == n * width and all(tokens[i::width].count(token) == n for i, token in self._checks):
+            try:
+                values = [list(map(float, tokens[i::width])) for i in range(1, width, 3)]
+                return np.array(values).T, lines
+            except ValueError:
+                pass
+        return self._parse_one_by_one(lines)
+
+    def _parse_one_by_one(self, lines):
+        # Slow path for a batch with bad lines: check each line on its own and keep the good ones
+        rows, kept = [], []
+        for line in lines:
+            tokens = line[line.find(self._first):].split() if self._first in line else ()
+            if (len(tokens) != self._tokens or tuple(tokens[0::3]) != self._label_tokens
+                    or tuple(tokens[2::3]) != self._separators):
+                self._bad(line)
+                continue
+            try:
+                rows.append([float(value) for value in tokens[1::3]])
+            except ValueError:
+                self._bad(line)
+                continue
+            kept.append(line)
+        return np.array(rows, dtype=np.float64).reshape(-1, len(self.labels)), kept
+
+    def _bad(self, line):
+        self.bad_lines += 1
+        self.last_bad_line = line
+
+    def stats(self):
+        return {"lines": self.lines, "bad_lines": self.bad_lines, "last_bad_line": self.last_bad_line}
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from streamer.reorder import StreamDemux
+from streamer.ring_buffer import RingBuffer
+from streamer.text_parser import LabeledLineParser
+
+# Binary sample packet, little endian:
+#   magic     2 bytes  b"HY"
+#   board_id  uint8    set in the firmware, several boards may share one address
+#   channels  uint8
+#   seq       uint32   packet counter of the board, wraps at 2**32
+#   samples   uint16   samples in this packet
+#   reserved  uint16
+#   data      samples x channels int32 ADC codes, sample by sample
+PACKET_MAGIC = b"HY"
+PACKET_HEADER = struct.Struct("<2sBBIHH")
+
+
+def encode_packet(board_id, seq, codes):
+    """Datagram for a (samples, channels) code array, e.g. for a simulator or a test."""
+    codes = np.ascontiguousarray(codes, dtype="<i4")
+    if codes.ndim == 1:
+        codes = codes[np.newaxis, :]
+    header = PACKET_HEADER.pack(PACKET_MAGIC, board_id, codes.shape[1], seq & 0xFFFFFFFF, len(codes), 0)
+    return header + codes.tobytes()
+
+
+def decode_packet(data):
+    """Returns (board_id, seq, int32 (samples, channels) codes); raises ValueError for a bad packet."""
+    if len(data) < PACKET_HEADER.size:
+        raise ValueError(f"Packet of {len(data)} bytes is shorter than the header")
+    magic, board_id, channels, seq, samples, _ = PACKET_HEADER.unpack_from(data)
+    if magic != PACKET_MAGIC:
+        raise ValueError("Not a sample packet")
+    if len(data) != PACKET_HEADER.size + 4 * samples * channels:
+        raise ValueError(f"Packet of {len(data)} bytes does not hold {samples} x {channels} samples")
+    codes = np.frombuffer(data, "<i4", samples * channels, PACKET_HEADER.size).reshape(samples, channels)
+    return board_id, seq, codes
+
+
+def open_udp_socket(host="0.0.0.0", port=5000, rcvbuf=8 << 20):
+    """Bound UDP socket with a large receive buffer, so bursts wait in the kernel instead of being dropped.
+
+    Linux caps SO_RCVBUF at net.core.rmem_max; the size actually granted is
+    logged when it is smaller than requested.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)  # The boards send to 255.255.255.255
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    granted = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if sys.platform.startswith("linux"):
+        granted //= 2  # Linux reports twice the size that was set (bookkeeping overhead)
+    if granted < rcvbuf:
+        logging.warning(f"SO_RCVBUF is {granted} bytes instead of {rcvbuf}, raise net.core.rmem_max")
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+class UdpIngest(asyncio.DatagramProtocol):
+    """Decodes sample datagrams into one in-order RingBuffer per stream.
+
+    Binary packets (see encode_packet) are decoded with np.frombuffer and
+    demultiplexed by (sender IP, board id); each stream goes through a
+    reorder window of ``window`` packets / ``max_delay`` seconds before its
+    samples reach ``buffers[(ip, board_id)]``. Text packets of the older
+    firmware ("A1: 0.1 | A2: 0.2 | A3: 0.3") carry no sequence number and
+    are parsed with LabeledLineParser straight into stream (ip, 0).
+    Nothing is printed per packet: every sender IP has packet, byte, sample
+    and bad-packet counters (stats()), every stream loss and reorder
+    counters (stream_stats()). Samples are kept as int32 codes for binary
+    packets and as float values for text packets.
+
+    Run it on an asyncio loop with serve(), or on a UdpReceiver thread,
+    which skips the event loop round trip per datagram and keeps up with
+    about twice the packet rate.
+    """
+
+    def __init__(self, channels=3, capacity=100000, text_labels=("A1", "A2", "A3"), on_samples=None,
+                 window=32, max_delay=0.05):
+        self.channels = channels
+        self.capacity = capacity
+        self.on_samples = on_samples  # Optional callback((ip, board_id), seq, samples), in order
+        self.text_parser = LabeledLineParser(text_labels) if text_labels else None
+        self.demux = StreamDemux(self._store, window=window, max_delay=max_delay)
+        self.buffers = {}  # (ip, board_id) -> RingBuffer
+        self.counters = {}  # ip -> counters
+        self.transport = None
+        self.errors = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._schedule_poll(asyncio.get_running_loop())
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def _schedule_poll(self, loop):
+        # Streams that went quiet still release their held packets within max_delay
+        def tick():
+            if self.transport is not None:
+                self.poll()
+                loop.call_later(self.demux.max_delay / 2, tick)
+        loop.call_later(self.demux.max_delay / 2, tick)
+
+    def _source(self, source):
+        if source not in self.counters:
+            self.counters[source] = {"packets": 0, "bytes": 0, "samples": 0, "bad_packets": 0}
+        return self.counters[source]
+
+    def _store(self, key, seq, samples):
+        if key not in self.buffers:
+            self.buffers[key] = RingBuffer(self.capacity, self.channels, dtype=np.float64)
+        self.buffers[key].extend(samples)
+        if self.on_samples is not None:
+            self.on_samples(key, seq, samples)
+
+    def datagram_received(self, data, addr):
+        source = addr[0]
+        counters = self._source(source)
+        counters["packets"] += 1
+        counters["bytes"] += len(data)
+        try:
+            if data[:2] == PACKET_MAGIC:
+                board_id, seq, samples = decode_packet(data)
+            elif self.text_parser is not None:
+                board_id, seq = 0, None
+                samples, good = self.text_parser.parse_lines(data.decode("ascii", "replace").splitlines())
+                if not good:
+                    raise ValueError("No sample line in text packet")
+            else:
+                raise ValueError("Not a sample packet")
+            if samples.shape[1] != self.channels:
+                raise ValueError(f"Expected {self.channels} channels, got {samples.shape[1]}")
+        except ValueError:
+            counters["bad_packets"] += 1
+            return
+        counters["samples"] += len(samples)
+        if seq is None:
+            self._store((source, board_id), None, samples)
+        else:
+            self.demux.feed(source, board_id, seq, samples)
+
+    def poll(self):
+        """Release held packets whose reorder time ran out."""
+        self.demux.poll()
+
+    def error_received(self, exc):
+        self.errors += 1
+
+    def stats(self):
+        """Packet, byte, sample and bad-packet counters per sender IP since the start."""
+        return {source: dict(counters) for source, counters in self.counters.items()}
+
+    def stream_stats(self):
+        """Lost, late and held packets per (ip, board_id) stream."""
+        return self.demux.stats()
+
+
+async def serve(protocol, host="0.0.0.0", port=5000, rcvbuf=8 << 20):
+    """Start receiving into ``protocol``; returns the asyncio transport."""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: protocol, sock=open_udp_socket(host, port, rcvbuf))
+    return transport
+
+
+class UdpReceiver(threading.Thread):
+    """Blocking receive loop feeding a UdpIngest (or any DatagramProtocol) from its own thread.
+
+    The protocol's poll() (if it has one) is called every ``poll_interval``
+    seconds whether datagrams arrive or not, like UdpIngest's own timer, so
+    held packets are released on time under steady traffic too.
+    """
+
+    def __init__(self, protocol, sock, bufsize=65536, poll_interval=0.02):
+        super().__init__(name="UdpReceiver", daemon=True)
+        self.protocol = protocol
+        self.sock = sock
+        self.bufsize = bufsize
+        self.poll_interval = poll_interval
+        self.running = True
+        self._poll = getattr(protocol, "poll", None)
+        sock.settimeout(poll_interval)  # Also lets stop() end the loop without a packet arriving
+
+    def run(self):
+        recvfrom = self.sock.recvfrom
+        handle = self.protocol.datagram_received
+        next_poll = time.monotonic() + self.poll_interval
+        while self.running:
+            try:
+                data, addr = recvfrom(self.bufsize)
+            except socket.timeout:
+                pass
+            except OSError as e:
+                if not self.running:
+                    break
+                self.protocol.error_received(e)
+            else:
+                handle(data, addr)
+            if self._poll is not None:
+                now = time.monotonic()
+                if now >= next_poll:
+                    self._poll()
+                    next_poll = now + self.poll_interval
+
+    def stop(self):
+        self.running = False
+        self.join()
+        self.sock.close()
@@ -0,0 +1,42 @@
+import threading
+from collections import deque
+
+
+class UiUpdateBuffer:
+    """Hand-off of status updates from a reader thread to a GUI timer.
+
+    The reader calls push() for every batch and nothing is posted to the Qt
+    event queue; the GUI calls take() once per frame and gets the newest row,
+    the number of rows since the previous frame and the raw lines that came
+    in meanwhile. Only the last ``max_lines`` lines are kept between two
+    frames, the rest are counted in ``dropped_lines``, so a fast stream
+    cannot back up the GUI.
+    """
+
+    def __init__(self, max_lines=500):
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=max_lines)
+        self._line_count = 0  # Lines pushed since the last take(), kept or not
+        self._rows = 0
+        self._latest = None
+        self.dropped_lines = 0
+
+    def push(self, rows, lines=()):
+        """Called by the reader thread with a (n, channels) batch and its raw lines."""
+        with self._lock:
+            if len(rows):
+                self._latest = rows[-1]
+                self._rows += len(rows)
+            self._lines.extend(lines)
+            self._line_count += len(lines)
+
+    def take(self):
+        """Returns (newest row, rows and raw lines since the last call); row is None without new data."""
+        with self._lock:
+            latest, rows, lines = self._latest, self._rows, list(self._lines)
+            self.dropped_lines += self._line_count - len(lines)
+            self._lines.clear()
+            self._line_count = 0
+            self._rows = 0
+            self._latest = None
+        return latest, rows, lines
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the streamer package from src/Python, wherever pytest is started
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
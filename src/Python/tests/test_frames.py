@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from streamer.frames import SYNC, FrameFormat, FrameParser, crc16_rows
+from streamer.integrity import SequenceTracker
+
+CHANNELS = 3
+
+
+def make_stream(seq, sample="i24", seed=0):
+    """(frame bytes, seq, codes) for frames with random codes covering the whole signed range."""
+    fmt = FrameFormat(CHANNELS, sample)
+    bits = 23 if sample == "i24" else 31
+    codes = np.random.default_rng(seed).integers(-(1 << bits), 1 << bits, size=(len(seq), CHANNELS), dtype=np.int64)
+    return fmt.encode(seq, codes), np.asarray(seq) & 0xFFFF, codes.astype(np.int32)
+
+
+def frames_of(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_crc16_matches_modbus_check_value():
+    # CRC-16/MODBUS of "123456789" is 0x4B37
+    rows = np.frombuffer(b"123456789", dtype=np.uint8)[np.newaxis, :]
+    assert crc16_rows(rows)[0] == 0x4B37
+
+
+@pytest.mark.parametrize("sample", ["i24", "i32"])
+def test_round_trip(sample):
+    data, seq, codes = make_stream(np.arange(50), sample)
+    parser = FrameParser(CHANNELS, sample)
+    got_seq, got_codes = parser.feed(data)
+    assert np.array_equal(got_seq, seq)
+    assert np.array_equal(got_codes, codes)
+    assert parser.stats() == {"frames": 50, "crc_errors": 0, "skipped_bytes": 0}
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 5, 7, 13, 64])
+def test_frames_split_across_feeds(chunk):
+    data, seq, codes = make_stream(np.arange(40))
+    parser = FrameParser(CHANNELS)
+    parts = [parser.feed(data[i:i + chunk]) for i in range(0, len(data), chunk)]
+    assert np.array_equal(np.concatenate([p[0] for p in parts]), seq)
+    assert np.array_equal(np.concatenate([p[1] for p in parts]), codes)
+    assert parser.skipped_bytes == 0
+
+
+def test_split_inside_sync_word():
+    data, seq, _ = make_stream(np.arange(3))
+    size = FrameFormat(CHANNELS).size
+    parser = FrameParser(CHANNELS)
+    first, _ = parser.feed(data[:size + 1])  # Ends on the 0xA5 of the second frame
+    rest, _ = parser.feed(data[size + 1:])
+    assert list(first) + list(rest) == list(seq)
+
+
+@pytest.mark.parametrize("position", [0, 2, 5, -3, -1])
+def test_resync_after_dropped_byte(position):
+    data, seq, codes = make_stream(np.arange(20))
+    size = FrameFormat(CHANNELS).size
+    frames = frames_of(data, size)
+    frames[7] = frames[7][:position] + frames[7][position:][1:]  # One byte lost from frame 7
+    parser = FrameParser(CHANNELS)
+    got_seq, got_codes = parser.feed(b"".join(frames))
+    expected = np.delete(np.arange(20), 7)
+    assert np.array_equal(got_seq, seq[expected])
+    assert np.array_equal(got_codes, codes[expected])
+    assert parser.frames == 19
+
+
+def test_resync_after_garbage_with_sync_bytes():
+    data, seq, _ = make_stream(np.arange(10))
+    parser = FrameParser(CHANNELS)
+    got_seq, _ = parser.feed(b"\x00" + SYNC + b"\x01\x02\xA5" + data)
+    assert np.array_equal(got_seq, seq)
+    assert parser.skipped_bytes == 6
+
+
+def test_crc_error_drops_only_that_frame():
+    data, seq, codes = make_stream(np.arange(20))
+    size = FrameFormat(CHANNELS).size
+    corrupt = bytearray(data)
+    corrupt[5 * size + 6] ^= 0x10  # Data byte of frame 5
+    corrupt[12 * size + size - 1] ^= 0x01  # CRC byte of frame 12
+    parser = FrameParser(CHANNELS)
+    got_seq, got_codes = parser.feed(bytes(corrupt))
+    expected = np.delete(np.arange(20), [5, 12])
+    assert np.array_equal(got_seq, seq[expected])
+    assert np.array_equal(got_codes, codes[expected])
+    assert parser.crc_errors == 2
+
+
+def test_crc_error_in_first_frame_of_feed():
+    data, seq, _ = make_stream(np.arange(5))
+    corrupt = bytearray(data)
+    corrupt[3] ^= 0xFF  # seq of frame 0
+    parser = FrameParser(CHANNELS)
+    got_seq, _ = parser.feed(bytes(corrupt))
+    assert np.array_equal(got_seq, seq[1:])
+
+
+def test_seq_wraps_at_uint16():
+    data, seq, _ = make_stream(np.arange(65530, 65542))
+    parser = FrameParser(CHANNELS)
+    got_seq, _ = parser.feed(data)
+    assert got_seq.dtype == np.uint16
+    assert list(got_seq) == list(range(65530, 65536)) + list(range(6))
+    tracker = SequenceTracker(bits=16)
+    keep, gaps = tracker.update(got_seq)
+    assert keep.all() and len(gaps) == 0
+    assert tracker.restarts == 0
@@ -0,0 +1,104 @@
+from streamer.reorder import ReorderBuffer, StreamDemux
+
+
+def seqs(ready):
+    return [seq for seq, _ in ready]
+
+
+def test_out_of_order_release():
+    buffer = ReorderBuffer(window=8, max_delay=1.0)
+    assert seqs(buffer.push(0, "a", now=0.0)) == [0]
+    assert buffer.push(2, "c", now=0.0) == []
+    assert buffer.push(3, "d", now=0.0) == []
+    assert buffer.push(1, "b", now=0.0) == [(1, "b"), (2, "c"), (3, "d")]
+    assert len(buffer) == 0
+    assert buffer.max_held == 3  # 2, 3 and the 1 that filled the gap
+
+
+def test_gap_given_up_after_window():
+    buffer = ReorderBuffer(window=3, max_delay=10.0)
+    buffer.push(0, None, now=0.0)
+    for seq in (2, 3, 4):
+        assert buffer.push(seq, None, now=0.0) == []  # Up to window packets are held
+    assert seqs(buffer.push(5, None, now=0.0)) == [2, 3, 4, 5]
+    assert buffer.expected == 6
+    # The packet given up arrives after all: dropped as late, not delivered out of order
+    assert buffer.push(1, None, now=0.0) == []
+    assert buffer.late == 1
+
+
+def test_gap_given_up_after_max_delay():
+    buffer = ReorderBuffer(window=32, max_delay=0.5)
+    buffer.push(0, None, now=0.0)
+    assert buffer.push(2, None, now=0.125) == []
+    assert buffer.push(4, None, now=0.25) == []
+    assert buffer.poll(now=0.5) == []
+    # 2 waited max_delay: skip 1 and release 2; 4 has not waited long enough yet
+    assert seqs(buffer.poll(now=0.625)) == [2]
+    assert seqs(buffer.push(3, None, now=0.6875)) == [3, 4]
+    assert buffer.poll(now=1.0) == []
+
+
+def test_duplicate_held_packet_is_late():
+    buffer = ReorderBuffer()
+    buffer.push(0, None, now=0.0)
+    buffer.push(2, None, now=0.0)
+    assert buffer.push(2, None, now=0.0) == []
+    assert buffer.push(0, None, now=0.0) == []
+    assert buffer.late == 2
+    assert len(buffer) == 1
+
+
+def test_restart_gap_resets():
+    buffer = ReorderBuffer(window=32, max_delay=1.0, restart_gap=10)
+    for seq in range(100):
+        buffer.push(seq, None, now=0.0)
+    buffer.push(102, None, now=0.0)  # Held, 100 and 101 missing
+    assert buffer.push(95, None, now=0.0) == []  # Within restart_gap behind: late
+    assert buffer.late == 1 and buffer.restarts == 0
+    # Far behind: the sender restarted, what is held comes out first, then the new numbering
+    assert seqs(buffer.push(3, None, now=0.0)) == [102, 3]
+    assert buffer.restarts == 1
+    assert seqs(buffer.push(4, None, now=0.0)) == [4]
+
+
+def test_sequence_wraps():
+    buffer = ReorderBuffer(bits=16)
+    assert seqs(buffer.push(65534, None, now=0.0)) == [65534]
+    assert buffer.push(1, None, now=0.0) == []
+    assert buffer.push(0, None, now=0.0) == []
+    assert seqs(buffer.push(65535, None, now=0.0)) == [65535, 0, 1]
+    assert buffer.restarts == 0 and buffer.late == 0
+
+
+def test_flush_skips_gaps():
+    buffer = ReorderBuffer(window=32, max_delay=1.0)
+    buffer.push(0, None, now=0.0)
+    for seq in (5, 3, 9):
+        buffer.push(seq, None, now=0.0)
+    assert seqs(buffer.flush()) == [3, 5, 9]
+    assert buffer.expected == 10
+
+
+def test_demux_streams_are_isolated():
+    delivered = []
+    demux = StreamDemux(lambda key, seq, block: delivered.append((key, seq, block)), window=4, max_delay=0.5)
+    a1, a2, b1 = ("10.0.0.1", 1), ("10.0.0.1", 2), ("10.0.0.2", 1)
+    for key in (a1, a2, b1):
+        demux.feed(*key, 0, key, now=0.0)
+    demux.feed(*a1, 2, "a1-2", now=0.0)  # a1 waits for 1
+    demux.feed(*a2, 1, "a2-1", now=0.0)  # a2 has no gap, released at once
+    demux.feed(*b1, 5, "b1-5", now=0.125)  # Same board id on another address: its own stream
+    assert [(key, seq) for key, seq, _ in delivered] == [(a1, 0), (a2, 0), (b1, 0), (a2, 1)]
+
+    delivered.clear()
+    demux.poll(now=0.5)  # Only a1 has waited max_delay
+    assert delivered == [(a1, 2, "a1-2")]
+    demux.poll(now=0.625)
+    assert delivered[-1] == (b1, 5, "b1-5")
+
+    stats = demux.stats()
+    assert stats[a1]["lost"] == 1 and stats[a1]["received"] == 2
+    assert stats[a2]["lost"] == 0 and stats[a2]["received"] == 2
+    assert stats[b1]["lost"] == 4 and stats[b1]["received"] == 2
+    assert all(stream["held"] == 0 for stream in stats.values())
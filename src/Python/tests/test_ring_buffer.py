@@ -0,0 +1,86 @@
+import sys
+import threading
+
+import numpy as np
+
+from streamer.ring_buffer import RingBuffer
+
+
+def rows(start, n, channels=3):
+    """Samples whose every channel holds their running sample number."""
+    return np.repeat(np.arange(start, start + n, dtype=np.float64)[:, np.newaxis], channels, axis=1)
+
+
+def check_window(first, samples):
+    assert np.array_equal(samples, rows(first, len(samples), samples.shape[1]))
+
+
+def test_wraparound_keeps_newest_in_order():
+    buffer = RingBuffer(10, 3, dtype=np.float64)
+    written = 0
+    for n in (3, 7, 9, 1, 25, 4):
+        buffer.extend(rows(written, n))
+        written += n
+        first, samples = buffer.snapshot()
+        assert first == written - min(written, 10)
+        check_window(first, samples)
+        assert np.array_equal(buffer.latest(), samples)
+
+
+def test_snapshot_n():
+    buffer = RingBuffer(8, 3, dtype=np.float64)
+    buffer.extend(rows(0, 13))
+    first, samples = buffer.snapshot(5)
+    assert first == 8
+    check_window(first, samples)
+
+
+def test_concurrent_snapshot_never_torn():
+    """A reader thread never sees a mixed or mis-ordered window while the writer wraps."""
+    # Big enough that numpy drops the GIL while copying, so the writer really runs mid-snapshot
+    capacity = 1000
+    buffer = RingBuffer(capacity, 3, dtype=np.float64)
+    total = 1000000
+    # Batch sizes that cross the wrap point at changing offsets, including batches longer than the buffer
+    sizes = [1, 7, 333, 999, 1000, 1001, 2500, 64]
+    done = threading.Event()
+    errors = []
+    windows = [0]
+
+    def reader():
+        last_first = 0
+        while not done.is_set():
+            first, samples = buffer.snapshot()
+            windows[0] += 1
+            try:
+                check_window(first, samples)
+                assert first >= last_first
+                assert len(samples) == min(first + len(samples), capacity)
+            except AssertionError as e:
+                errors.append((first, samples, e))
+                return
+            last_first = first
+
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible to catch the writer mid-batch
+    try:
+        thread = threading.Thread(target=reader)
+        thread.start()
+        written = 0
+        i = 0
+        while written < total:
+            n = sizes[i % len(sizes)]
+            buffer.extend(rows(written, n))
+            written += n
+            if i % 7 == 0:
+                buffer.append(rows(written, 1)[0])
+                written += 1
+            i += 1
+        done.set()
+        thread.join()
+    finally:
+        sys.setswitchinterval(switch)
+
+    assert not errors, errors[0]
+    assert windows[0] > 0
+    check_window(*buffer.snapshot())
@@ -0,0 +1,121 @@
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from streamer.segy import FORMAT_IEEE_FLOAT, FORMAT_INT32, SegyWriter
+
+# Offsets below are written out from the SEG-Y rev 1 / rev 2.0 standard (1-based byte
+# positions), not taken from streamer.segy, so the writer is checked against the spec.
+SAMPLES = 25
+INTERVAL_US = 500
+TRACES = 4
+WHEN = datetime(2024, 3, 1, 12, 34, 56)
+
+
+def binary(data, position, fmt):
+    """Big-endian field of the binary header at a 1-based file position (3201-3600)."""
+    return struct.unpack_from(">" + fmt, data, position - 1)[0]
+
+
+def trace_field(data, trace, position, fmt, samples=SAMPLES, sample_size=4):
+    start = 3600 + trace * (240 + samples * sample_size)
+    return struct.unpack_from(">" + fmt, data, start + position - 1)[0]
+
+
+def trace_samples(data, trace, dtype, samples=SAMPLES):
+    start = 3600 + trace * (240 + samples * 4) + 240
+    return np.frombuffer(data, dtype=dtype, count=samples, offset=start)
+
+
+def write_file(path, revision=1, data_format=FORMAT_IEEE_FLOAT):
+    traces = np.arange(TRACES * SAMPLES, dtype=np.float64).reshape(TRACES, SAMPLES) - 40.5
+    if data_format == FORMAT_INT32:
+        traces = traces.astype(np.int32)
+    with SegyWriter(path, SAMPLES, INTERVAL_US, data_format=data_format, revision=revision,
+                    text_header="Line one\nLine two", traces_per_ensemble=2) as writer:
+        for i, trace in enumerate(traces):
+            writer.write_trace(trace, timestamp=WHEN, field_record=i // 2 + 1, trace_number=i % 2 + 1)
+    return traces, path.read_bytes()
+
+
+@pytest.mark.parametrize("revision", [1, 2])
+def test_textual_header(tmp_path, revision):
+    _, data = write_file(tmp_path / "out.sgy", revision)
+    text = data[:3200].decode("cp500")  # EBCDIC
+    lines = [text[i:i + 80] for i in range(0, 3200, 80)]
+    assert len(lines) == 40
+    assert all(line.startswith(f"C{i + 1:2d}") for i, line in enumerate(lines))
+    assert lines[0].rstrip() == "C 1 Line one"
+    assert lines[1].rstrip() == "C 2 Line two"
+    if revision == 2:
+        assert lines[38].rstrip() == "C39 SEG-Y_REV2.0"
+        assert lines[39].rstrip() == "C40 END TEXTUAL HEADER"
+    else:
+        assert lines[38].rstrip() == "C39 SEG Y REV1"
+        assert lines[39].rstrip() == "C40 END EBCDIC"
+
+
+@pytest.mark.parametrize("revision", [1, 2])
+def test_binary_header(tmp_path, revision):
+    _, data = write_file(tmp_path / "out.sgy", revision)
+    assert len(data) == 3600 + TRACES * (240 + SAMPLES * 4)
+    assert binary(data, 3213, "h") == 2  # Data traces per ensemble
+    assert binary(data, 3217, "H") == INTERVAL_US  # Sample interval, us
+    assert binary(data, 3219, "H") == INTERVAL_US  # Original field sample interval
+    assert binary(data, 3221, "H") == SAMPLES  # Samples per data trace
+    assert binary(data, 3223, "H") == SAMPLES  # Original samples per trace
+    assert binary(data, 3225, "h") == 5  # Format code 5: 4-byte IEEE floating point
+    assert binary(data, 3255, "h") == 1  # Meters
+    assert binary(data, 3501, "B") == revision  # Major revision number
+    assert binary(data, 3502, "B") == 0  # Minor revision number
+    assert binary(data, 3503, "h") == 1  # Fixed length traces
+    assert binary(data, 3505, "h") == 0  # No extended textual headers
+    if revision == 2:
+        assert binary(data, 3297, "I") == 0x01020304  # Byte order: big endian
+        assert binary(data, 3513, "Q") == TRACES  # Traces in the file
+        assert binary(data, 3521, "Q") == 3600  # Byte offset of the first trace
+
+
+def test_trace_headers_and_samples(tmp_path):
+    traces, data = write_file(tmp_path / "out.sgy")
+    for i in range(TRACES):
+        assert trace_field(data, i, 1, "i") == i + 1  # Trace sequence number within line
+        assert trace_field(data, i, 5, "i") == i + 1  # Trace sequence number within file
+        assert trace_field(data, i, 9, "i") == i // 2 + 1  # Field record number
+        assert trace_field(data, i, 13, "i") == i % 2 + 1  # Trace number within the field record
+        assert trace_field(data, i, 29, "h") == 1  # Trace identification code: seismic data
+        assert trace_field(data, i, 115, "H") == SAMPLES  # Number of samples in this trace
+        assert trace_field(data, i, 117, "H") == INTERVAL_US  # Sample interval of this trace, us
+        assert trace_field(data, i, 157, "h") == 2024
+        assert trace_field(data, i, 159, "h") == 61  # Day of year
+        assert (trace_field(data, i, 161, "h"), trace_field(data, i, 163, "h"),
+                trace_field(data, i, 165, "h")) == (12, 34, 56)
+        assert np.array_equal(trace_samples(data, i, ">f4"), traces[i].astype(np.float32))
+
+
+def test_ieee_float_bytes(tmp_path):
+    with SegyWriter(tmp_path / "one.sgy", 2, 1000) as writer:
+        writer.write_trace([1.0, -2.0])
+    data = (tmp_path / "one.sgy").read_bytes()
+    assert data[3600 + 240:] == bytes.fromhex("3F800000 C0000000")
+
+
+def test_int32_format(tmp_path):
+    traces, data = write_file(tmp_path / "int.sgy", data_format=FORMAT_INT32)
+    assert binary(data, 3225, "h") == 2  # Format code 2: 4-byte two's complement integer
+    assert np.array_equal(trace_samples(data, 3, ">i4"), traces[3])
+
+
+def test_short_trace_is_zero_padded(tmp_path):
+    with SegyWriter(tmp_path / "pad.sgy", 4, 1000) as writer:
+        writer.write_trace([1.0, 2.0])
+    data = (tmp_path / "pad.sgy").read_bytes()
+    assert list(trace_samples(data, 0, ">f4", samples=4)) == [1.0, 2.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize("interval_us", [0, 0.4, 70000])
+def test_interval_out_of_range(tmp_path, interval_us):
+    with pytest.raises(ValueError):
+        SegyWriter(tmp_path / "bad.sgy", 10, interval_us)